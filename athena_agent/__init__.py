@@ -3,6 +3,14 @@ Athena Agent Module - LangGraph Platform Service
 A family life planning assistant with persistent memory and multi-user support.
 """
 
-from .agent import graph
+from .agent import build_graph, make_graph
 
-__all__ = ['graph']
\ No newline at end of file
+__all__ = ['graph', 'make_graph', 'build_graph']
+
+
+def __getattr__(name):
+    # The compiled graph is built on first access, not when the package is imported
+    if name == "graph":
+        from .agent import get_graph
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
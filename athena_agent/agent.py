@@ -1,46 +1,78 @@
 """
 Athena Agent - LangGraph Platform Implementation
 This module defines the main graph that will be served by LangGraph Platform.
+
+Importing it is cheap and has no side effects: the LLM, memory client, search
+tools and compiled graph are built on first use (see make_graph).
 """
 
 from typing import Annotated, Optional, Dict, Any
 from typing_extensions import TypedDict
 from datetime import datetime
+from functools import partial
+import asyncio
 import os
-import json
-import warnings
 
-from langchain.chat_models import init_chat_model
-from langchain_tavily import TavilySearch
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
 
 # Import our custom modules
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config import GOOGLE_API_KEY, TAVILY_API_KEY, MEM0_API_KEY
-from context_utils import get_current_time_and_date, get_location_context
+from config import (
+    GOOGLE_API_KEY, TAVILY_API_KEY, MEM0_API_KEY, MEMORY_BACKEND,
+    MEMORY_FETCH_TIMEOUT, CONTEXT_FETCH_TIMEOUT, MEMORY_OUTBOX_PATH,
+    MEMORY_CACHE_MAX_USERS, MEMORY_CACHE_MAX_AGE, MEMORY_TOP_K, MEMORY_TOKEN_BUDGET, MEMORY_FETCH_LIMIT,
+    HISTORY_KEEP_TURNS, HISTORY_FOLD_TURNS, HISTORY_TOKEN_BUDGET,
+    RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_ENTRIES,
+    TOOL_CALL_TIMEOUT, METRICS_PORT, METRICS_FILE, METRICS_EXPORT_INTERVAL, validate_config
+)
+from context_utils import get_current_time_and_date, get_location_context, default_location_context
+from history_utils import HistoryManager, render_summary, removal_updates, token_budget_for_model
+from lazy_utils import once
+from metrics import metrics, start_exporters
+from response_cache import ResponseCache
+from tool_compaction import keep_recent_tool_results
 
-# Set up API keys
-os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
+MODEL_NAME = "google_genai:gemini-2.5-flash"
 
-# Initialize Mem0 client if available
-mem0_client = None
-if MEM0_API_KEY:
-    try:
-        from mem0 import MemoryClient
-        warnings.filterwarnings("ignore", category=DeprecationWarning, module="mem0")
-        mem0_client = MemoryClient(api_key=MEM0_API_KEY)
-        print("[INFO] Mem0 memory system initialized")
-    except ImportError:
-        print("[WARNING] Mem0 library not installed")
-    except Exception as e:
-        print(f"[WARNING] Failed to initialize Mem0: {e}")
+
+@once
+def get_memory_client():
+    """The cached memory client (hosted Mem0 or the local database), or None."""
+    from memory import create_memory_client, CachedMemoryClient
+    backend = create_memory_client(MEMORY_BACKEND, MEM0_API_KEY)
+    if not backend:
+        return None
+    return CachedMemoryClient(
+        backend,
+        max_users=MEMORY_CACHE_MAX_USERS,
+        max_age=MEMORY_CACHE_MAX_AGE
+    )
+
+
+@once
+def get_memory_outbox():
+    """Memory writes go through a durable outbox so they never delay a response."""
+    from memory import MemoryOutbox
+    client = get_memory_client()
+    return MemoryOutbox(client, MEMORY_OUTBOX_PATH).start() if client else None
+
+
+# Answers to repeated questions, invalidated whenever the user's memories change
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL)
+
+
+def memory_version(user_id: str) -> int:
+    """Version of a user's memories, used to invalidate cached answers."""
+    client = get_memory_client()
+    if client and user_id:
+        return client.version(user_id)
+    return 0
 
 
 class State(TypedDict):
@@ -51,15 +83,22 @@ class State(TypedDict):
     messages: Annotated[list, add_messages]
     context: Dict[str, Any]
     user_id: Optional[str]  # User identifier for multi-user support
+    summary: str  # Rolling summary of turns no longer kept verbatim
+    tool_results: Annotated[Dict[str, str], keep_recent_tool_results]  # Full payloads of compacted searches, by ref
     
     
 # Note: Multi-user support will be added back in the next phase
 
 
-def create_context_aware_system_prompt():
+def create_context_aware_system_prompt(
+    time_info: Optional[Dict[str, Any]] = None,
+    location_info: Optional[Dict[str, Any]] = None
+):
     """Create a system prompt that includes real-time context."""
-    time_info = get_current_time_and_date()
-    location_info = get_location_context()
+    if time_info is None:
+        time_info = get_current_time_and_date()
+    if location_info is None:
+        location_info = get_location_context()
     
     # Determine time-based context
     time_context = ""
@@ -81,7 +120,7 @@ def create_context_aware_system_prompt():
     
     # Check if tools are available
     tools_available = ""
-    if TAVILY_API_KEY:
+    if get_tools():
         tools_available = """
 AVAILABLE TOOLS:
 - Web Search: You have access to web search via the TavilySearch tool. Use this to:
@@ -119,56 +158,26 @@ Always be helpful, family-focused, and use the context to provide more personali
 
 def create_memory_enhanced_system_prompt(user_id: str, base_prompt: str, user_message: str = None):
     """Create a system prompt enhanced with relevant memories from Mem0."""
+    from memory import fetch_memories, format_memory_context, select_prompt_memories
+    mem0_client = get_memory_client()
     if not mem0_client or not user_id:
         return base_prompt
     
-    try:
-        # Get user-specific memories
-        all_memories = mem0_client.get_all(user_id=user_id)
-        
-        memory_context = ""
-        if all_memories:
-            memories_list = None
-            if isinstance(all_memories, dict):
-                if 'results' in all_memories:
-                    memories_list = all_memories['results']
-                elif 'memories' in all_memories:
-                    memories_list = all_memories['memories']
-            elif isinstance(all_memories, list):
-                memories_list = all_memories
-            
-            if memories_list:
-                memory_context = "\n\nSTORED FAMILY INFORMATION:\n"
-                for memory in memories_list[:10]:
-                    memory_text = memory.get('memory', memory.get('text', str(memory)))
-                    memory_context += f"• {memory_text}\n"
-                memory_context += "\nIMPORTANT: Use this information to personalize your responses."
-        
-        # Also search for relevant memories if user message provided
-        if user_message and mem0_client:
-            search_results = mem0_client.search(user_message, user_id=user_id)
-            if search_results:
-                results_list = None
-                if isinstance(search_results, dict) and 'results' in search_results:
-                    results_list = search_results['results']
-                elif isinstance(search_results, list):
-                    results_list = search_results
-                
-                if results_list:
-                    memory_context += "\n\nRELEVANT CONTEXT FOR THIS QUERY:\n"
-                    for result in results_list[:3]:
-                        result_text = result.get('memory', result.get('text', str(result)))
-                        memory_context += f"• {result_text}\n"
-        
-        return base_prompt + memory_context
-    except Exception as e:
-        print(f"[WARNING] Memory retrieval failed: {e}")
-        return base_prompt
+    memories, relevant = fetch_memories(
+        mem0_client, user_id, user_message,
+        timeout=MEMORY_FETCH_TIMEOUT, limit=MEMORY_FETCH_LIMIT, metrics=metrics
+    )
+    memories, relevant = select_prompt_memories(
+        user_message or "", memories, relevant,
+        memory_limit=MEMORY_TOP_K, token_budget=MEMORY_TOKEN_BUDGET
+    )
+    return base_prompt + format_memory_context(memories, relevant)
 
 
 def store_interaction_in_memory(user_id: str, user_message: str, assistant_response: str):
-    """Store the interaction in Mem0 for future reference."""
-    if not mem0_client or not user_id:
+    """Queue the interaction for storage in Mem0; delivery happens in the background."""
+    memory_outbox = get_memory_outbox()
+    if not memory_outbox or not user_id:
         return
     
     try:
@@ -176,31 +185,92 @@ def store_interaction_in_memory(user_id: str, user_message: str, assistant_respo
             {"role": "user", "content": user_message},
             {"role": "assistant", "content": assistant_response}
         ]
-        mem0_client.add(messages, user_id=user_id)
+        memory_outbox.enqueue(user_id, messages)
     except Exception as e:
-        print(f"[WARNING] Failed to store memory: {e}")
+        print(f"[WARNING] Failed to queue memory: {e}")
+
 
+@once
+def get_llm():
+    """The chat model, created on first use."""
+    from langchain.chat_models import init_chat_model
+    validate_config()
+    os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
+    return init_chat_model(MODEL_NAME)
 
-# Initialize the LLM
-llm = init_chat_model("google_genai:gemini-2.5-flash")
 
-# Set up tools if available
-tools = []
-if TAVILY_API_KEY:
+@once
+def get_history_manager() -> HistoryManager:
+    """Older turns are folded into a rolling summary to keep prompts flat."""
+    return HistoryManager(
+        summarizer=get_llm(),
+        keep_turns=HISTORY_KEEP_TURNS,
+        fold_turns=HISTORY_FOLD_TURNS,
+        token_budget=token_budget_for_model(MODEL_NAME, HISTORY_TOKEN_BUDGET)
+    )
+
+
+@once
+def get_tools() -> list:
+    """Web search (if a Tavily key is configured) plus the compacted-result lookup."""
+    if not TAVILY_API_KEY:
+        return []
+    from langchain_tavily import TavilySearch
+    from search_cache import CachedSearchTool, PooledTavilySearchAPIWrapper, SearchCache
+    from tool_compaction import make_expand_tool
+    
     os.environ["TAVILY_API_KEY"] = TAVILY_API_KEY
-    tool = TavilySearch(max_results=3)
-    tools = [tool]
-    llm_with_tools = llm.bind_tools(tools)
-else:
-    llm_with_tools = llm
+    # Household-wide searches share one cache; identical in-flight queries are merged
+    search = CachedSearchTool(
+        TavilySearch(max_results=3, api_wrapper=PooledTavilySearchAPIWrapper()),
+        SearchCache(SEARCH_CACHE_MAX_ENTRIES)
+    )
+    return [search, make_expand_tool()]
 
 
-def chatbot(state: State, config: RunnableConfig) -> dict:
-    """
-    The main chatbot node that processes user messages and generates responses.
-    This is the core of Athena's intelligence.
-    """
-    # Extract user_id from config - this enables multi-user support!
+@once
+def get_llm_with_tools():
+    """The chat model with the available tools bound."""
+    tools = get_tools()
+    return get_llm().bind_tools(tools) if tools else get_llm()
+
+
+@once
+def get_profile_sessions():
+    """Session factory for reading user profiles (the users database by default)."""
+    from database.connection import SessionLocal
+    return SessionLocal
+
+
+def load_profile_digest(user_id: str) -> str:
+    """The user's profile digest for the prompt; the users database is only read on a cache miss."""
+    from auth.profile_digest import profile_digests
+    from auth.user_service import UserService
+    db = get_profile_sessions()()
+    try:
+        return UserService.get_profile_digest(db, user_id)
+    except Exception as e:
+        # Remembered as missing, so a broken users database is not retried every turn
+        print(f"[WARNING] Profile lookup failed for {user_id}: {e}")
+        profile_digests.put_missing(user_id, profile_digests.version())
+        return ""
+    finally:
+        db.close()
+
+
+async def _profile_digest(user_id: str) -> str:
+    """Cached digests are returned inline; only a miss goes to a worker thread."""
+    from auth.profile_digest import profile_digests
+    if not user_id:
+        return ""
+    cached = profile_digests.get(user_id)
+    if cached is not None:
+        return cached
+    return await _gather_context_source("Profile", partial(load_profile_digest, user_id), "", user_id)
+
+
+def resolve_user_id(config: RunnableConfig) -> str:
+    """Work out which user a run belongs to from its config."""
     configurable = config.get("configurable", {})
     metadata = configurable.get("metadata", {})
     user_id = metadata.get("user_id", "default_user")
@@ -214,16 +284,41 @@ def chatbot(state: State, config: RunnableConfig) -> dict:
             if len(parts) >= 2:
                 user_id = f"user_{parts[1]}"
     
-    # Update context with current time/location
-    context = state.get("context", {})
-    context.update({
-        "time": get_current_time_and_date(),
-        "location": get_location_context(),
-        "last_updated": datetime.now().isoformat()
-    })
+    return user_id
+
+
+async def _gather_context_source(name: str, func, default, user_id: Optional[str] = None):
+    """Run one blocking context source in a thread, falling back on timeout or error."""
+    try:
+        with metrics.time(name.lower(), user_id):
+            return await asyncio.wait_for(asyncio.to_thread(func), CONTEXT_FETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"[WARNING] {name} context timed out after {CONTEXT_FETCH_TIMEOUT}s")
+    except Exception as e:
+        print(f"[WARNING] {name} context failed: {e}")
+    return default() if callable(default) else default
+
+
+async def chatbot(state: State, config: RunnableConfig) -> dict:
+    """
+    The main chatbot node that processes user messages and generates responses.
+    This is the core of Athena's intelligence.
     
-    # Create context-aware system prompt
-    base_system_prompt = create_context_aware_system_prompt()
+    Memory retrieval, location and time context are gathered concurrently, so
+    the wait before the LLM call is bounded by the slowest source rather than
+    the sum of all of them. Stable facts from the user's account come from a
+    cached profile digest rather than a memory search. Every stage is timed
+    into the metrics registry.
+    """
+    user_id = resolve_user_id(config)
+    with metrics.time("chatbot", user_id):
+        return await _chatbot_turn(state, user_id)
+
+
+async def _chatbot_turn(state: State, user_id: str) -> dict:
+    """One chatbot turn for a resolved user; see chatbot."""
+    from memory import afetch_memories, format_memory_context, select_prompt_memories
+    history_manager = get_history_manager()
     
     # Get the current user message for context-aware memory search
     messages = state["messages"]
@@ -231,59 +326,162 @@ def chatbot(state: State, config: RunnableConfig) -> dict:
     if messages and isinstance(messages[-1], HumanMessage):
         current_user_message = messages[-1].content
     
-    # Enhance with user-specific memories
-    system_prompt = create_memory_enhanced_system_prompt(
-        user_id, 
-        base_system_prompt, 
-        current_user_message
-    )
+    # Repeated questions are answered from cache; turns continuing after a
+    # tool call never are, since current_user_message is empty then. The
+    # preceding messages (and any summary of older ones) are part of the key,
+    # so a follow-up is only reused within the same conversation context
+    summary = state.get("summary", "")
+    cache_key = None
+    with metrics.time("cache_lookup", user_id):
+        if current_user_message:
+            history = ([summary] if summary else []) + list(messages[:-1])
+            cache_key = response_cache.make_key(user_id, current_user_message, get_current_time_and_date(), history)
+        cache_version = memory_version(user_id)
+        cached_answer = response_cache.get(cache_key, cache_version)
+    if cached_answer is not None:
+        # Not written to memory again: the same exchange was stored when the answer was cached
+        return {
+            "messages": [AIMessage(content=cached_answer)],
+            "context": state.get("context", {}),
+            "user_id": user_id,
+            "summary": summary
+        }
     
-    # Prepare messages with system prompt
-    if messages and isinstance(messages[0], SystemMessage):
-        messages[0] = SystemMessage(content=system_prompt)
-    else:
-        messages = [SystemMessage(content=system_prompt)] + messages
+    with metrics.time("context", user_id):
+        time_info, location_info, profile_digest, (memories, relevant) = await asyncio.gather(
+            _gather_context_source("Time", get_current_time_and_date, get_current_time_and_date, user_id),
+            _gather_context_source("Location", get_location_context, default_location_context, user_id),
+            _profile_digest(user_id),
+            # memory_fetch is the total; get_all and search are recorded as their own stages
+            metrics.timed("memory_fetch", user_id, afetch_memories(
+                get_memory_client() if user_id else None,
+                user_id,
+                current_user_message,
+                timeout=MEMORY_FETCH_TIMEOUT,
+                limit=MEMORY_FETCH_LIMIT,
+                metrics=metrics
+            ))
+        )
     
-    # Generate response
-    response = llm_with_tools.invoke(messages)
+    # Update context with current time/location
+    context = state.get("context", {})
+    context.update({
+        "time": time_info,
+        "location": location_info,
+        "last_updated": datetime.now().isoformat()
+    })
+    
+    with metrics.time("prompt", user_id):
+        # Rank memories against the current message so the prompt carries the best ones
+        memories, relevant = select_prompt_memories(
+            current_user_message, memories, relevant,
+            memory_limit=MEMORY_TOP_K, token_budget=MEMORY_TOKEN_BUDGET
+        )
+        
+        # Create context-aware system prompt enhanced with user-specific memories
+        base_system_prompt = create_context_aware_system_prompt(time_info, location_info)
+        system_prompt = (
+            base_system_prompt
+            + profile_digest
+            + format_memory_context(memories, relevant)
+            + render_summary(summary)
+        )
+        
+        # Keep recent turns verbatim; older ones are folded into the summary
+        folded, kept = history_manager.plan(messages, summary)
+        history = history_manager.prompt_history(folded, kept, summary)
+        llm_messages = [SystemMessage(content=system_prompt)] + history
     
-    # Store interaction in memory for this user
+    # Generate response while the summary absorbs any folded turns
+    response, new_summary = await asyncio.gather(
+        metrics.timed("llm", user_id, get_llm_with_tools().ainvoke(llm_messages)),
+        metrics.timed("summarize", user_id, history_manager.asummarize(summary, folded))
+    )
+    updates = [response]
+    if folded and new_summary != summary:
+        updates = removal_updates(folded) + updates
+    
+    # Queue interaction for this user's memory (delivered off the response path)
     if current_user_message and isinstance(response.content, str):
-        store_interaction_in_memory(user_id, current_user_message, response.content)
+        with metrics.time("memory_store", user_id):
+            store_interaction_in_memory(user_id, current_user_message, response.content)
+        # Answers that need a tool call are not cached
+        if not getattr(response, "tool_calls", None):
+            response_cache.put(cache_key, response.content, cache_version)
     
     return {
-        "messages": [response],
+        "messages": updates,
         "context": context,
-        "user_id": user_id
+        "user_id": user_id,
+        "summary": new_summary
     }
 
 
-# Build the graph
-graph_builder = StateGraph(State)
+def build_graph(checkpointer=None):
+    """Build and compile the Athena graph, creating clients as needed."""
+    from langgraph.prebuilt import tools_condition
+    
+    graph_builder = StateGraph(State)
+    
+    # Add the chatbot node
+    graph_builder.add_node("chatbot", chatbot)
+    
+    # Add tool node if tools are available
+    tools = get_tools()
+    if tools:
+        from tool_compaction import ToolResultCompactor
+        from tool_execution import ParallelToolNode
+        
+        # Tool calls from one message run concurrently, each with its own timeout
+        tool_node = ParallelToolNode(tools, timeout=TOOL_CALL_TIMEOUT, metrics=metrics)
+        graph_builder.add_node("tools", tool_node)
+        graph_builder.add_node("compact", ToolResultCompactor(tool_names=[tools[0].name]))
+        
+        # Add conditional edges to route between chatbot and tools
+        graph_builder.add_conditional_edges(
+            "chatbot",
+            tools_condition,
+        )
+        # Any time a tool is called, results are compacted and we return to the chatbot
+        graph_builder.add_edge("tools", "compact")
+        graph_builder.add_edge("compact", "chatbot")
+        graph_builder.add_edge(START, "chatbot")
+    else:
+        # Direct connection without tools
+        graph_builder.add_edge(START, "chatbot")
+        graph_builder.add_edge("chatbot", END)
+    
+    return graph_builder.compile(checkpointer=checkpointer)
 
-# Add the chatbot node
-graph_builder.add_node("chatbot", chatbot)
 
-# Add tool node if tools are available
-if tools:
-    tool_node = ToolNode(tools=tools)
-    graph_builder.add_node("tools", tool_node)
+@once
+def get_graph():
+    """The compiled graph, built once per process."""
+    from http_clients import HTTP_WARMUP, warm_up
     
-    # Add conditional edges to route between chatbot and tools
-    graph_builder.add_conditional_edges(
-        "chatbot",
-        tools_condition,
-    )
-    # Any time a tool is called, we return to the chatbot
-    graph_builder.add_edge("tools", "chatbot")
-    graph_builder.add_edge(START, "chatbot")
-else:
-    # Direct connection without tools
-    graph_builder.add_edge(START, "chatbot")
-    graph_builder.add_edge("chatbot", END)
+    compiled = build_graph()
+    
+    # Open outbound connections now so the first turn doesn't pay for handshakes
+    if HTTP_WARMUP:
+        from langchain_tavily._utilities import TAVILY_API_URL
+        get_location_context()  # Starts the background location lookup
+        warm_up([TAVILY_API_URL] if TAVILY_API_KEY else [], llm=get_llm())
+    get_memory_outbox()
+    start_exporters(METRICS_PORT, METRICS_FILE, METRICS_EXPORT_INTERVAL)
+    return compiled
+
+
+def make_graph(config: Optional[RunnableConfig] = None):
+    """Graph factory for LangGraph Platform (see langgraph.json)."""
+    return get_graph()
+
+
+def __getattr__(name: str):
+    # `from athena_agent.agent import graph` keeps working, built on first access
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Compile the graph - LangGraph Platform handles persistence automatically
-graph = graph_builder.compile()
 
 # Export the graph for LangGraph Platform
-__all__ = ['graph']
\ No newline at end of file
+__all__ = ['graph', 'make_graph', 'build_graph']
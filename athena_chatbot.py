@@ -1,53 +1,72 @@
 from typing import Annotated
 from typing_extensions import TypedDict
 from datetime import datetime
-import requests
 import json
+import os
+import threading
 import uuid
 import argparse
 
-from langchain.chat_models import init_chat_model
-from langchain_tavily import TavilySearch
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import InMemorySaver
 
-from config import GOOGLE_API_KEY, TAVILY_API_KEY, MEM0_API_KEY, LANGSMITH_API_KEY, LANGSMITH_PROJECT
+from config import (
+    GOOGLE_API_KEY, TAVILY_API_KEY, MEM0_API_KEY, MEMORY_BACKEND, LANGSMITH_API_KEY, LANGSMITH_PROJECT,
+    MEMORY_FETCH_TIMEOUT, MEMORY_OUTBOX_PATH, MEMORY_CACHE_MAX_USERS, MEMORY_CACHE_MAX_AGE,
+    MEMORY_TOP_K, MEMORY_TOKEN_BUDGET, MEMORY_FETCH_LIMIT, CHECKPOINT_KEEP, SEARCH_CACHE_MAX_ENTRIES,
+    METRICS_PORT, METRICS_FILE, METRICS_EXPORT_INTERVAL, validate_config
+)
+from context_utils import get_location_context, location_provider
+from lazy_utils import once
+from metrics import metrics, start_exporters
+from memory import fetch_memories, format_memory_context, memory_text, select_prompt_memories
+from tool_compaction import keep_recent_tool_results
 
-# Set up command-line arguments
-parser = argparse.ArgumentParser(description='Athena - Your Family Life Planning Assistant')
-parser.add_argument('-debug', '--debug', action='store_true', help='Enable debug mode for troubleshooting')
-args = parser.parse_args()
-DEBUG_MODE = args.debug
+# Set from the command line in main; importing this module has no side effects
+DEBUG_MODE = False
 
-# Set up LangSmith for monitoring (optional)
-if LANGSMITH_API_KEY:
-    import os
-    os.environ["LANGSMITH_API_KEY"] = LANGSMITH_API_KEY
-    os.environ["LANGSMITH_PROJECT"] = LANGSMITH_PROJECT
 
-# Set up API keys
-import os
-os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
+def parse_args(argv=None):
+    """Command-line arguments for the interactive assistant."""
+    parser = argparse.ArgumentParser(description='Athena - Your Family Life Planning Assistant')
+    parser.add_argument('-debug', '--debug', action='store_true', help='Enable debug mode for troubleshooting')
+    parser.add_argument('--thread', help='Resume an earlier conversation thread by its ID')
+    return parser.parse_args(argv)
 
-# Initialize Mem0 client if API key is available
-mem0_client = None
-if MEM0_API_KEY:
-    try:
-        from mem0 import MemoryClient
-        import warnings
-        # Suppress the specific mem0 deprecation warning
-        warnings.filterwarnings("ignore", category=DeprecationWarning, module="mem0")
-        mem0_client = MemoryClient(api_key=MEM0_API_KEY)
-        print("[SUCCESS] Mem0 memory system initialized successfully!")
-    except ImportError:
-        print("[WARNING] Mem0 library not installed. Run: pip install mem0ai")
-        mem0_client = None
-    except Exception as e:
-        print(f"[WARNING] Failed to initialize Mem0: {e}")
-        mem0_client = None
+
+def configure_environment():
+    """Export API keys for the client libraries and enable LangSmith if configured."""
+    validate_config()
+    if LANGSMITH_API_KEY:
+        os.environ["LANGSMITH_API_KEY"] = LANGSMITH_API_KEY
+        os.environ["LANGSMITH_PROJECT"] = LANGSMITH_PROJECT
+    os.environ["GOOGLE_API_KEY"] = GOOGLE_API_KEY
+    if TAVILY_API_KEY:
+        os.environ["TAVILY_API_KEY"] = TAVILY_API_KEY
+
+
+@once
+def get_memory_client():
+    """The cached memory client (hosted Mem0 or the local database), or None."""
+    from memory import create_memory_client, CachedMemoryClient
+    backend = create_memory_client(MEMORY_BACKEND, MEM0_API_KEY)
+    if not backend:
+        return None
+    return CachedMemoryClient(
+        backend,
+        max_users=MEMORY_CACHE_MAX_USERS,
+        max_age=MEMORY_CACHE_MAX_AGE
+    )
+
+
+@once
+def get_memory_outbox():
+    """Memory writes go through a durable outbox so they never delay a response."""
+    from memory import MemoryOutbox
+    client = get_memory_client()
+    return MemoryOutbox(client, MEMORY_OUTBOX_PATH).start() if client else None
 
 class State(TypedDict):
     # Messages have the type "list". The `add_messages` function
@@ -57,6 +76,8 @@ class State(TypedDict):
     context: dict
     # Mem0 user ID for persistent memory
     mem0_user_id: str
+    # Full payloads of compacted search results, by ref
+    tool_results: Annotated[dict, keep_recent_tool_results]
 
 def get_current_time_and_date():
     """Get current time and date in a user-friendly format."""
@@ -77,34 +98,6 @@ def get_current_time_and_date():
         "is_night": now.hour >= 21 or now.hour < 5
     }
 
-def get_location_context():
-    """Get location information (IP-based, can be enhanced with user input)."""
-    try:
-        # Get location from IP address (basic implementation)
-        response = requests.get('https://ipapi.co/json/', timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "city": data.get('city', 'Unknown'),
-                "region": data.get('region', 'Unknown'),
-                "country": data.get('country_name', 'Unknown'),
-                "timezone": data.get('timezone', 'Unknown'),
-                "latitude": data.get('latitude'),
-                "longitude": data.get('longitude')
-            }
-    except:
-        pass
-    
-    # Fallback if location detection fails
-    return {
-        "city": "Unknown",
-        "region": "Unknown", 
-        "country": "Unknown",
-        "timezone": "Unknown",
-        "latitude": None,
-        "longitude": None
-    }
-
 def create_context_aware_system_prompt():
     """Create a system prompt that includes real-time context."""
     time_info = get_current_time_and_date()
@@ -175,67 +168,41 @@ def update_context(state: State):
 
 def create_memory_enhanced_system_prompt(user_id: str, base_prompt: str, user_message: str = None):
     """Create a system prompt enhanced with relevant memories from Mem0."""
+    mem0_client = get_memory_client()
     if not mem0_client:
         if DEBUG_MODE:
             print("[DEBUG] No mem0_client available")
         return base_prompt
     
     try:
-        # First, get ALL memories for this user
+        # Fetch ALL memories and context-aware search results in parallel
         if DEBUG_MODE:
             print(f"[DEBUG] Fetching all memories for user: {user_id}")
-        all_memories = mem0_client.get_all(user_id=user_id)
+            if user_message:
+                print(f"[DEBUG] Searching memories for: {user_message}")
+        memories_list, results_list = fetch_memories(
+            mem0_client, user_id, user_message,
+            timeout=MEMORY_FETCH_TIMEOUT, limit=MEMORY_FETCH_LIMIT, metrics=metrics
+        )
+        
         if DEBUG_MODE:
-            print(f"[DEBUG] Raw all_memories response: {all_memories}")
+            print(f"[DEBUG] Found {len(memories_list)} memories")
+        memories_list, results_list = select_prompt_memories(
+            user_message or "", memories_list, results_list,
+            memory_limit=MEMORY_TOP_K, token_budget=MEMORY_TOKEN_BUDGET
+        )
         
-        memory_context = ""
-        if all_memories:
-            # Check different possible response structures
-            memories_list = None
-            if isinstance(all_memories, dict):
-                if 'results' in all_memories:
-                    memories_list = all_memories['results']
-                elif 'memories' in all_memories:
-                    memories_list = all_memories['memories']
-                else:
-                    if DEBUG_MODE:
-                        print(f"[DEBUG] Unexpected memory structure. Keys: {all_memories.keys()}")
-            elif isinstance(all_memories, list):
-                memories_list = all_memories
-            
-            if memories_list:
-                if DEBUG_MODE:
-                    print(f"[DEBUG] Found {len(memories_list)} memories")
-                memory_context = "\n\nSTORED FAMILY INFORMATION:\n"
-                for i, memory in enumerate(memories_list[:10]):
-                    memory_text = memory.get('memory', memory.get('text', str(memory)))
-                    if DEBUG_MODE:
-                        print(f"[DEBUG] Memory {i+1}: {memory_text}")
-                    memory_context += f"• {memory_text}\n"
-                memory_context += "\nIMPORTANT: Use this information to answer questions about the family. When asked about age, name, or other personal details, refer to these memories."
+        if DEBUG_MODE:
+            for i, memory in enumerate(memories_list):
+                print(f"[DEBUG] Memory {i+1}: {memory_text(memory)}")
+            for result in results_list:
+                print(f"[DEBUG] Search result: {memory_text(result)}")
         
-        # Also try context-aware search if user message is provided
-        if user_message:
-            if DEBUG_MODE:
-                print(f"[DEBUG] Searching memories for: {user_message}")
-            search_results = mem0_client.search(user_message, user_id=user_id)
-            if DEBUG_MODE:
-                print(f"[DEBUG] Raw search_results: {search_results}")
-            
-            if search_results:
-                results_list = None
-                if isinstance(search_results, dict) and 'results' in search_results:
-                    results_list = search_results['results']
-                elif isinstance(search_results, list):
-                    results_list = search_results
-                
-                if results_list:
-                    memory_context += "\n\nRELEVANT CONTEXT FOR THIS QUERY:\n"
-                    for result in results_list[:3]:
-                        result_text = result.get('memory', result.get('text', str(result)))
-                        if DEBUG_MODE:
-                            print(f"[DEBUG] Search result: {result_text}")
-                        memory_context += f"• {result_text}\n"
+        memory_context = format_memory_context(
+            memories_list,
+            results_list,
+            note="IMPORTANT: Use this information to answer questions about the family. When asked about age, name, or other personal details, refer to these memories."
+        )
         
         final_prompt = base_prompt + memory_context
         if DEBUG_MODE:
@@ -250,8 +217,9 @@ def create_memory_enhanced_system_prompt(user_id: str, base_prompt: str, user_me
         return base_prompt
 
 def store_interaction_in_memory(user_id: str, user_message: str, assistant_response: str):
-    """Store the interaction in Mem0 for future reference."""
-    if not mem0_client:
+    """Queue the interaction for storage in Mem0; delivery happens in the background."""
+    memory_outbox = get_memory_outbox()
+    if not memory_outbox:
         return
     
     try:
@@ -261,143 +229,157 @@ def store_interaction_in_memory(user_id: str, user_message: str, assistant_respo
             {"role": "user", "content": user_message},
             {"role": "assistant", "content": assistant_response}
         ]
-        mem0_client.add(messages, user_id=user_id)
+        memory_outbox.enqueue(user_id, messages)
     except Exception as e:
-        print(f"[WARNING] Failed to store memory: {e}")
+        print(f"[WARNING] Failed to queue memory: {e}")
 
-# Initialize the graph
-graph_builder = StateGraph(State)
+@once
+def get_llm():
+    """Gemini chat model, created on first use."""
+    from langchain.chat_models import init_chat_model
+    return init_chat_model("google_genai:gemini-2.0-flash")
 
-# Initialize Gemini 2.5 model
-llm = init_chat_model("google_genai:gemini-2.0-flash")
 
-# Set up web search tool (only if API key is available)
-if TAVILY_API_KEY:
-    os.environ["TAVILY_API_KEY"] = TAVILY_API_KEY
-    tool = TavilySearch(max_results=3)
-    tools = [tool]
-    llm_with_tools = llm.bind_tools(tools)
+@once
+def get_tools() -> list:
+    """Web search (only if an API key is available) plus the compacted-result lookup."""
+    if not TAVILY_API_KEY:
+        return []
+    from langchain_tavily import TavilySearch
+    from search_cache import CachedSearchTool, PooledTavilySearchAPIWrapper, SearchCache
+    from tool_compaction import make_expand_tool
     
-    def chatbot(state: State):
-        """The main chatbot node that processes user messages and generates responses."""
-        # Update context before processing
+    search = CachedSearchTool(
+        TavilySearch(max_results=3, api_wrapper=PooledTavilySearchAPIWrapper()),
+        SearchCache(SEARCH_CACHE_MAX_ENTRIES)
+    )
+    return [search, make_expand_tool()]
+
+
+@once
+def get_llm_with_tools():
+    """The chat model with web search bound when it is available."""
+    tools = get_tools()
+    return get_llm().bind_tools(tools) if tools else get_llm()
+
+
+def chatbot(state: State):
+    """The main chatbot node that processes user messages and generates responses."""
+    user_id = state.get("mem0_user_id", "default_user")
+    with metrics.time("chatbot", user_id):
+        return _chatbot_turn(state, user_id)
+
+def _chatbot_turn(state: State, user_id: str):
+    """One chatbot turn, with every stage timed into the metrics registry."""
+    # Update context before processing
+    with metrics.time("context", user_id):
         updated_state = update_context(state)
-        
-        # Create context-aware system prompt
+    
+    # Create context-aware system prompt
+    with metrics.time("prompt", user_id):
         base_system_prompt = create_context_aware_system_prompt()
-        
-        # Get the current user message for context-aware memory search
-        messages = state["messages"]
-        current_user_message = ""
-        if messages and isinstance(messages[-1], HumanMessage):
-            current_user_message = messages[-1].content
-        
-        # Enhance with memories if Mem0 is available
-        user_id = state.get("mem0_user_id", "default_user")
+    
+    # Get the current user message for context-aware memory search
+    messages = state["messages"]
+    current_user_message = ""
+    if messages and isinstance(messages[-1], HumanMessage):
+        current_user_message = messages[-1].content
+    
+    # Enhance with memories if Mem0 is available
+    with metrics.time("memory_fetch", user_id):
         system_prompt = create_memory_enhanced_system_prompt(user_id, base_system_prompt, current_user_message)
-        
-        if DEBUG_MODE:
-            print(f"[DEBUG] System prompt enhanced. Length: {len(system_prompt)} chars")
-            print(f"[DEBUG] First 200 chars of system prompt: {system_prompt[:200]}...")
-        
-        # Always update the system message with the latest memories
-        if messages and isinstance(messages[0], SystemMessage):
-            messages[0] = SystemMessage(content=system_prompt)
-        else:
-            messages = [SystemMessage(content=system_prompt)] + messages
-        
-        if DEBUG_MODE:
-            print(f"[DEBUG] Sending {len(messages)} messages to LLM")
-            print(f"[DEBUG] First message type: {type(messages[0]).__name__}")
-        
-        # Generate response
-        response = llm_with_tools.invoke(messages)
-        
-        # Store interaction in memory
-        if current_user_message:
+    
+    if DEBUG_MODE:
+        print(f"[DEBUG] System prompt enhanced. Length: {len(system_prompt)} chars")
+        print(f"[DEBUG] First 200 chars of system prompt: {system_prompt[:200]}...")
+    
+    # Always update the system message with the latest memories
+    if messages and isinstance(messages[0], SystemMessage):
+        messages[0] = SystemMessage(content=system_prompt)
+    else:
+        messages = [SystemMessage(content=system_prompt)] + messages
+    
+    if DEBUG_MODE:
+        print(f"[DEBUG] Sending {len(messages)} messages to LLM")
+        print(f"[DEBUG] First message type: {type(messages[0]).__name__}")
+    
+    # Generate response
+    with metrics.time("llm", user_id):
+        response = get_llm_with_tools().invoke(messages)
+    
+    # Store interaction in memory
+    if current_user_message:
+        with metrics.time("memory_store", user_id):
             store_interaction_in_memory(user_id, current_user_message, response.content)
-        
-        return {"messages": [response]}
+    
+    return {"messages": [response]}
+
+
+@once
+def get_checkpointer():
+    """Checkpointer for persistent conversations (survives restarts on SQLite)."""
+    from database.connection import DATABASE_URL
+    from database.checkpointer import SQLiteCheckpointSaver, sqlite_path_from_url
+    from langgraph.checkpoint.memory import InMemorySaver
+    
+    checkpoint_path = sqlite_path_from_url(DATABASE_URL)
+    if checkpoint_path:
+        return SQLiteCheckpointSaver(checkpoint_path, keep_last=CHECKPOINT_KEEP)
+    print("[WARNING] Conversation threads are kept in memory only (DATABASE_URL is not SQLite)")
+    return InMemorySaver()
+
+
+def build_graph(checkpointer=None):
+    """Build and compile the assistant graph."""
+    graph_builder = StateGraph(State)
     
     # Add the chatbot node
     graph_builder.add_node("chatbot", chatbot)
     
-    # Add tool node for web search
-    tool_node = ToolNode(tools=[tool])
-    graph_builder.add_node("tools", tool_node)
-    
-    # Add conditional edges to route between chatbot and tools
-    graph_builder.add_conditional_edges(
-        "chatbot",
-        tools_condition,
-    )
-    # Any time a tool is called, we return to the chatbot to decide the next step
-    graph_builder.add_edge("tools", "chatbot")
-    
-else:
-    # Fallback to basic chatbot without tools
-    def chatbot(state: State):
-        """The main chatbot node that processes user messages and generates responses."""
-        # Update context before processing
-        updated_state = update_context(state)
+    tools = get_tools()
+    if tools:
+        from langgraph.prebuilt import ToolNode, tools_condition
+        from tool_compaction import ToolResultCompactor
         
-        # Create context-aware system prompt
-        base_system_prompt = create_context_aware_system_prompt()
+        # Add tool node for web search
+        tool_node = ToolNode(tools=tools)
         
-        # Get the current user message for context-aware memory search
-        messages = state["messages"]
-        current_user_message = ""
-        if messages and isinstance(messages[-1], HumanMessage):
-            current_user_message = messages[-1].content
+        def run_tools(state: State, config: RunnableConfig):
+            with metrics.time("tools", state.get("mem0_user_id")):
+                return tool_node.invoke(state, config)
         
-        # Enhance with memories if Mem0 is available
-        user_id = state.get("mem0_user_id", "default_user")
-        system_prompt = create_memory_enhanced_system_prompt(user_id, base_system_prompt, current_user_message)
+        graph_builder.add_node("tools", run_tools)
+        graph_builder.add_node("compact", ToolResultCompactor(tool_names=[tools[0].name]))
         
-        if DEBUG_MODE:
-            print(f"[DEBUG] System prompt enhanced. Length: {len(system_prompt)} chars")
-            print(f"[DEBUG] First 200 chars of system prompt: {system_prompt[:200]}...")
-        
-        # Always update the system message with the latest memories
-        if messages and isinstance(messages[0], SystemMessage):
-            messages[0] = SystemMessage(content=system_prompt)
-        else:
-            messages = [SystemMessage(content=system_prompt)] + messages
-        
-        if DEBUG_MODE:
-            print(f"[DEBUG] Sending {len(messages)} messages to LLM")
-            print(f"[DEBUG] First message type: {type(messages[0]).__name__}")
-        
-        # Generate response
-        response = llm.invoke(messages)
-        
-        # Store interaction in memory
-        if current_user_message:
-            store_interaction_in_memory(user_id, current_user_message, response.content)
-        
-        return {"messages": [response]}
+        # Add conditional edges to route between chatbot and tools
+        graph_builder.add_conditional_edges(
+            "chatbot",
+            tools_condition,
+        )
+        # Any time a tool is called, results are compacted and we return to the chatbot
+        graph_builder.add_edge("tools", "compact")
+        graph_builder.add_edge("compact", "chatbot")
     
-    # Add the chatbot node
-    graph_builder.add_node("chatbot", chatbot)
-
-# Add entry point
-graph_builder.add_edge(START, "chatbot")
-
-# Add exit point
-graph_builder.add_edge("chatbot", END)
+    # Add entry point
+    graph_builder.add_edge(START, "chatbot")
+    
+    # Add exit point
+    graph_builder.add_edge("chatbot", END)
+    
+    return graph_builder.compile(checkpointer=checkpointer)
 
-# Create memory checkpointer for persistent conversations
-memory = InMemorySaver()
 
-# Compile the graph with memory checkpointer
-graph = graph_builder.compile(checkpointer=memory)
+@once
+def get_graph():
+    """The compiled graph with the conversation checkpointer."""
+    return build_graph(checkpointer=get_checkpointer())
 
 def stream_graph_updates(user_input: str, config: dict, user_id: str):
     """Stream the chatbot responses for better user experience with memory support."""
     # Initialize context for new conversation if not exists
     initial_context = initialize_context()
     
-    for event in graph.stream({
+    for event in get_graph().stream({
         "messages": [HumanMessage(content=user_input)],
         "context": initial_context,
         "mem0_user_id": user_id
@@ -407,9 +389,23 @@ def stream_graph_updates(user_input: str, config: dict, user_id: str):
             last_message = event["messages"][-1]
             if hasattr(last_message, 'content') and not isinstance(last_message, HumanMessage):
                 print("Athena:", last_message.content)
+    
+    # Commit this turn's checkpoints in one batch
+    checkpointer = get_checkpointer()
+    if hasattr(checkpointer, "flush"):
+        checkpointer.flush()
 
-def run_chatbot():
+def run_chatbot(args):
     """Run the interactive chatbot with memory support."""
+    from http_clients import HTTP_WARMUP, warm_up
+    
+    # Build clients and the graph while the banner prints and the location loads
+    graph_ready = threading.Thread(target=get_graph, name="athena-graph-init", daemon=True)
+    graph_ready.start()
+    start_exporters(METRICS_PORT, METRICS_FILE, METRICS_EXPORT_INTERVAL)
+    mem0_client = get_memory_client()
+    memory_outbox = get_memory_outbox()
+    
     print("[ATHENA] Welcome to Athena - Your Family Life Planning Assistant!")
     print("I'm here to help you plan and organize your family's life.")
     
@@ -421,7 +417,13 @@ def run_chatbot():
     else:
         print("[INFO] Session memory only - Get a Mem0 API key for persistent learning across sessions")
     
-    # Display current context
+    # Open search and model connections while we wait for the location
+    if HTTP_WARMUP:
+        from langchain_tavily._utilities import TAVILY_API_URL
+        warm_up([TAVILY_API_URL] if TAVILY_API_KEY else [], llm=get_llm())
+    
+    # Display current context (startup is the one place we wait for a location)
+    location_provider.refresh()
     time_info = get_current_time_and_date()
     location_info = get_location_context()
     
@@ -445,16 +447,26 @@ def run_chatbot():
     user_id = "athena_family_001"  # You can make this configurable
     print(f"[INFO] Family ID: {user_id}")
     
-    # Generate a unique thread ID for this conversation session
-    thread_id = str(uuid.uuid4())
+    graph_ready.join()
+    graph = get_graph()
+    
+    # Resume the requested thread, or generate a unique one for this session
+    thread_id = args.thread or str(uuid.uuid4())
     config = {"configurable": {"thread_id": thread_id}}
     
-    print(f"[INFO] Conversation Thread: {thread_id[:8]}...\n")
+    if args.thread:
+        resumed = graph.get_state(config).values.get('messages', [])
+        print(f"[INFO] Resumed Conversation Thread: {thread_id} ({len(resumed)} messages)\n")
+    else:
+        print(f"[INFO] Conversation Thread: {thread_id}")
+        print(f"[TIP] Resume it later with: python athena_chatbot.py --thread {thread_id}\n")
     
     while True:
         try:
             user_input = input("You: ")
             if user_input.lower() in ["quit", "exit", "q"]:
+                if memory_outbox and not memory_outbox.flush(timeout=10):
+                    print(f"[INFO] {memory_outbox.pending_count()} memories will be saved next time Athena starts")
                 print("[GOODBYE] Thank you for using Athena! I'll remember our conversation for next time!")
                 break
             elif user_input.lower() == "new":
@@ -510,6 +522,20 @@ def run_chatbot():
                 print(f"\n[DEBUG] System Prompt Preview (first 500 chars):")
                 print(enhanced_prompt[:500])
                 print(f"\n[DEBUG] Total System Prompt Length: {len(enhanced_prompt)} chars")
+                if mem0_client:
+                    cache_stats = mem0_client.stats()
+                    print(f"[DEBUG] Memory cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                          f"({cache_stats['hit_rate']:.0%} hit rate)")
+                if TAVILY_API_KEY:
+                    search_stats = get_tools()[0].cache.stats()
+                    print(f"[DEBUG] Search cache: {search_stats['hits']} hits, {search_stats['coalesced']} merged, "
+                          f"{search_stats['upstream_calls']} searches sent")
+                stage_stats = metrics.summary()
+                if stage_stats:
+                    print("[DEBUG] Stage latency (ms):")
+                    for stage, stats in stage_stats.items():
+                        print(f"  {stage:<14} n={stats['count']:<4} p50={stats['p50_ms']:<8} "
+                              f"p95={stats['p95_ms']:<8} p99={stats['p99_ms']}")
                 
                 # Show message structure
                 snapshot = graph.get_state(config)
@@ -532,7 +558,10 @@ def run_chatbot():
             print("Please try again or type 'quit' to exit.")
 
 if __name__ == "__main__":
+    args = parse_args()
+    DEBUG_MODE = args.debug
+    configure_environment()
     # Show usage hint if debug mode is not enabled
     if not DEBUG_MODE:
         print("[TIP] Run with -debug flag for troubleshooting (python athena_chatbot.py -debug)")
-    run_chatbot()
+    run_chatbot(args)
@@ -1,10 +1,60 @@
-from .auth_utils import hash_password, verify_password, create_access_token, verify_token
-from .user_service import UserService
+"""
+Authentication: password hashing, JWTs, caches and the user service.
+
+Names are imported from their modules on first access, so ``import
+auth.auth_utils`` (and every bulk-hashing worker process, which unpickles
+``hash_password`` from it) does not load SQLAlchemy, the models or the engine.
+"""
+
+import importlib
+
+# These share their module's name, so they are bound eagerly (both are stdlib-only)
+from .preference_cache import PreferenceCache, preference_cache
+from .token_cache import VerifiedTokenCache, token_cache
+
+_EXPORTS = {
+    'hash_password': '.auth_utils',
+    'verify_password': '.auth_utils',
+    'create_access_token': '.auth_utils',
+    'verify_token': '.auth_utils',
+    'BulkCreateResult': '.bulk_users',
+    'BulkPasswordHasher': '.bulk_users',
+    'ahash_password': '.password_pool',
+    'averify_password': '.password_pool',
+    'get_password_pool': '.password_pool',
+    'PasswordHashingPool': '.password_pool',
+    'PasswordPoolBusy': '.password_pool',
+    'ProfileDigestCache': '.profile_digest',
+    'profile_digests': '.profile_digest',
+    'UserService': '.user_service',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'hash_password',
-    'verify_password', 
+    'verify_password',
     'create_access_token',
     'verify_token',
+    'ahash_password',
+    'averify_password',
+    'get_password_pool',
+    'PasswordHashingPool',
+    'PasswordPoolBusy',
+    'BulkCreateResult',
+    'BulkPasswordHasher',
+    'PreferenceCache',
+    'preference_cache',
+    'ProfileDigestCache',
+    'profile_digests',
+    'VerifiedTokenCache',
+    'token_cache',
     'UserService'
-]
\ No newline at end of file
+]
@@ -4,6 +4,8 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
+from .token_cache import token_cache
+
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
@@ -64,14 +66,20 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Verify and decode a JWT token.
     
+    Tokens verified before are answered from the token cache until they expire.
+    
     Args:
         token: JWT token string to verify
         
     Returns:
         Decoded token data if valid, None otherwise
     """
+    payload = token_cache.get_payload(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.put_payload(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         print("Token has expired")
@@ -0,0 +1,107 @@
+"""
+Helpers for provisioning many users at once (household onboarding, account
+migrations). See ``UserService.bulk_create_users``.
+
+bcrypt dominates the cost of creating a user, so passwords are hashed a batch
+at a time across worker processes; the rows of a batch are then inserted in a
+single transaction.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .auth_utils import hash_password
+
+# Worker processes used to hash passwords, and users inserted per transaction
+BULK_HASH_PROCESSES = int(os.getenv("BULK_HASH_PROCESSES", str(os.cpu_count() or 1)))
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "200"))
+
+
+class BulkCreateResult:
+    """Outcome of one record passed to ``bulk_create_users``."""
+
+    __slots__ = ("index", "email", "username", "user_id", "mem0_user_id", "error")
+
+    def __init__(self, index: int, email: Optional[str], username: Optional[str]):
+        self.index = index
+        self.email = email
+        self.username = username
+        self.user_id: Optional[str] = None
+        self.mem0_user_id: Optional[str] = None
+        self.error: Optional[str] = None
+
+    @property
+    def created(self) -> bool:
+        return self.user_id is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "email": self.email,
+            "username": self.username,
+            "user_id": self.user_id,
+            "mem0_user_id": self.mem0_user_id,
+            "error": self.error
+        }
+
+    def __repr__(self):
+        outcome = self.user_id if self.created else f"error={self.error!r}"
+        return f"<BulkCreateResult(index={self.index}, username={self.username}, {outcome})>"
+
+
+class BulkPasswordHasher:
+    """Hashes lists of passwords on a pool of worker processes, started on first use."""
+
+    def __init__(self, processes: Optional[int] = None):
+        """
+        Args:
+            processes: Worker processes (0 or 1 hashes in the calling process)
+        """
+        self.processes = BULK_HASH_PROCESSES if processes is None else processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def hash_all(self, passwords: List[str]) -> List[str]:
+        """Hashes of ``passwords``, in order."""
+        if self.processes <= 1 or len(passwords) <= 1:
+            return [hash_password(password) for password in passwords]
+        if self._executor is None:
+            # spawn: forking a process that runs writer and exporter threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        chunksize = max(1, len(passwords) // (self.processes * 4))
+        return list(self._executor.map(hash_password, passwords, chunksize=chunksize))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "BulkPasswordHasher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def batched(records: Iterable[Mapping[str, Any]], size: int) -> Iterator[List[Tuple[int, Mapping[str, Any]]]]:
+    """(index, record) pairs in lists of ``size``, without reading ahead of the current batch."""
+    numbered = enumerate(records)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+
+def record_error(record: Mapping[str, Any]) -> Optional[str]:
+    """Why a record cannot be created, or None if it has every required field."""
+    for field in ("email", "username"):
+        if not record.get(field):
+            return f"missing {field}"
+    if not record.get("password") and not record.get("password_hash"):
+        return "missing password"
+    return None
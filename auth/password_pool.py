@@ -0,0 +1,139 @@
+"""
+Bounded thread pool for bcrypt work in the auth path.
+
+bcrypt is deliberately slow (tens to hundreds of milliseconds per call) and
+releases the GIL while it runs, so async callers hand it to a small dedicated
+pool instead of blocking the event loop that is also streaming chat replies.
+The pool admits a bounded number of waiting calls; beyond that it rejects
+immediately with ``PasswordPoolBusy`` so a login burst cannot build an
+unbounded backlog. Queue depth, in-flight calls and wait/run times are
+recorded in the metrics registry.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from lazy_utils import once
+from metrics import StageMetrics, metrics as default_metrics
+
+from .auth_utils import hash_password, verify_password
+
+# bcrypt calls run at once, and calls allowed to wait for a worker
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "64"))
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when too many password operations are already waiting."""
+
+
+class PasswordHashingPool:
+    """Runs bcrypt hashing and verification on a bounded set of worker threads."""
+
+    def __init__(
+        self,
+        max_workers: int = BCRYPT_WORKERS,
+        max_queue: int = BCRYPT_MAX_QUEUE,
+        metrics: Optional[StageMetrics] = None
+    ):
+        """
+        Args:
+            max_workers: bcrypt calls run at once
+            max_queue: Calls allowed to wait for a worker before new ones are rejected
+            metrics: Registry for queue wait and bcrypt run times
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.metrics = metrics
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="athena-bcrypt")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, operation: str, func: Callable[..., Any], *args) -> Future:
+        """
+        Queue ``func(*args)`` on the pool.
+
+        Raises:
+            PasswordPoolBusy: If max_queue calls are already waiting
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy(f"{self.queued} password operations already waiting")
+            self.queued += 1
+            self.submitted += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        enqueued = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.running -= 1
+                if self.metrics is not None:
+                    self.metrics.observe("bcrypt_queue_wait", started - enqueued)
+                    self.metrics.observe(f"bcrypt_{operation}", finished - started)
+
+        return self._executor.submit(task)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit("hash", hash_password, password))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit("verify", verify_password, plain_password, hashed_password))
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth, in-flight calls and totals."""
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "workers": self.max_workers
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+@once
+def get_password_pool() -> PasswordHashingPool:
+    """The process-wide pool, with its queue depth exposed as Prometheus gauges."""
+    pool = PasswordHashingPool(metrics=default_metrics)
+    default_metrics.register_gauge(
+        "athena_auth_bcrypt_queue_depth", "Password operations waiting for a bcrypt worker",
+        lambda: pool.stats()["queued"]
+    )
+    default_metrics.register_gauge(
+        "athena_auth_bcrypt_in_flight", "Password operations running on a bcrypt worker",
+        lambda: pool.stats()["running"]
+    )
+    return pool
+
+
+async def ahash_password(password: str) -> str:
+    """Async ``hash_password`` on the shared bcrypt pool."""
+    return await get_password_pool().hash(password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Async ``verify_password`` on the shared bcrypt pool."""
+    return await get_password_pool().verify(plain_password, hashed_password)
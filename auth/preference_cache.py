@@ -0,0 +1,86 @@
+"""
+Per-user cache of parsed preferences.
+
+Preferences are read on every chat turn but written rarely, so each user's
+rows are loaded once into a read-only mapping and served from memory until
+UserService writes that user's preferences again. A cache hit is one dict
+lookup, without taking a lock.
+"""
+
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+PREFERENCE_CACHE_MAX_USERS = int(os.getenv("PREFERENCE_CACHE_MAX_USERS", "4096"))
+
+
+class PreferenceCache:
+    """Bounded map of user id -> read-only preferences mapping."""
+
+    def __init__(self, max_users: int = PREFERENCE_CACHE_MAX_USERS):
+        """
+        Args:
+            max_users: Users kept before the longest-cached is evicted
+        """
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Mapping[str, Any]] = {}
+        # Bumped on every invalidation so a load racing with a write is not cached
+        self._versions: Dict[str, int] = {}
+
+    def get(self, user_id: str) -> Optional[Mapping[str, Any]]:
+        """The cached preferences, or None if they have to be loaded."""
+        return self._entries.get(user_id)
+
+    def version(self, user_id: str) -> int:
+        """Token to pass to ``put`` after loading, taken before the load starts."""
+        return self._versions.get(user_id, 0)
+
+    def put(self, user_id: str, preferences: Dict[str, Any], version: int) -> Mapping[str, Any]:
+        """
+        Cache freshly loaded preferences, unless they were written since ``version``.
+
+        Returns:
+            The read-only mapping handed to callers
+        """
+        frozen = MappingProxyType(dict(preferences))
+        with self._lock:
+            if self._versions.get(user_id, 0) != version:
+                return frozen
+            if user_id not in self._entries and len(self._entries) >= self.max_users:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[user_id] = frozen
+        return frozen
+
+    def invalidate(self, user_id: str):
+        """Forget a user's preferences after they change."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def typed_preference(value: Any, default: T) -> T:
+    """``value`` if it has the same type as ``default`` (ints pass for floats), else ``default``."""
+    if default is None or value is None:
+        return default if value is None else value
+    expected = type(default)
+    if isinstance(value, bool) and expected is not bool:
+        return default
+    if expected is float and isinstance(value, int):
+        return float(value)
+    return value if isinstance(value, expected) else default
+
+
+# Process-wide cache used by UserService
+preference_cache = PreferenceCache()
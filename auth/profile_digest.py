@@ -0,0 +1,142 @@
+"""
+Cached per-user profile digest for the system prompt.
+
+Stable facts from the account (name, username, preferences) are rendered once
+into a short prompt section and kept in memory, so the chat path reads them
+with a dict lookup instead of a query or a memory search. Entries are found by
+the user's id or their mem0_user_id (the id the agent sees). UserService
+refreshes a user's digest when it updates the account and drops it when the
+account or its preferences change otherwise; every digest also expires after
+PROFILE_DIGEST_MAX_AGE, so changes made by another process are picked up.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from database.models import User
+
+PROFILE_DIGEST_MAX_USERS = int(os.getenv("PROFILE_DIGEST_MAX_USERS", "4096"))
+# Seconds a digest is served before it is rebuilt from the database
+PROFILE_DIGEST_MAX_AGE = float(os.getenv("PROFILE_DIGEST_MAX_AGE", "300"))
+# Seconds an unknown user id is remembered as having no profile
+PROFILE_DIGEST_MISS_TTL = float(os.getenv("PROFILE_DIGEST_MISS_TTL", "300"))
+
+_HEADER = "\n\nUSER PROFILE (from their Athena account; use it directly, it does not need a memory search):\n"
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_format_value(item)}" for key, item in value.items())
+    return str(value)
+
+
+def render_profile_digest(user: User, preferences: Mapping[str, Any]) -> str:
+    """The prompt section for a user's account and preferences."""
+    lines = []
+    name = " ".join(part for part in (user.first_name, user.last_name) if part)
+    if name:
+        lines.append(f"- Name: {name}")
+    lines.append(f"- Username: {user.username}")
+    for key, value in sorted(preferences.items()):
+        if value not in (None, "", [], {}):
+            lines.append(f"- {key.replace('_', ' ').capitalize()}: {_format_value(value)}")
+    return _HEADER + "\n".join(lines)
+
+
+class ProfileDigestCache:
+    """Bounded map of user id -> rendered profile digest ("" for users with no account)."""
+
+    def __init__(
+        self,
+        max_users: int = PROFILE_DIGEST_MAX_USERS,
+        max_age: float = PROFILE_DIGEST_MAX_AGE,
+        miss_ttl: float = PROFILE_DIGEST_MISS_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_users: Digests kept before the longest-cached is evicted
+            max_age: Seconds an account's digest is served before it is reloaded
+            miss_ttl: Seconds an id without an account is remembered as such
+            clock: Monotonic time source for expiry
+        """
+        self.max_users = max_users
+        self.max_age = max_age
+        self.miss_ttl = miss_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Keyed by User.id, each entry is (digest, expires_at)
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._aliases: Dict[str, str] = {}
+        # Bumped by every write, so a load that raced with any write is not cached
+        # (a load may start from either id, and only learns the other one at the end)
+        self._generation = 0
+
+    def get(self, user_id: str) -> Optional[str]:
+        """The cached digest, or None if it has to be loaded."""
+        entry = self._entries.get(self._aliases.get(user_id, user_id))
+        if entry is None:
+            return None
+        digest, expires_at = entry
+        if self.clock() >= expires_at:
+            return None
+        return digest
+
+    def version(self) -> int:
+        """Token to pass to ``put`` after loading, taken before the load starts."""
+        return self._generation
+
+    def put(self, user: User, digest: str, version: Optional[int] = None):
+        """
+        Cache a user's digest.
+
+        A load passes the ``version`` it started from and is dropped if any
+        digest was written meanwhile; a refresh after a write passes None and wins.
+        """
+        with self._lock:
+            if version is not None and version != self._generation:
+                return
+            if version is None:
+                self._generation += 1
+            self._store(user.id, (digest, self.clock() + self.max_age))
+            if user.mem0_user_id:
+                self._aliases[user.mem0_user_id] = user.id
+
+    def put_missing(self, user_id: str, version: int):
+        """Remember for a while that an id has no account behind it."""
+        with self._lock:
+            if version != self._generation:
+                return
+            self._store(user_id, ("", self.clock() + self.miss_ttl))
+
+    def invalidate(self, user_id: str):
+        """Drop a user's digest, by id or mem0_user_id."""
+        with self._lock:
+            user_id = self._aliases.get(user_id, user_id)
+            self._entries.pop(user_id, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+
+    def _store(self, key: str, entry: Tuple[str, float]):
+        # Caller holds the lock
+        if key not in self._entries and len(self._entries) >= self.max_users:
+            evicted = next(iter(self._entries))
+            del self._entries[evicted]
+            for alias in [alias for alias, target in self._aliases.items() if target == evicted]:
+                del self._aliases[alias]
+        self._entries[key] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache used by UserService and the agent
+profile_digests = ProfileDigestCache()
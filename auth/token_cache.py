@@ -0,0 +1,187 @@
+"""
+Cache of verified JWT payloads and the users they resolve to.
+
+Streaming clients send the same bearer token with every request. Once a token
+has been verified, its payload (and the ``User`` it belongs to) is kept in a
+bounded LRU map keyed by a SHA-256 digest of the token, until the token's own
+``exp``. Users are cached as detached snapshots and merged into the caller's
+session without a query. Entries are dropped when UserService changes the
+account, and their user is refreshed on login. SQLAlchemy and the models are
+only imported once a user is cached, so ``verify_token`` stays cheap to import.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from database.models import User
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
+
+def token_digest(token: str) -> str:
+    """Cache key for a token; the token itself is never stored."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def detached_copy(user: "User") -> "User":
+    """A snapshot of a loaded user that can be merged into any session without a query."""
+    from sqlalchemy.orm import make_transient_to_detached
+
+    from database.models import User
+
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class _TokenEntry:
+    __slots__ = ("payload", "expires_at", "user_id", "user")
+
+    def __init__(self, payload: Dict[str, Any], expires_at: float):
+        self.payload = payload
+        self.expires_at = expires_at
+        self.user_id = payload.get("user_id")
+        self.user: Optional["User"] = None
+
+
+class VerifiedTokenCache:
+    """Bounded LRU map of token digest -> verified payload and resolved user."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_entries: Tokens kept before the least recently used is evicted
+            clock: Wall-clock source compared against the tokens' ``exp``
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _TokenEntry]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _live_entry(self, token: str) -> Optional[_TokenEntry]:
+        # Caller holds the lock
+        key = token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() >= entry.expires_at:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry and entry.user_id in self._by_user:
+            self._by_user[entry.user_id].discard(key)
+            if not self._by_user[entry.user_id]:
+                del self._by_user[entry.user_id]
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """The verified payload, if the token was verified before and has not expired."""
+        with self._lock:
+            entry = self._live_entry(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entry.payload)
+
+    def put_payload(self, token: str, payload: Dict[str, Any]):
+        """Remember a verified payload until its ``exp`` (tokens without one are not cached)."""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = token_digest(token)
+        with self._lock:
+            self._drop(key)
+            entry = _TokenEntry(dict(payload), float(expires_at))
+            self._entries[key] = entry
+            if entry.user_id:
+                self._by_user.setdefault(entry.user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def _user_snapshot(self, token: str) -> Optional["User"]:
+        with self._lock:
+            entry = self._live_entry(token)
+            return entry.user if entry else None
+
+    def get_user(self, token: str, db: "Session") -> Optional["User"]:
+        """The token's cached user, attached to ``db`` without querying the database."""
+        snapshot = self._user_snapshot(token)
+        if snapshot is None:
+            return None
+        # An instance the session already holds wins over the snapshot
+        existing = db.identity_map.get(db.identity_key(type(snapshot), snapshot.id))
+        if existing is not None:
+            return existing
+        return db.merge(snapshot, load=False)
+
+    async def aget_user(self, token: str, db: "AsyncSession") -> Optional["User"]:
+        """``get_user`` for an AsyncSession."""
+        snapshot = self._user_snapshot(token)
+        if snapshot is None:
+            return None
+        existing = db.identity_map.get(db.sync_session.identity_key(type(snapshot), snapshot.id))
+        if existing is not None:
+            return existing
+        return await db.merge(snapshot, load=False)
+
+    def put_user(self, token: str, user: "User"):
+        """Attach the resolved user to an already verified token."""
+        snapshot = detached_copy(user)
+        with self._lock:
+            entry = self._live_entry(token)
+            if entry is not None and entry.user_id == user.id:
+                entry.user = snapshot
+
+    def refresh_user(self, user: "User"):
+        """Replace the cached user of every token of ``user``, keeping the verified payloads."""
+        with self._lock:
+            keys = [key for key in self._by_user.get(user.id, ()) if self._entries[key].user is not None]
+        if not keys:
+            return
+        snapshot = detached_copy(user)
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.user = snapshot
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached token of a user whose account changed."""
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+# Process-wide cache used by verify_token and UserService
+token_cache = VerifiedTokenCache()
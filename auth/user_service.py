@@ -1,10 +1,22 @@
-from typing import Optional
+import uuid
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar, Union
 from datetime import datetime
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from database.models import User
-from .auth_utils import hash_password, verify_password
+from database.models import User, UserPreference
+from database.user_writes import get_user_writer
+from .auth_utils import hash_password, verify_password, verify_token
+from .bulk_users import BULK_INSERT_BATCH_SIZE, BulkCreateResult, BulkPasswordHasher, batched, record_error
+from .password_pool import ahash_password, averify_password
+from .preference_cache import preference_cache, typed_preference
+from .profile_digest import profile_digests, render_profile_digest
+from .token_cache import token_cache
+
+T = TypeVar("T")
 
 class UserService:
     """Service class for user-related operations."""
@@ -32,25 +44,71 @@ class UserService:
         Returns:
             Created User object or None if creation failed
         """
+        return UserService._insert_user(
+            db, email, username, hash_password(password), first_name, last_name
+        )
+    
+    @staticmethod
+    async def acreate_user(
+        db: Union[Session, AsyncSession],
+        email: str,
+        username: str,
+        password: str,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None
+    ) -> Optional[User]:
+        """
+        Async create_user: the password is hashed on the bcrypt pool so the
+        event loop keeps serving other requests meanwhile. With an AsyncSession
+        the insert is awaited as well.
+        
+        Raises:
+            PasswordPoolBusy: If the bcrypt pool's queue is full
+        """
+        hashed_password = await ahash_password(password)
+        if isinstance(db, AsyncSession):
+            return await UserService._ainsert_user(db, email, username, hashed_password, first_name, last_name)
+        return UserService._insert_user(db, email, username, hashed_password, first_name, last_name)
+    
+    @staticmethod
+    def _new_user(
+        email: str,
+        username: str,
+        hashed_password: str,
+        first_name: Optional[str],
+        last_name: Optional[str]
+    ) -> User:
+        # The ID is assigned up front so mem0_user_id goes in with the same commit
+        user = User(
+            id=str(uuid.uuid4()),
+            email=email,
+            username=username,
+            password_hash=hashed_password,
+            first_name=first_name,
+            last_name=last_name
+        )
+        user.get_mem0_user_id()
+        # The agent may already have seen this id and remembered it as unknown
+        profile_digests.invalidate(user.mem0_user_id)
+        return user
+    
+    @staticmethod
+    def _insert_user(
+        db: Session,
+        email: str,
+        username: str,
+        hashed_password: str,
+        first_name: Optional[str],
+        last_name: Optional[str]
+    ) -> Optional[User]:
         try:
-            hashed_password = hash_password(password)
+            user = UserService._new_user(email, username, hashed_password, first_name, last_name)
             
-            user = User(
-                email=email,
-                username=username,
-                password_hash=hashed_password,
-                first_name=first_name,
-                last_name=last_name
-            )
-            
-            db.add(user)
-            db.commit()
+            with get_user_writer(db.get_bind()).critical():
+                db.add(user)
+                db.commit()
             db.refresh(user)
             
-            # Set mem0_user_id after commit when ID is available
-            user.mem0_user_id = user.get_mem0_user_id()
-            db.commit()
-            
             return user
         except IntegrityError as e:
             db.rollback()
@@ -61,6 +119,144 @@ class UserService:
             print(f"User creation failed: {e}")
             return None
     
+    @staticmethod
+    async def _ainsert_user(
+        db: AsyncSession,
+        email: str,
+        username: str,
+        hashed_password: str,
+        first_name: Optional[str],
+        last_name: Optional[str]
+    ) -> Optional[User]:
+        # Concurrent SQLite writers wait on busy_timeout rather than the
+        # writer's thread lock, which cannot be held across an await
+        try:
+            user = UserService._new_user(email, username, hashed_password, first_name, last_name)
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
+            return user
+        except IntegrityError as e:
+            await db.rollback()
+            print(f"User creation failed - duplicate email or username: {e}")
+            return None
+        except Exception as e:
+            await db.rollback()
+            print(f"User creation failed: {e}")
+            return None
+    
+    @staticmethod
+    def bulk_create_users(
+        db: Session,
+        records: Iterable[Mapping[str, Any]],
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        processes: Optional[int] = None
+    ) -> Iterator[BulkCreateResult]:
+        """
+        Create many users, yielding one result per record as each batch lands.
+        
+        Records are dicts with email, username, first_name, last_name and
+        either a plain "password" or an existing bcrypt "password_hash" (for
+        migrations). Passwords are hashed across worker processes, and each
+        batch is inserted in one transaction. Duplicates, within the input or
+        against existing accounts, are reported per record instead of failing
+        the batch.
+        
+        Args:
+            db: Database session
+            records: User records; consumed lazily, one batch at a time
+            batch_size: Records hashed and inserted together
+            processes: Hashing processes (default BULK_HASH_PROCESSES; 0 hashes in-process)
+            
+        Yields:
+            BulkCreateResult in input order, with user_id set or error explaining why not
+        """
+        seen_emails: Set[str] = set()
+        seen_usernames: Set[str] = set()
+        with BulkPasswordHasher(processes) as hasher:
+            for batch in batched(records, batch_size):
+                yield from UserService._bulk_insert_batch(db, batch, hasher, seen_emails, seen_usernames)
+    
+    @staticmethod
+    def _bulk_insert_batch(
+        db: Session,
+        batch: List[Tuple[int, Mapping[str, Any]]],
+        hasher: BulkPasswordHasher,
+        seen_emails: Set[str],
+        seen_usernames: Set[str]
+    ) -> List[BulkCreateResult]:
+        results = [BulkCreateResult(index, record.get("email"), record.get("username")) for index, record in batch]
+        valid = []
+        for result, (_, record) in zip(results, batch):
+            result.error = record_error(record)
+            if result.error is None:
+                valid.append((result, record))
+        
+        # One query per column for the whole batch instead of one per record
+        emails = [record["email"] for _, record in valid]
+        usernames = [record["username"] for _, record in valid]
+        taken_emails = {row[0] for row in db.query(User.email).filter(User.email.in_(emails))} if emails else set()
+        taken_usernames = {row[0] for row in db.query(User.username).filter(User.username.in_(usernames))} if usernames else set()
+        
+        accepted = []
+        for result, record in valid:
+            if record["email"] in taken_emails or record["email"] in seen_emails:
+                result.error = "duplicate email"
+            elif record["username"] in taken_usernames or record["username"] in seen_usernames:
+                result.error = "duplicate username"
+            else:
+                seen_emails.add(record["email"])
+                seen_usernames.add(record["username"])
+                accepted.append((result, record))
+        if not accepted:
+            return results
+        
+        to_hash = [record["password"] for _, record in accepted if not record.get("password_hash")]
+        hashes = iter(hasher.hash_all(to_hash))
+        rows = []
+        for result, record in accepted:
+            user = UserService._new_user(
+                record["email"], record["username"], record.get("password_hash") or next(hashes),
+                record.get("first_name"), record.get("last_name")
+            )
+            # Taken before the commit expires the instance, so reporting needs no reload
+            result.user_id, result.mem0_user_id = user.id, user.mem0_user_id
+            rows.append((result, user))
+        
+        def fail(result: BulkCreateResult, error: str):
+            result.user_id = result.mem0_user_id = None
+            result.error = error
+            # The names are free again for later records of this import
+            seen_emails.discard(result.email)
+            seen_usernames.discard(result.username)
+        
+        writer = get_user_writer(db.get_bind())
+        try:
+            with writer.critical():
+                db.add_all([user for _, user in rows])
+                db.commit()
+        except IntegrityError:
+            # Something else took a name since the check: find the offenders row by row
+            db.rollback()
+            for result, user in rows:
+                try:
+                    with writer.critical():
+                        db.add(user)
+                        db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    fail(result, "duplicate email or username")
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    fail(result, f"database error: {type(e).__name__}")
+        except SQLAlchemyError as e:
+            # Locked or unreachable database: nothing in this batch was written
+            db.rollback()
+            print(f"[WARNING] Bulk insert of {len(rows)} users failed: {e}")
+            for result, _ in rows:
+                fail(result, f"database error: {type(e).__name__}")
+        return results
+    
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email address."""
@@ -76,6 +272,70 @@ class UserService:
         """Get user by ID."""
         return db.query(User).filter(User.id == user_id).first()
     
+    @staticmethod
+    async def aget_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Async get_user_by_email."""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def aget_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """Async get_user_by_username."""
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def aget_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+        """Async get_user_by_id."""
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+    
+    @staticmethod
+    def get_user_from_token(db: Session, token: str) -> Optional[User]:
+        """
+        Resolve a bearer token to its active user.
+        
+        Repeat calls with the same token are served from the token cache
+        without decoding the JWT or querying the database.
+        
+        Args:
+            db: Database session
+            token: JWT access token carrying a "user_id" claim
+            
+        Returns:
+            The User, or None if the token is invalid or the account inactive
+        """
+        payload = verify_token(token)
+        if not payload:
+            return None
+        
+        user = token_cache.get_user(token, db)
+        if user is not None:
+            return user
+        
+        user = UserService.get_user_by_id(db, payload.get("user_id"))
+        if not user or not user.is_active:
+            return None
+        token_cache.put_user(token, user)
+        return user
+    
+    @staticmethod
+    async def aget_user_from_token(db: AsyncSession, token: str) -> Optional[User]:
+        """Async get_user_from_token; cached users are attached without a query."""
+        payload = verify_token(token)
+        if not payload:
+            return None
+        
+        user = await token_cache.aget_user(token, db)
+        if user is not None:
+            return user
+        
+        user = await UserService.aget_user_by_id(db, payload.get("user_id"))
+        if not user or not user.is_active:
+            return None
+        token_cache.put_user(token, user)
+        return user
+    
     @staticmethod
     def authenticate_user(
         db: Session,
@@ -93,19 +353,51 @@ class UserService:
         Returns:
             User object if authentication successful, None otherwise
         """
-        user = UserService.get_user_by_email(db, username_or_email)
-        if not user:
-            user = UserService.get_user_by_username(db, username_or_email)
-        
-        if not user:
+        user = UserService._find_login_user(db, username_or_email)
+        if not user or not verify_password(password, user.password_hash):
             return None
+        return UserService._record_login(db, user)
+    
+    @staticmethod
+    async def aauthenticate_user(
+        db: Union[Session, AsyncSession],
+        username_or_email: str,
+        password: str
+    ) -> Optional[User]:
+        """
+        Async authenticate_user: the password check runs on the bcrypt pool,
+        so a burst of logins does not stall chat streaming on the same loop.
+        With an AsyncSession the user lookup is awaited as well.
         
-        if not verify_password(password, user.password_hash):
+        Raises:
+            PasswordPoolBusy: If the bcrypt pool's queue is full
+        """
+        if isinstance(db, AsyncSession):
+            user = await UserService.aget_user_by_email(db, username_or_email)
+            if not user:
+                user = await UserService.aget_user_by_username(db, username_or_email)
+        else:
+            user = UserService._find_login_user(db, username_or_email)
+        if not user or not await averify_password(password, user.password_hash):
             return None
-        
-        user.last_login = datetime.utcnow()
-        db.commit()
-        
+        return UserService._record_login(db, user)
+    
+    @staticmethod
+    def _find_login_user(db: Session, username_or_email: str) -> Optional[User]:
+        user = UserService.get_user_by_email(db, username_or_email)
+        if not user:
+            user = UserService.get_user_by_username(db, username_or_email)
+        return user
+    
+    @staticmethod
+    def _record_login(db: Session, user: User) -> User:
+        # last_login is low-value and frequent: it is batched by the user writer
+        # rather than committed here, and shown on the returned user right away
+        now = datetime.utcnow()
+        get_user_writer(db.get_bind()).record_login(user.id, now)
+        set_committed_value(user, "last_login", now)
+        # Only last_login changed, so the user's other devices keep their cached tokens
+        token_cache.refresh_user(user)
         return user
     
     @staticmethod
@@ -130,8 +422,26 @@ class UserService:
                 setattr(user, key, value)
         
         user.updated_at = datetime.utcnow()
-        db.commit()
+        with get_user_writer(db.get_bind()).critical():
+            db.commit()
         db.refresh(user)
+        token_cache.invalidate_user(user.id)
+        UserService._refresh_profile_digest(db, user)
+        
+        return user
+    
+    @staticmethod
+    async def aupdate_user(db: AsyncSession, user: User, **kwargs) -> User:
+        """Async update_user."""
+        for key, value in kwargs.items():
+            if hasattr(user, key) and key != 'id':
+                setattr(user, key, value)
+        
+        user.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(user)
+        token_cache.invalidate_user(user.id)
+        profile_digests.invalidate(user.id)
         
         return user
     
@@ -150,9 +460,174 @@ class UserService:
         try:
             user.is_active = False
             user.updated_at = datetime.utcnow()
-            db.commit()
+            with get_user_writer(db.get_bind()).critical():
+                db.commit()
+            token_cache.invalidate_user(user.id)
+            profile_digests.invalidate(user.id)
             return True
         except Exception as e:
             db.rollback()
             print(f"User deletion failed: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    async def adelete_user(db: AsyncSession, user: User) -> bool:
+        """Async delete_user (soft delete)."""
+        try:
+            user.is_active = False
+            user.updated_at = datetime.utcnow()
+            await db.commit()
+            token_cache.invalidate_user(user.id)
+            profile_digests.invalidate(user.id)
+            return True
+        except Exception as e:
+            await db.rollback()
+            print(f"User deletion failed: {e}")
+            return False
+    
+    @staticmethod
+    def get_preferences(db: Session, user_id: str) -> Mapping[str, Any]:
+        """
+        All preferences of a user, as a read-only mapping.
+        
+        Served from the preference cache after the first load, so calls on
+        the chat hot path cost a dict lookup.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Preference key -> value (JSON types)
+        """
+        cached = preference_cache.get(user_id)
+        if cached is not None:
+            return cached
+        return UserService._load_preferences(db, user_id)
+    
+    @staticmethod
+    def _load_preferences(db: Session, user_id: str) -> Mapping[str, Any]:
+        """Read a user's preferences from the database and cache them."""
+        version = preference_cache.version(user_id)
+        rows = db.query(UserPreference.key, UserPreference.value).filter(UserPreference.user_id == user_id)
+        return preference_cache.put(user_id, {key: value for key, value in rows}, version)
+    
+    @staticmethod
+    async def aget_preferences(db: AsyncSession, user_id: str) -> Mapping[str, Any]:
+        """Async get_preferences."""
+        cached = preference_cache.get(user_id)
+        if cached is not None:
+            return cached
+        version = preference_cache.version(user_id)
+        result = await db.execute(
+            select(UserPreference.key, UserPreference.value).where(UserPreference.user_id == user_id)
+        )
+        return preference_cache.put(user_id, {key: value for key, value in result}, version)
+    
+    @staticmethod
+    def get_preference(db: Session, user_id: str, key: str, default: T) -> T:
+        """
+        One preference, typed like its default.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            key: Preference key
+            default: Returned when the preference is unset or stored with another type
+            
+        Returns:
+            The stored value, or default
+        """
+        return typed_preference(UserService.get_preferences(db, user_id).get(key), default)
+    
+    @staticmethod
+    def update_preferences(db: Session, user_id: str, updates: Mapping[str, Any]) -> Mapping[str, Any]:
+        """
+        Set some preferences, leaving the others untouched.
+        
+        Only the rows of the given keys are written.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            updates: Preference key -> new value (any JSON-serializable value)
+            
+        Returns:
+            The user's preferences after the update
+        """
+        if updates:
+            existing = {
+                row.key: row for row in db.query(UserPreference).filter(
+                    UserPreference.user_id == user_id, UserPreference.key.in_(list(updates))
+                )
+            }
+            for key, value in updates.items():
+                if key in existing:
+                    existing[key].value = value
+                else:
+                    db.add(UserPreference(user_id=user_id, key=key, value=value))
+            with get_user_writer(db.get_bind()).critical():
+                db.commit()
+            preference_cache.invalidate(user_id)
+            profile_digests.invalidate(user_id)
+        return UserService.get_preferences(db, user_id)
+    
+    @staticmethod
+    def delete_preferences(db: Session, user_id: str, *keys: str) -> int:
+        """
+        Remove preferences of a user.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            *keys: Preference keys to remove
+            
+        Returns:
+            Number of preferences removed
+        """
+        if not keys:
+            return 0
+        removed = db.query(UserPreference).filter(
+            UserPreference.user_id == user_id, UserPreference.key.in_(keys)
+        ).delete(synchronize_session=False)
+        with get_user_writer(db.get_bind()).critical():
+            db.commit()
+        preference_cache.invalidate(user_id)
+        profile_digests.invalidate(user_id)
+        return removed
+    
+    @staticmethod
+    def get_profile_digest(db: Session, user_id: str) -> str:
+        """
+        The system-prompt section describing a user's account and preferences.
+        
+        Served from the profile digest cache; the database is only read the
+        first time a user is seen, after their account changes and once the
+        digest has aged out (preferences are then re-read too, so changes
+        made by another process show up).
+        
+        Args:
+            db: Database session
+            user_id: User ID or mem0_user_id
+            
+        Returns:
+            The rendered digest, or "" if no active account has that id
+        """
+        cached = profile_digests.get(user_id)
+        if cached is not None:
+            return cached
+        version = profile_digests.version()
+        user = db.query(User).filter(or_(User.id == user_id, User.mem0_user_id == user_id)).first()
+        if not user or not user.is_active:
+            profile_digests.put_missing(user_id, version)
+            return ""
+        digest = render_profile_digest(user, UserService._load_preferences(db, user.id))
+        profile_digests.put(user, digest, version)
+        return digest
+    
+    @staticmethod
+    def _refresh_profile_digest(db: Session, user: User):
+        if not user.is_active:
+            profile_digests.invalidate(user.id)
+            return
+        profile_digests.put(user, render_profile_digest(user, UserService.get_preferences(db, user.id)))
\ No newline at end of file
@@ -5,7 +5,9 @@ from langchain.chat_models import init_chat_model
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 
-from config import GOOGLE_API_KEY, LANGSMITH_API_KEY, LANGSMITH_PROJECT
+from config import GOOGLE_API_KEY, LANGSMITH_API_KEY, LANGSMITH_PROJECT, validate_config
+
+validate_config()
 
 # Set up LangSmith for monitoring (optional)
 if LANGSMITH_API_KEY:
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for Athena's hot path.
+
+Run ``python -m benchmarks.agent_latency --help`` for options; no API keys or
+network access are needed.
+"""
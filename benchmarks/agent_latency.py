@@ -0,0 +1,319 @@
+"""
+Offline end-to-end latency benchmark for the Athena agent.
+
+Builds the real graph from athena_agent/agent.py with fake chat model, Mem0,
+Tavily and ipapi backends (benchmarks/fakes.py), drives one long conversation
+thread through it, and reports per-turn latency, prompt tokens and memory
+allocations at several thread lengths. Needs no API keys or network.
+
+Usage:
+    python -m benchmarks.agent_latency
+    python -m benchmarks.agent_latency --turns 1 10 100 --no-latency --json out.json
+    python -m benchmarks.agent_latency --baseline out.json   # exit 1 on regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import HumanMessage
+
+DEFAULT_TURNS = [1, 10, 50, 100, 250, 500]
+
+# Household messages the benchmark cycles through; the turn number keeps each
+# message unique so the response cache only helps where it would in real use
+WORKLOAD = [
+    "What's the weather forecast for the park this weekend?",
+    "Help me plan dinners for the week, the kids don't like spicy food",
+    "Remind me what time soccer practice is on Thursdays",
+    "Are there any family events downtown tonight?",
+    "Can you suggest a quick pasta recipe for four people?",
+    "We need a packing list for a two day camping trip",
+    "How should we split chores between the two kids?",
+    "Any news about the school district calendar changes?",
+]
+
+# The benchmark household member, with an account in the fake users database
+BENCH_USER = "bench_user"
+
+# Regression thresholds used with --baseline
+REGRESSION_METRICS = ("latency_p95_ms", "prompt_tokens")
+
+
+def install_fakes(
+    workdir: str,
+    llm_latency: float = 0.05,
+    memory_latency: float = 0.02,
+    search_latency: float = 0.1,
+    location_latency: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Point the agent's client factories at the offline fakes.
+
+    Args:
+        workdir: Directory for the memory outbox log
+        llm_latency: Seconds per chat model call
+        memory_latency: Seconds per Mem0 call
+        search_latency: Seconds per Tavily request
+        location_latency: Seconds per ipapi lookup
+
+    Returns:
+        The fakes, by name, for inspecting call counts afterwards
+    """
+    from langchain_tavily import TavilySearch
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from athena_agent import agent
+    from auth.profile_digest import profile_digests
+    from benchmarks.fakes import FakeChatModel, FakeIpApi, FakeMemoryClient, FakeTavilyAPIWrapper
+    from context_utils import set_location_source
+    from database.connection import Base
+    from database.models import User
+    from memory import CachedMemoryClient, MemoryOutbox
+    from search_cache import CachedSearchTool, SearchCache
+    from tool_compaction import make_expand_tool
+
+    llm = FakeChatModel(latency=llm_latency)
+    mem0 = FakeMemoryClient(latency=memory_latency)
+    tavily = FakeTavilyAPIWrapper(latency=search_latency)
+    ipapi = FakeIpApi(latency=location_latency)
+
+    memory_client = CachedMemoryClient(mem0)
+    tools = [
+        CachedSearchTool(TavilySearch(max_results=3, api_wrapper=tavily), SearchCache()),
+        make_expand_tool()
+    ]
+
+    agent.get_llm.override(llm)
+    agent.get_llm_with_tools.override(llm.bind_tools(tools))
+    agent.get_history_manager.reset()
+    agent.get_memory_client.override(memory_client)
+    agent.get_memory_outbox.override(
+        MemoryOutbox(memory_client, os.path.join(workdir, "outbox.jsonl"), flush_interval=0.2).start()
+    )
+    agent.get_tools.override(tools)
+    agent.response_cache.clear()
+    set_location_source(ipapi)
+
+    users = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=users)
+    profiles = sessionmaker(bind=users)
+    with profiles() as db:
+        db.add(User(
+            email="bench@example.com", username="bench", password_hash="-",
+            first_name="Sam", last_name="Rivera", mem0_user_id=BENCH_USER
+        ))
+        db.commit()
+    agent.get_profile_sessions.override(profiles)
+    profile_digests.clear()
+
+    return {"llm": llm, "mem0": mem0, "tavily": tavily, "ipapi": ipapi}
+
+
+async def run_thread(
+    graph,
+    recorder,
+    max_turns: int,
+    checkpoints: List[int],
+    trace_allocations: bool = True,
+    user_id: str = BENCH_USER
+) -> List[Dict[str, Any]]:
+    """
+    Drive one conversation thread and summarize the turns up to each checkpoint.
+
+    Returns:
+        One row per checkpoint with latency, prompt token and allocation figures
+        for the turns since the previous checkpoint
+    """
+    from metrics import percentile
+
+    config = {"configurable": {"thread_id": f"bench_{user_id}", "metadata": {"user_id": user_id}}}
+    turns: List[Dict[str, Any]] = []
+    rows = []
+    if trace_allocations:
+        tracemalloc.start()
+
+    try:
+        for turn in range(1, max_turns + 1):
+            text = f"{WORKLOAD[(turn - 1) % len(WORKLOAD)]} (turn {turn})"
+            if trace_allocations:
+                tracemalloc.reset_peak()
+                heap_before = tracemalloc.get_traced_memory()[0]
+
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=text)]}, config)
+            elapsed = time.perf_counter() - started
+
+            calls = [call for call in recorder.drain() if call["kind"] == "chat"]
+            record = {
+                "latency": elapsed,
+                "prompt_tokens": max((call["prompt_tokens"] for call in calls), default=0),
+                "llm_calls": len(calls)
+            }
+            if trace_allocations:
+                heap_after, peak = tracemalloc.get_traced_memory()
+                record["alloc_peak_kib"] = (peak - heap_before) / 1024
+                record["heap_kib"] = heap_after / 1024
+            turns.append(record)
+
+            if turn in checkpoints:
+                window = turns[rows[-1]["turns"] if rows else 0:]
+                latencies = [t["latency"] for t in window]
+                row = {
+                    "turns": turn,
+                    "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                    "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                    "latency_max_ms": round(max(latencies) * 1000, 1),
+                    "prompt_tokens": record["prompt_tokens"],
+                    "prompt_tokens_max": max(t["prompt_tokens"] for t in window),
+                    "messages_in_thread": len((await graph.aget_state(config)).values.get("messages", []))
+                }
+                if trace_allocations:
+                    row["alloc_peak_kib"] = round(percentile([t["alloc_peak_kib"] for t in window], 50), 1)
+                    row["heap_kib"] = round(record["heap_kib"], 1)
+                rows.append(row)
+    finally:
+        if trace_allocations:
+            tracemalloc.stop()
+    return rows
+
+
+def run_benchmark(
+    turns: List[int],
+    llm_latency: float = 0.05,
+    memory_latency: float = 0.02,
+    search_latency: float = 0.1,
+    location_latency: float = 0.05,
+    trace_allocations: bool = True
+) -> Dict[str, Any]:
+    """
+    Build the real agent graph on fakes and run one thread to max(turns).
+
+    Returns:
+        Settings, one row per checkpoint, per-stage latency from the metrics
+        registry, and call counts seen by the fakes
+    """
+    from athena_agent import agent
+    from database.checkpointer import SQLiteCheckpointSaver
+    from metrics import metrics
+
+    checkpoints = sorted(set(turns))
+    with tempfile.TemporaryDirectory() as workdir:
+        fakes = install_fakes(workdir, llm_latency, memory_latency, search_latency, location_latency)
+        metrics.reset()
+        # Checkpoints live on disk, so the heap figures reflect the hot path itself
+        checkpointer = SQLiteCheckpointSaver(os.path.join(workdir, "checkpoints.db"))
+        graph = agent.build_graph(checkpointer=checkpointer)
+        rows = asyncio.run(run_thread(
+            graph, fakes["llm"].recorder, checkpoints[-1], checkpoints, trace_allocations
+        ))
+        agent.get_memory_outbox().close()
+        checkpointer.close()
+
+    return {
+        "settings": {
+            "llm_latency": llm_latency,
+            "memory_latency": memory_latency,
+            "search_latency": search_latency,
+            "location_latency": location_latency,
+            "python": sys.version.split()[0]
+        },
+        "rows": rows,
+        "stages": metrics.summary(),
+        "backend_calls": {
+            "mem0": dict(fakes["mem0"].calls),
+            "tavily_requests": fakes["tavily"].requests_sent,
+            "ipapi": fakes["ipapi"].calls
+        }
+    }
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """Plain-text tables for the checkpoint rows and the per-stage latencies."""
+    rows = result["rows"]
+    columns = [key for key in rows[0] if key != "turns"] if rows else []
+    lines = ["turns  " + "  ".join(f"{column:>18}" for column in columns)]
+    for row in rows:
+        lines.append(f"{row['turns']:<5}  " + "  ".join(f"{row[column]:>18}" for column in columns))
+
+    lines.append("")
+    lines.append(f"{'stage':<22}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    for stage, stats in result["stages"].items():
+        lines.append(
+            f"{stage:<22}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    lines.append("")
+    lines.append(f"Backend calls: {json.dumps(result['backend_calls'])}")
+    return "\n".join(lines)
+
+
+def find_regressions(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Checkpoints where latency or prompt size grew more than tolerance over the baseline."""
+    previous = {row["turns"]: row for row in baseline.get("rows", [])}
+    problems = []
+    for row in result["rows"]:
+        old = previous.get(row["turns"])
+        if not old:
+            continue
+        for metric in REGRESSION_METRICS:
+            if old.get(metric) and row[metric] > old[metric] * (1 + tolerance):
+                problems.append(f"{metric} at {row['turns']} turns: {old[metric]} -> {row[metric]}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline latency benchmark for the Athena agent")
+    parser.add_argument("--turns", type=int, nargs="+", default=DEFAULT_TURNS,
+                        help="Thread lengths to report at (one thread runs to the largest)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per chat model call")
+    parser.add_argument("--memory-latency", type=float, default=0.02, help="Seconds per Mem0 call")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="Seconds per Tavily request")
+    parser.add_argument("--location-latency", type=float, default=0.05, help="Seconds per ipapi lookup")
+    parser.add_argument("--no-latency", action="store_true", help="Set every injected latency to zero")
+    parser.add_argument("--no-allocations", action="store_true",
+                        help="Skip tracemalloc (it slows every turn down)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed growth over the baseline before failing (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    scale = 0.0 if args.no_latency else 1.0
+    result = run_benchmark(
+        args.turns,
+        llm_latency=args.llm_latency * scale,
+        memory_latency=args.memory_latency * scale,
+        search_latency=args.search_latency * scale,
+        location_latency=args.location_latency * scale,
+        trace_allocations=not args.no_allocations
+    )
+    print(format_report(result))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = find_regressions(result, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"[REGRESSION] {problem}")
+        if problems:
+            return 1
+        print("[INFO] No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
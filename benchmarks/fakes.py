@@ -0,0 +1,231 @@
+"""
+Offline stand-ins for the agent's external services.
+
+Each fake behaves like the real dependency closely enough to drive the real
+graph (tool calls, Mem0 write events, Tavily payloads) and sleeps for a
+configurable latency instead of talking to the network.
+"""
+
+import asyncio
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_tavily._utilities import TavilySearchAPIWrapper
+from pydantic import PrivateAttr
+
+from history_utils import SUMMARY_INSTRUCTIONS
+from token_utils import estimate_message_tokens
+
+# Messages containing one of these words make the fake model call web search
+SEARCH_TRIGGERS = ("weather", "forecast", "events", "recipe", "news", "open", "tonight")
+
+_SUMMARY_PREFIX = SUMMARY_INSTRUCTIONS.split("\n")[0][:40]
+
+_FILLER = (
+    "Here is a plan that should work for the whole family. Start with the things that have a fixed "
+    "time, then fit the flexible tasks around them. Keep snacks and water in the car, and leave a little "
+    "buffer between activities so nobody feels rushed. Let me know if anything changes and I will adjust."
+).split()
+
+
+class CallRecorder:
+    """Prompt sizes of every model call, shared by a fake model and its tool-bound copies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+
+    def record(self, kind: str, prompt_tokens: int, messages: int):
+        with self._lock:
+            self.calls.append({"kind": kind, "prompt_tokens": prompt_tokens, "messages": messages})
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return and clear the calls recorded so far."""
+        with self._lock:
+            calls, self.calls = self.calls, []
+        return calls
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers after a fixed delay.
+
+    When search tools are bound and the user's message mentions weather,
+    events, recipes or news, it first asks for a web search (with a query
+    derived from the message, so repeated topics hit the search cache), then
+    answers once the tool result comes back. Summary requests get a short
+    summary.
+    """
+
+    latency: float = 0.05
+    reply_words: int = 60
+    search_tool: str = "tavily_search"
+
+    _recorder: CallRecorder = PrivateAttr(default_factory=CallRecorder)
+    _ids = PrivateAttr(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "athena-benchmark-fake"
+
+    @property
+    def recorder(self) -> CallRecorder:
+        return self._recorder
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tool_names=[getattr(tool, "name", str(tool)) for tool in tools], **kwargs)
+
+    def _respond(self, messages: List[BaseMessage], tool_names: Optional[List[str]]) -> AIMessage:
+        first = messages[0].content if messages and isinstance(messages[0], SystemMessage) else ""
+        kind = "summary" if str(first).startswith(_SUMMARY_PREFIX) else "chat"
+        self._recorder.record(kind, estimate_message_tokens(messages), len(messages))
+
+        if kind == "summary":
+            # Each update differs from the last, as a real summary would
+            return AIMessage(content=(
+                f"- Summary update {next(self._ids)}: the family is planning meals, "
+                "weekend activities and school pickups."
+            ))
+
+        last = messages[-1]
+        if (
+            tool_names and self.search_tool in tool_names
+            and isinstance(last, HumanMessage)
+            and any(word in str(last.content).lower() for word in SEARCH_TRIGGERS)
+        ):
+            query = re.sub(r"\s*\(.*?\)\s*$", "", str(last.content)).rstrip("?!. ")
+            return AIMessage(content="", tool_calls=[{
+                "name": self.search_tool,
+                "args": {"query": query},
+                "id": f"call_{next(self._ids)}"
+            }])
+
+        words = list(itertools.islice(itertools.cycle(_FILLER), self.reply_words))
+        return AIMessage(content=" ".join(words))
+
+    def _generate(self, messages, stop=None, run_manager=None, tool_names=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, tool_names))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tool_names=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, tool_names))])
+
+
+class FakeMemoryClient:
+    """In-process Mem0 stand-in: ``add`` returns ADD events, ``search`` matches words."""
+
+    def __init__(self, latency: float = 0.02, seed_memories: int = 20):
+        """
+        Args:
+            latency: Seconds each call takes
+            seed_memories: Memories every user starts with
+        """
+        self.latency = latency
+        self.seed_memories = seed_memories
+        self._lock = threading.Lock()
+        self._memories: Dict[str, List[Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self.calls = {"add": 0, "get_all": 0, "search": 0}
+
+    def _user(self, user_id: str) -> List[Dict[str, Any]]:
+        memories = self._memories.get(user_id)
+        if memories is None:
+            memories = self._memories[user_id] = [
+                self._memory(f"Family fact {i}: the kids like soccer, pasta and the park on Saturdays")
+                for i in range(self.seed_memories)
+            ]
+        return memories
+
+    def _memory(self, text: str) -> Dict[str, Any]:
+        return {"id": str(next(self._ids)), "memory": text, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    def add(self, messages: List[Dict[str, str]], user_id: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls["add"] += 1
+            added = [
+                self._memory(message["content"][:200])
+                for message in messages if message.get("role") == "user"
+            ]
+            self._user(user_id).extend(added)
+        return {"results": [{"id": m["id"], "memory": m["memory"], "event": "ADD"} for m in added]}
+
+    def get_all(self, user_id: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls["get_all"] += 1
+            return {"results": [dict(m) for m in self._user(user_id)]}
+
+    def search(self, query: str, user_id: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        terms = set(re.findall(r"\w+", query.lower()))
+        with self._lock:
+            self.calls["search"] += 1
+            matches = [
+                dict(m, score=0.8) for m in self._user(user_id)
+                if terms & set(re.findall(r"\w+", m["memory"].lower()))
+            ]
+        return {"results": matches[:10]}
+
+
+class FakeTavilyAPIWrapper(TavilySearchAPIWrapper):
+    """Tavily API wrapper that returns a synthetic payload after a delay."""
+
+    latency: float = 0.1
+    requests_sent: int = 0
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("tavily_api_key", "tvly-benchmark")
+        super().__init__(**kwargs)
+
+    def _payload(self, query: str, max_results: Optional[int] = 3, **kwargs) -> Dict[str, Any]:
+        self.requests_sent += 1
+        results = []
+        for i in range(max_results or 3):
+            results.append({
+                "title": f"{query.title()} - result {i + 1}",
+                "url": f"https://example{i}.com/{re.sub(r'[^a-z0-9]+', '-', query.lower())}",
+                "content": (
+                    f"Latest details about {query}. Conditions and times can change, so check before you go. "
+                    f"Families often combine {query} with a picnic. Parking fills up early on weekends. "
+                    "Subscribe to our newsletter for more updates and exclusive offers. " * 3
+                ),
+                "score": 0.9 - i * 0.1
+            })
+        return {"query": query, "results": results, "response_time": self.latency}
+
+    def raw_results(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return self._payload(query, **kwargs)
+
+    async def raw_results_async(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._payload(query, **kwargs)
+
+
+class FakeIpApi:
+    """Location source standing in for ipapi.co (see context_utils.set_location_source)."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        self.calls += 1
+        return {
+            "city": "Portland",
+            "region": "Oregon",
+            "country": "United States",
+            "timezone": "America/Los_Angeles",
+            "latitude": 45.52,
+            "longitude": -122.68,
+            "detected": True
+        }
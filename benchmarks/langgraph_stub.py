@@ -0,0 +1,196 @@
+"""
+Local stand-in for the LangGraph API used by the load generator.
+
+Implements just enough of the server (``POST /threads`` and
+``POST /threads/{id}/runs/stream`` with server-sent events, plus ``GET /ok``)
+to exercise clients without live model or search services. Run time, token
+pacing, error rate and how many runs execute at once are configurable, so
+queueing on a small home server can be simulated.
+
+Usage:
+    python -m benchmarks.langgraph_stub --port 2024 --capacity 4
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+REPLY = (
+    "Here is a plan for the week that works around soccer practice and school pickups, "
+    "with quick dinners on the busy nights and a family outing on Saturday."
+).split()
+
+
+class StubSettings:
+    """Behaviour of the stub server."""
+
+    def __init__(
+        self,
+        first_event_delay: float = 0.5,
+        event_interval: float = 0.02,
+        events: int = 20,
+        error_rate: float = 0.0,
+        capacity: int = 0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            first_event_delay: Seconds of "thinking" before the first token
+            event_interval: Seconds between streamed token events
+            events: Token events per run
+            error_rate: Fraction of runs that fail (half as HTTP 500, half mid-stream)
+            capacity: Runs executed at once; others queue (0 = unlimited)
+            seed: Random seed for reproducible error injection
+        """
+        self.first_event_delay = first_event_delay
+        self.event_interval = event_interval
+        self.events = events
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.random = random.Random(seed)
+
+
+class StubLangGraphServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stub's threads and run slots."""
+
+    daemon_threads = True
+
+    def __init__(self, address, settings: StubSettings):
+        super().__init__(address, StubHandler)
+        self.settings = settings
+        self.threads = {}
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(settings.capacity) if settings.capacity else None
+        self.runs_started = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLangGraphServer":
+        """Serve from a background thread."""
+        threading.Thread(target=self.serve_forever, name="langgraph-stub", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubLangGraphServer
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_GET(self):
+        if self.path == "/ok":
+            self._json(200, {"ok": True})
+        else:
+            self._json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        body = self._read_body()
+        if parts == ["threads"]:
+            thread_id = body.get("thread_id") or str(uuid.uuid4())
+            with self.server.lock:
+                self.server.threads.setdefault(thread_id, {"thread_id": thread_id, "metadata": body.get("metadata", {})})
+            self._json(200, self.server.threads[thread_id])
+        elif len(parts) == 4 and parts[0] == "threads" and parts[2:] == ["runs", "stream"]:
+            if parts[1] not in self.server.threads:
+                self._json(404, {"detail": f"Thread {parts[1]} not found"})
+                return
+            self._stream_run(parts[1], body)
+        else:
+            self._json(404, {"detail": "Not Found"})
+
+    def _stream_run(self, thread_id: str, body: dict):
+        settings = self.server.settings
+        with self.server.lock:
+            self.server.runs_started += 1
+            roll = settings.random.random()
+        if roll < settings.error_rate / 2:
+            self._json(500, {"detail": "Injected server error"})
+            return
+        fail_mid_stream = roll < settings.error_rate
+
+        run_id = str(uuid.uuid4())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self._event("metadata", {"run_id": run_id, "thread_id": thread_id})
+
+        if self.server.slots:
+            self.server.slots.acquire()
+        try:
+            time.sleep(settings.first_event_delay)
+            text = ""
+            for i in range(settings.events):
+                if fail_mid_stream and i == settings.events // 2:
+                    self._event("error", {"error": "InjectedError", "message": "Run failed mid-stream"})
+                    return
+                text = (text + " " + REPLY[i % len(REPLY)]).strip()
+                self._event("messages/partial", [{"type": "ai", "content": text, "id": f"run-{run_id}"}])
+                time.sleep(settings.event_interval)
+            self._event("updates", {"chatbot": {"messages": [{"type": "ai", "content": text}]}})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if self.server.slots:
+                self.server.slots.release()
+
+    def _event(self, name: str, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+
+def start_stub_server(settings: Optional[StubSettings] = None, host: str = "127.0.0.1", port: int = 0) -> StubLangGraphServer:
+    """Start a stub server in the background (port 0 picks a free one)."""
+    return StubLangGraphServer((host, port), settings or StubSettings()).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub LangGraph API server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2024)
+    parser.add_argument("--first-event-delay", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--event-interval", type=float, default=0.02, help="Seconds between token events")
+    parser.add_argument("--events", type=int, default=20, help="Token events per run")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of runs that fail")
+    parser.add_argument("--capacity", type=int, default=0, help="Runs executed at once (0 = unlimited)")
+    args = parser.parse_args()
+
+    settings = StubSettings(args.first_event_delay, args.event_interval, args.events, args.error_rate, args.capacity)
+    server = StubLangGraphServer((args.host, args.port), settings)
+    print(f"[INFO] Stub LangGraph API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
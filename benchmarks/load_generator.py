@@ -0,0 +1,294 @@
+"""
+Concurrent multi-household load generator for the LangGraph streaming API.
+
+Simulates N households with M devices each. Every device owns a conversation
+thread and sends a series of messages through ``/threads/{id}/runs/stream``
+concurrently with all the other devices. For each run it measures the time to
+the first streamed event (metadata excluded, since the server sends it
+before any work happens), the time to the last event, and failures. It then
+writes percentile reports overall and per household.
+
+Usage:
+    python -m benchmarks.load_generator --households 4 --devices 3 --url http://127.0.0.1:2024
+    python -m benchmarks.load_generator --households 8 --devices 2 --stub --stub-capacity 4 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from benchmarks.agent_latency import WORKLOAD
+from metrics import percentile
+
+REPORT_PERCENTILES = (50, 90, 95, 99)
+
+
+class RunResult:
+    """Timing and outcome of one streamed run."""
+
+    __slots__ = ("household", "device", "started", "first_event", "last_event", "events", "error")
+
+    def __init__(self, household: str, device: str, started: float):
+        self.household = household
+        self.device = device
+        self.started = started
+        self.first_event: Optional[float] = None
+        self.last_event: Optional[float] = None
+        self.events = 0
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "household": self.household,
+            "device": self.device,
+            "ttfe_ms": round((self.first_event - self.started) * 1000, 1) if self.first_event else None,
+            "ttle_ms": round((self.last_event - self.started) * 1000, 1) if self.last_event else None,
+            "events": self.events,
+            "error": self.error
+        }
+
+
+async def stream_run(
+    client: httpx.AsyncClient,
+    thread_id: str,
+    user_id: str,
+    message: str,
+    result: RunResult,
+    assistant_id: str = "athena"
+):
+    """Send one message and consume its event stream, filling in ``result``."""
+    payload = {
+        "assistant_id": assistant_id,
+        "input": {"messages": [{"role": "user", "content": message}]},
+        "config": {"configurable": {"metadata": {"user_id": user_id}}},
+        "metadata": {"user_id": user_id},
+        "stream_mode": ["messages", "updates"]
+    }
+    try:
+        async with client.stream("POST", f"/threads/{thread_id}/runs/stream", json=payload) as response:
+            if response.status_code != 200:
+                result.error = f"http_{response.status_code}"
+                await response.aread()
+                return
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif not line and event:
+                    # A blank line ends an event
+                    now = time.perf_counter()
+                    if event == "error":
+                        result.error = "stream_error"
+                    elif event != "metadata":
+                        result.events += 1
+                        result.first_event = result.first_event or now
+                        result.last_event = now
+                    event = None
+        if result.error is None and result.events == 0:
+            result.error = "empty_stream"
+    except httpx.TimeoutException:
+        result.error = "timeout"
+    except httpx.HTTPError as e:
+        result.error = type(e).__name__
+
+
+async def run_device(
+    client: httpx.AsyncClient,
+    household: int,
+    device: int,
+    runs: int,
+    think_time: float,
+    start_delay: float,
+    results: List[RunResult],
+    rng: random.Random
+):
+    """One device: create its thread, then send ``runs`` messages with think time between them."""
+    household_id = f"household_{household:03d}"
+    device_id = f"{household_id}_device_{device:02d}"
+    await asyncio.sleep(start_delay)
+
+    try:
+        response = await client.post("/threads", json={"metadata": {"user_id": household_id, "device": device_id}})
+        response.raise_for_status()
+        thread_id = response.json()["thread_id"]
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        for _ in range(runs):
+            result = RunResult(household_id, device_id, time.perf_counter())
+            result.error = f"thread_create:{type(e).__name__}"
+            results.append(result)
+        return
+
+    for i in range(runs):
+        message = f"{WORKLOAD[(household + device + i) % len(WORKLOAD)]} ({device_id}, message {i + 1})"
+        result = RunResult(household_id, device_id, time.perf_counter())
+        await stream_run(client, thread_id, household_id, message, result)
+        results.append(result)
+        if think_time and i < runs - 1:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+
+
+def summarize(results: List[RunResult], elapsed: float) -> Dict[str, Any]:
+    """Percentile report over all runs and per household."""
+
+    def block(runs: List[RunResult]) -> Dict[str, Any]:
+        ok = [r for r in runs if r.error is None]
+        ttfe = [r.first_event - r.started for r in ok]
+        ttle = [r.last_event - r.started for r in ok]
+        errors: Dict[str, int] = {}
+        for r in runs:
+            if r.error:
+                errors[r.error] = errors.get(r.error, 0) + 1
+        report = {
+            "runs": len(runs),
+            "errors": sum(errors.values()),
+            "error_rate": round(sum(errors.values()) / len(runs), 4) if runs else 0.0,
+            "errors_by_kind": errors
+        }
+        for name, samples in (("ttfe", ttfe), ("ttle", ttle)):
+            for pct in REPORT_PERCENTILES:
+                report[f"{name}_p{pct}_ms"] = round(percentile(samples, pct) * 1000, 1)
+            report[f"{name}_max_ms"] = round(max(samples) * 1000, 1) if samples else 0.0
+        return report
+
+    households = sorted({r.household for r in results})
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "throughput_runs_per_s": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "overall": block(results),
+        "households": {h: block([r for r in results if r.household == h]) for h in households}
+    }
+
+
+async def generate_load(
+    url: str,
+    households: int,
+    devices: int,
+    runs: int = 5,
+    think_time: float = 1.0,
+    ramp_up: float = 0.0,
+    timeout: float = 120.0,
+    headers: Optional[Dict[str, str]] = None,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run every device concurrently against ``url`` and summarize the results.
+
+    Args:
+        url: Base URL of the LangGraph API
+        households: Simulated households (each is one memory user)
+        devices: Devices per household (each has its own thread)
+        runs: Messages sent by each device
+        think_time: Mean seconds a device waits between messages
+        ramp_up: Seconds over which device start times are spread
+        timeout: Seconds a run may take before it counts as a timeout
+        headers: Extra request headers (e.g. authentication)
+        seed: Random seed for think times
+
+    Returns:
+        The percentile report, with raw samples under "samples"
+    """
+    rng = random.Random(seed)
+    total_devices = households * devices
+    results: List[RunResult] = []
+    limits = httpx.Limits(max_connections=total_devices + 4, max_keepalive_connections=total_devices)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits, headers=headers) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            run_device(
+                client, h, d, runs, think_time,
+                ramp_up * (h * devices + d) / max(1, total_devices - 1) if ramp_up else 0.0,
+                results, rng
+            )
+            for h in range(households) for d in range(devices)
+        ])
+        elapsed = time.perf_counter() - started
+
+    report = summarize(results, elapsed)
+    report["settings"] = {
+        "url": url, "households": households, "devices": devices, "runs_per_device": runs,
+        "think_time": think_time, "ramp_up": ramp_up, "timeout": timeout
+    }
+    report["samples"] = [r.as_dict() for r in results]
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text summary of the overall and per-household percentiles."""
+    columns = ["runs", "error_rate", "ttfe_p50_ms", "ttfe_p95_ms", "ttfe_p99_ms", "ttle_p50_ms", "ttle_p95_ms", "ttle_p99_ms"]
+    lines = [
+        f"{report['overall']['runs']} runs in {report['elapsed_s']}s "
+        f"({report['throughput_runs_per_s']} runs/s)",
+        "",
+        f"{'':<16}" + "".join(f"{column:>13}" for column in columns)
+    ]
+    for name, block in [("overall", report["overall"])] + list(report["households"].items()):
+        lines.append(f"{name:<16}" + "".join(f"{block[column]:>13}" for column in columns))
+    if report["overall"]["errors_by_kind"]:
+        lines.append("")
+        lines.append(f"Errors: {json.dumps(report['overall']['errors_by_kind'])}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent multi-household load generator for the LangGraph API")
+    parser.add_argument("--url", default="http://127.0.0.1:2024", help="LangGraph API base URL")
+    parser.add_argument("--households", type=int, default=4)
+    parser.add_argument("--devices", type=int, default=2, help="Devices per household")
+    parser.add_argument("--runs", type=int, default=5, help="Messages sent per device")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a device's messages")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which devices start")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds before a run counts as timed out")
+    parser.add_argument("--header", action="append", default=[], help="Extra header, 'Name: value' (repeatable)")
+    parser.add_argument("--seed", type=int, help="Random seed for think times and stub errors")
+    parser.add_argument("--json", help="Write the full report (with raw samples) to this file")
+
+    stub = parser.add_argument_group("stub server (no live services needed)")
+    stub.add_argument("--stub", action="store_true", help="Start a local stub LangGraph API and target it")
+    stub.add_argument("--stub-first-event-delay", type=float, default=0.5)
+    stub.add_argument("--stub-event-interval", type=float, default=0.02)
+    stub.add_argument("--stub-events", type=int, default=20)
+    stub.add_argument("--stub-error-rate", type=float, default=0.0)
+    stub.add_argument("--stub-capacity", type=int, default=0, help="Runs the stub executes at once (0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    headers = dict(h.split(":", 1) for h in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+    server = None
+    url = args.url
+    if args.stub:
+        from benchmarks.langgraph_stub import StubSettings, start_stub_server
+        server = start_stub_server(StubSettings(
+            args.stub_first_event_delay, args.stub_event_interval, args.stub_events,
+            args.stub_error_rate, args.stub_capacity, seed=args.seed
+        ))
+        url = server.url
+        print(f"[INFO] Using stub LangGraph API at {url}")
+
+    try:
+        report = asyncio.run(generate_load(
+            url, args.households, args.devices, args.runs, args.think_time,
+            args.ramp_up, args.timeout, headers, args.seed
+        ))
+    finally:
+        if server:
+            server.stop()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,18 +13,77 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 # Mem0 API Key (for persistent memory)
 MEM0_API_KEY = os.getenv("MEM0_API_KEY")
 
+# Memory backend: "mem0" (hosted, needs MEM0_API_KEY) or "sqlite" (local database)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "mem0").lower()
+
 # LangSmith configuration (optional)
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT", "athena-family-assistant")
 
-# Validate required API keys
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY environment variable is required. Please set it in your .env file.")
+# Per-source timeouts (seconds) for gathering prompt context before the LLM call
+MEMORY_FETCH_TIMEOUT = float(os.getenv("MEMORY_FETCH_TIMEOUT", "3.0"))
+CONTEXT_FETCH_TIMEOUT = float(os.getenv("CONTEXT_FETCH_TIMEOUT", "1.0"))
+
+# Per-user memory cache: users kept, and seconds before a memory list is refetched
+MEMORY_CACHE_MAX_USERS = int(os.getenv("MEMORY_CACHE_MAX_USERS", "256"))
+MEMORY_CACHE_MAX_AGE = float(os.getenv("MEMORY_CACHE_MAX_AGE", "300"))
+
+# Memories placed in the prompt: how many, and their total estimated token budget
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "10"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "600"))
+# Most recent stored memories fetched per turn for the ranker to choose from
+MEMORY_FETCH_LIMIT = int(os.getenv("MEMORY_FETCH_LIMIT", "200"))
+
+# Conversation history: turns kept verbatim, turns folded into the summary at a time,
+# and the history token budget (0 = use the chat model's default)
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+HISTORY_FOLD_TURNS = int(os.getenv("HISTORY_FOLD_TURNS", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "0"))
+
+# Answers to repeated questions: seconds served (0 disables) and answers kept
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "900"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+# Web search results cached across users (TTLs per query class live in search_cache.py)
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
+
+# Seconds a single tool call may run before the model is told it timed out
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "15"))
+
+# Checkpoints kept per conversation thread by the CLI's SQLite checkpointer
+CHECKPOINT_KEEP = int(os.getenv("CHECKPOINT_KEEP", "20"))
+
+# Per-stage latency metrics: Prometheus endpoint port (0 disables), JSON file
+# with p50/p95/p99 per stage (empty disables), and seconds between file writes
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", "15"))
+
+# Local log of memory writes waiting to be delivered to the memory backend
+MEMORY_OUTBOX_PATH = os.getenv("MEMORY_OUTBOX_PATH", "./athena_memory_outbox.jsonl")
+
+_optional_key_warnings_shown = False
 
-if not TAVILY_API_KEY:
-    print("[WARNING] TAVILY_API_KEY not found. Web search capabilities will be disabled.")
-    print("   Get your free API key from: https://tavily.com/")
 
-if not MEM0_API_KEY:
-    print("[WARNING] MEM0_API_KEY not found. Persistent memory will be disabled.")
-    print("   Get your free API key from: https://mem0.ai/")
+def validate_config():
+    """
+    Check settings when the clients that need them are built, not at import.
+    
+    Raises:
+        ValueError: If GOOGLE_API_KEY is missing
+    """
+    global _optional_key_warnings_shown
+    if not GOOGLE_API_KEY:
+        raise ValueError("GOOGLE_API_KEY environment variable is required. Please set it in your .env file.")
+    
+    if _optional_key_warnings_shown:
+        return
+    _optional_key_warnings_shown = True
+    
+    if not TAVILY_API_KEY:
+        print("[WARNING] TAVILY_API_KEY not found. Web search capabilities will be disabled.")
+        print("   Get your free API key from: https://tavily.com/")
+    
+    if MEMORY_BACKEND == "mem0" and not MEM0_API_KEY:
+        print("[WARNING] MEM0_API_KEY not found. Persistent memory will be disabled.")
+        print("   Get your free API key from: https://mem0.ai/")
@@ -4,9 +4,25 @@ This module provides functions to get current time, date, and location informati
 """
 
 from datetime import datetime
-import requests
+import os
+import threading
+import time
 import json
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
+
+from http_clients import get_session
+
+LOCATION_LOOKUP_URL = "https://ipapi.co/json/"
+LOCATION_LOOKUP_TIMEOUT = 5.0
+
+# How long a detected location is served before a background refresh
+LOCATION_CACHE_TTL = float(os.getenv("LOCATION_CACHE_TTL", "3600"))
+
+# Fixed "City, Region, Country" to use instead of IP geolocation
+LOCATION_OVERRIDE = os.getenv("ATHENA_LOCATION")
+
+# Skip network lookups entirely (home network without internet access)
+LOCATION_OFFLINE = os.getenv("ATHENA_OFFLINE", "").lower() in ("1", "true", "yes")
 
 def get_current_time_and_date() -> Dict[str, Any]:
     """Get current time and date in a user-friendly format with contextual information."""
@@ -31,29 +47,11 @@ def get_current_time_and_date() -> Dict[str, Any]:
         "is_school_year": _is_school_year(now)
     }
 
-def get_location_context() -> Dict[str, Any]:
-    """Get location information (IP-based, can be enhanced with user input)."""
-    try:
-        # Get location from IP address (basic implementation)
-        response = requests.get('https://ipapi.co/json/', timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "city": data.get('city', 'Unknown'),
-                "region": data.get('region', 'Unknown'),
-                "country": data.get('country_name', 'Unknown'),
-                "timezone": data.get('timezone', 'Unknown'),
-                "latitude": data.get('latitude'),
-                "longitude": data.get('longitude'),
-                "detected": True
-            }
-    except Exception as e:
-        print(f"[WARNING] Location detection failed: {e}")
-    
-    # Fallback if location detection fails
+def default_location_context() -> Dict[str, Any]:
+    """Location used when nothing better is known."""
     return {
         "city": "Unknown",
-        "region": "Unknown", 
+        "region": "Unknown",
         "country": "Unknown",
         "timezone": "Unknown",
         "latitude": None,
@@ -61,6 +59,176 @@ def get_location_context() -> Dict[str, Any]:
         "detected": False
     }
 
+def lookup_ip_location(timeout: float = LOCATION_LOOKUP_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """Look up location from the public IP address. Returns None on failure."""
+    response = get_session().get(LOCATION_LOOKUP_URL, timeout=timeout)
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    return {
+        "city": data.get('city', 'Unknown'),
+        "region": data.get('region', 'Unknown'),
+        "country": data.get('country_name', 'Unknown'),
+        "timezone": data.get('timezone', 'Unknown'),
+        "latitude": data.get('latitude'),
+        "longitude": data.get('longitude'),
+        "detected": True
+    }
+
+def static_location_source(
+    city: str,
+    region: str = "Unknown",
+    country: str = "Unknown",
+    timezone: str = "Unknown",
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+) -> Callable[[], Dict[str, Any]]:
+    """
+    Build a location source that always returns the given place.
+    Useful for offline homes or when IP geolocation is wrong.
+    """
+    location = {
+        "city": city,
+        "region": region,
+        "country": country,
+        "timezone": timezone,
+        "latitude": latitude,
+        "longitude": longitude,
+        "detected": True
+    }
+    return lambda: dict(location)
+
+class LocationProvider:
+    """
+    Process-wide location cache.
+    
+    Callers always get an answer immediately: the last good value, or the
+    fallback if no lookup has succeeded yet. Expired values are refreshed on a
+    background thread, and failed lookups back off exponentially so a dead
+    network is not hammered on every turn. A refresh that finishes after the
+    source was swapped is discarded.
+    """
+    
+    def __init__(
+        self,
+        source: Callable[[], Optional[Dict[str, Any]]] = lookup_ip_location,
+        ttl: float = LOCATION_CACHE_TTL,
+        failure_backoff: float = 30.0,
+        max_failure_backoff: float = 1800.0,
+        offline: bool = False
+    ):
+        self._source = source
+        self._ttl = ttl
+        self._failure_backoff = failure_backoff
+        self._max_failure_backoff = max_failure_backoff
+        self._offline = offline
+        self._lock = threading.Lock()
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._failures = 0
+        self._next_attempt = 0.0
+        self._generation = 0  # Bumped by set_source
+        self._refresh_thread: Optional[threading.Thread] = None
+    
+    def get(self) -> Dict[str, Any]:
+        """Return the cached location, scheduling a refresh if it has expired."""
+        with self._lock:
+            value = self._value
+            expired = value is None or time.monotonic() - self._fetched_at >= self._ttl
+        if expired:
+            self._schedule_refresh()
+        return dict(value) if value else default_location_context()
+    
+    def refresh(self) -> bool:
+        """
+        Fetch a new location synchronously.
+        
+        Returns:
+            True if the source produced a location, False otherwise
+        """
+        with self._lock:
+            source, generation = self._source, self._generation
+        try:
+            location = source()
+        except Exception as e:
+            location = None
+            print(f"[WARNING] Location detection failed: {e}")
+        
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return False  # The source was swapped while this lookup ran
+            if location:
+                self._value = dict(location)
+                self._fetched_at = now
+                self._failures = 0
+                self._next_attempt = 0.0
+                return True
+            self._failures += 1
+            backoff = min(self._failure_backoff * 2 ** (self._failures - 1), self._max_failure_backoff)
+            self._next_attempt = now + backoff
+            return False
+    
+    def set_source(
+        self,
+        source: Callable[[], Optional[Dict[str, Any]]],
+        offline: bool = False,
+        resolve_now: bool = False
+    ):
+        """
+        Swap the location source (e.g. a local stand-in) and drop the cached value.
+        
+        Args:
+            source: Callable returning a location dict, or None on failure
+            offline: Never call the source in the background
+            resolve_now: Call the source right away, for sources that answer
+                without I/O, so the first get() already has their value
+        """
+        with self._lock:
+            self._source = source
+            self._offline = offline
+            self._value = None
+            self._fetched_at = 0.0
+            self._failures = 0
+            self._next_attempt = 0.0
+            self._generation += 1
+            # A lookup still running for the old source must not hold up the new one
+            self._refresh_thread = None
+        if resolve_now:
+            self.refresh()
+    
+    def _schedule_refresh(self):
+        """Start a background refresh unless one is running or we are backing off."""
+        with self._lock:
+            if self._offline or time.monotonic() < self._next_attempt:
+                return
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="athena-location-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+def _default_location_provider() -> LocationProvider:
+    """Create the shared provider from environment settings."""
+    provider = LocationProvider()
+    if LOCATION_OVERRIDE:
+        parts = [part.strip() for part in LOCATION_OVERRIDE.split(",")]
+        provider.set_source(static_location_source(*parts[:3]), resolve_now=True)
+    elif LOCATION_OFFLINE:
+        provider.set_source(lambda: None, offline=True)
+    return provider
+
+location_provider = _default_location_provider()
+
+def get_location_context() -> Dict[str, Any]:
+    """Get location information without blocking on the network."""
+    return location_provider.get()
+
+def set_location_source(source: Callable[[], Optional[Dict[str, Any]]]):
+    """Replace the location source used by get_location_context()."""
+    location_provider.set_source(source)
+
 def _is_holiday_season(date: datetime) -> bool:
     """Check if current date is during holiday season."""
     month = date.month
@@ -1,4 +1,5 @@
-from .connection import get_db, init_db, Base, engine, SessionLocal
-from .models import User
+from .connection import get_db, get_async_db, get_async_engine, get_async_sessionmaker, init_db, Base, engine, SessionLocal
+from .models import User, UserPreference, Memory
+from .user_writes import UserWriter, get_user_writer
 
-__all__ = ['get_db', 'init_db', 'Base', 'engine', 'SessionLocal', 'User']
\ No newline at end of file
+__all__ = ['get_db', 'get_async_db', 'get_async_engine', 'get_async_sessionmaker', 'init_db', 'Base', 'engine', 'SessionLocal', 'User', 'UserPreference', 'Memory', 'UserWriter', 'get_user_writer']
\ No newline at end of file
@@ -0,0 +1,399 @@
+"""
+Disk-backed LangGraph checkpointer on the project's SQLite database.
+
+Thread state survives restarts. Writes are buffered and committed in one
+WAL-mode transaction per flush (on read, when the buffer fills, or on an
+explicit ``flush()``), and every flush compacts the touched threads down to
+their latest ``keep_last`` checkpoints so the database and process memory
+stay bounded in long-running sessions.
+"""
+
+import atexit
+import random
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.engine import make_url
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata_type TEXT,
+        metadata BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL,
+        type TEXT NOT NULL,
+        blob BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+    )""",
+    """CREATE TABLE IF NOT EXISTS checkpoint_writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        task_path TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )""",
+]
+
+_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+]
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpoint saver with batched writes and per-thread compaction."""
+
+    def __init__(self, path: str, keep_last: int = 20, batch_size: int = 64, serde=None):
+        """
+        Args:
+            path: SQLite database file
+            keep_last: Checkpoints kept per thread and namespace after compaction
+            batch_size: Buffered operations that trigger a flush
+            serde: Optional LangGraph serializer
+        """
+        super().__init__(serde=serde)
+        self.path = path
+        self.keep_last = keep_last
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._buffer: List[Tuple[str, tuple]] = []
+        self._dirty_threads: Set[Tuple[str, str]] = set()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        for pragma in _PRAGMAS:
+            self.conn.execute(pragma)
+        with self.conn:
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+        atexit.register(self.close)
+
+    # Buffering ----------------------------------------------------------------
+
+    def flush(self):
+        """Commit buffered writes in one transaction, then compact touched threads."""
+        with self._lock:
+            if not self._buffer:
+                return
+            buffer, self._buffer = self._buffer, []
+            dirty, self._dirty_threads = self._dirty_threads, set()
+            with self.conn:
+                for statement, params in buffer:
+                    self.conn.execute(statement, params)
+                for thread_id, checkpoint_ns in dirty:
+                    self._compact(thread_id, checkpoint_ns)
+
+    def close(self):
+        """Flush pending writes and close the connection."""
+        atexit.unregister(self.close)
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self.conn.close()
+
+    def _queue(self, statement: str, params: tuple):
+        self._buffer.append((statement, params))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def _compact(self, thread_id: str, checkpoint_ns: str):
+        """Drop all but the newest keep_last checkpoints and anything only they used."""
+        stale = [
+            row[0] for row in self.conn.execute(
+                """SELECT checkpoint_id FROM checkpoints
+                   WHERE thread_id = ? AND checkpoint_ns = ?
+                   ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?""",
+                (thread_id, checkpoint_ns, self.keep_last)
+            )
+        ]
+        if not stale:
+            return
+        self.conn.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in stale]
+        )
+        self.conn.executemany(
+            "DELETE FROM checkpoint_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in stale]
+        )
+
+        # Keep only channel blobs still referenced by a retained checkpoint
+        referenced: Set[Tuple[str, str]] = set()
+        for type_, data in self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns)
+        ):
+            checkpoint = self.serde.loads_typed((type_, data))
+            referenced.update((channel, str(version)) for channel, version in checkpoint["channel_versions"].items())
+        unreferenced = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in self.conn.execute(
+                "SELECT channel, version FROM checkpoint_blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns)
+            )
+            if (channel, version) not in referenced
+        ]
+        self.conn.executemany(
+            """DELETE FROM checkpoint_blobs
+               WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?""",
+            unreferenced
+        )
+
+    # Reads ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the requested checkpoint, or the latest one for the thread."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            self.flush()
+            if checkpoint_id:
+                row = self.conn.execute(
+                    """SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                       FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?""",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    """SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                       FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                       ORDER BY checkpoint_id DESC LIMIT 1""",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if not row:
+                return None
+            return self._load_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints newest first, optionally filtered by thread, metadata or position."""
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            self.flush()
+            rows = self.conn.execute(
+                f"""SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                           type, checkpoint, metadata_type, metadata
+                    FROM checkpoints {where} ORDER BY checkpoint_id DESC""",
+                params
+            ).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                item = self._load_tuple(thread_id, checkpoint_ns, row)
+            yield item
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, data, metadata_type, metadata = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, data))
+
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = self.conn.execute(
+                """SELECT type, blob FROM checkpoint_blobs
+                   WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?""",
+                (thread_id, checkpoint_ns, channel, str(version))
+            ).fetchone()
+            if blob and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+
+        writes = self.conn.execute(
+            """SELECT task_id, channel, type, value FROM checkpoint_writes
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+               ORDER BY task_path, task_id, idx""",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    # Writes -----------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Buffer a checkpoint and its new channel values."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values: Dict[str, Any] = stored.pop("channel_values")
+
+        with self._lock:
+            for channel, version in new_versions.items():
+                type_, blob = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+                self._buffer.append((
+                    """INSERT OR REPLACE INTO checkpoint_blobs
+                       (thread_id, checkpoint_ns, channel, version, type, blob) VALUES (?, ?, ?, ?, ?, ?)""",
+                    (thread_id, checkpoint_ns, channel, str(version), type_, blob)
+                ))
+            type_, data = self.serde.dumps_typed(stored)
+            metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+            self._dirty_threads.add((thread_id, checkpoint_ns))
+            self._queue(
+                """INSERT OR REPLACE INTO checkpoints
+                   (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, data, metadata_type, metadata_data)
+            )
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer intermediate writes for a checkpoint."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            for position, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, position)
+                # Regular writes are idempotent per task; special channels overwrite
+                verb = "INSERT OR IGNORE" if idx >= 0 else "INSERT OR REPLACE"
+                type_, blob = self.serde.dumps_typed(value)
+                self._queue(
+                    f"""{verb} INTO checkpoint_writes
+                        (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type_, blob, task_path)
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes for a thread."""
+        with self._lock:
+            self.flush()
+            with self.conn:
+                for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    # Async API (SQLite work is local and short, so these run inline) ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def sqlite_path_from_url(database_url: str) -> Optional[str]:
+    """File path of a sqlite:/// database URL, or None for other databases."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return url.database
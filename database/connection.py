@@ -1,15 +1,220 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
+
+from lazy_utils import once
+from metrics import StageMetrics, metrics as default_metrics
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./athena_users.db")
+# Same database through an asyncio driver (empty derives it from DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# asyncio drivers used for each backend when deriving ASYNC_DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+# Engine profile ("sqlite" or "postgres"; empty picks one from DATABASE_URL)
+DB_PROFILE = os.getenv("DB_PROFILE", "")
+# Queries slower than this are logged (0 disables)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# Connection pool sizing for server databases
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer; busy_timeout makes a writer wait for the lock instead of failing.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -16000,  # 16 MiB
+    "mmap_size": 134217728,  # 128 MiB
+    "temp_store": "MEMORY",
+}
+
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "sqlite": {
+        "connect_args": {"check_same_thread": False, "timeout": 30},
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    },
+    "postgres": {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    },
+}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics: StageMetrics = default_metrics
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except Exception:
+            self.metrics.observe("db_checkout_failed", time.perf_counter() - started)
+            raise
+        finally:
+            self.metrics.observe("db_checkout_wait", time.perf_counter() - started)
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """TimedQueuePool for asyncio drivers."""
+
+
+def _timed_pool(base: type, registry: StageMetrics) -> type:
+    # Pools are recreated from their class on dispose, so the registry rides on it
+    return type(base.__name__, (base,), {"metrics": registry})
+
+
+def profile_for_url(url: str) -> str:
+    """The engine profile matching a database URL."""
+    return "sqlite" if url.startswith("sqlite") else "postgres"
+
+
+def async_url_for(url: str) -> str:
+    """The URL of the same database through its asyncio driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for '{backend}' databases; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:") or "mode=memory" in url
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _log_slow_queries(engine: Engine, threshold_ms: float, registry: StageMetrics):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        registry.observe("db_query", elapsed)
+        if threshold_ms and elapsed * 1000 >= threshold_ms:
+            print(f"[WARNING] Slow query ({elapsed * 1000:.0f}ms): {' '.join(statement.split())[:200]}")
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started and context.statement is not None:
+            started.pop()
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+
+def _engine_options(url: str, profile: Optional[str], pool: type, registry: StageMetrics, overrides: dict):
+    profile = profile or profile_for_url(url)
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}' (expected one of {sorted(ENGINE_PROFILES)})")
+    options = {key: (dict(value) if isinstance(value, dict) else value) for key, value in ENGINE_PROFILES[profile].items()}
+
+    if profile == "sqlite" and _is_memory_sqlite(url):
+        # A private in-memory database has no pool to size
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key, None)
+    else:
+        options["poolclass"] = _timed_pool(pool, registry)
+    options.update(overrides)
+    return profile, options
+
+
+def _instrument(engine: Engine, profile: str, slow_query_ms: float, registry: StageMetrics):
+    if profile == "sqlite":
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    _log_slow_queries(engine, slow_query_ms, registry)
+
+
+def build_engine(
+    url: str,
+    profile: Optional[str] = None,
+    slow_query_ms: float = DB_SLOW_QUERY_MS,
+    metrics: StageMetrics = default_metrics,
+    **overrides
+) -> Engine:
+    """
+    Create an engine with the named profile's pragmas and pool settings.
+
+    Args:
+        url: Database URL
+        profile: "sqlite" or "postgres" (defaults to the one matching the URL)
+        slow_query_ms: Log queries slower than this (0 disables)
+        metrics: Registry for query and checkout wait times
+        **overrides: Extra create_engine arguments, applied last
+
+    Returns:
+        The configured engine
+    """
+    profile, options = _engine_options(url, profile, TimedQueuePool, metrics, overrides)
+    engine = create_engine(url, **options)
+    _instrument(engine, profile, slow_query_ms, metrics)
+    return engine
+
+
+def build_async_engine(
+    url: str,
+    profile: Optional[str] = None,
+    slow_query_ms: float = DB_SLOW_QUERY_MS,
+    metrics: StageMetrics = default_metrics,
+    **overrides
+) -> AsyncEngine:
+    """
+    Create an AsyncEngine (e.g. ``sqlite+aiosqlite://``) with the same profile
+    settings, pragmas and instrumentation as ``build_engine``.
+    """
+    profile, options = _engine_options(url, profile, TimedAsyncQueuePool, metrics, overrides)
+    engine = create_async_engine(url, **options)
+    _instrument(engine.sync_engine, profile, slow_query_ms, metrics)
+    return engine
+
+
+def pool_stats(bind: Engine) -> Dict[str, int]:
+    """Size, checked-out and overflow counts of an engine's connection pool."""
+    pool = bind.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": 0, "checked_out": 0, "checked_in": 0, "overflow": 0}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0)
+    }
+
+
+def register_pool_gauges(bind: Engine, registry: StageMetrics = default_metrics):
+    """Expose an engine's pool counters as Prometheus gauges."""
+    registry.register_gauge("athena_db_pool_size", "Connections the pool keeps open", lambda: pool_stats(bind)["size"])
+    registry.register_gauge("athena_db_pool_checked_out", "Connections in use", lambda: pool_stats(bind)["checked_out"])
+    registry.register_gauge("athena_db_pool_overflow", "Connections open beyond the pool size", lambda: pool_stats(bind)["overflow"])
+
+
+engine = build_engine(DATABASE_URL, DB_PROFILE or None)
+register_pool_gauges(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -26,10 +231,28 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+@once
+def get_async_engine() -> AsyncEngine:
+    """The process-wide AsyncEngine, created on first use."""
+    return build_async_engine(ASYNC_DATABASE_URL or async_url_for(DATABASE_URL), DB_PROFILE or None)
+
+@once
+def get_async_sessionmaker() -> async_sessionmaker:
+    # Objects stay usable after commit; an expired attribute would need awaited IO
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async twin of get_db for code running on an event loop.
+    Queries are awaited, so they never block other coroutines.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 def init_db():
     """
     Initialize the database by creating all tables.
     """
     from . import models  # Import models to register them with Base
     Base.metadata.create_all(bind=engine)
-    print("[SUCCESS] Database initialized successfully!")
\ No newline at end of file
+    print("[SUCCESS] Database initialized successfully!")
@@ -0,0 +1,56 @@
+"""Add memories table for the local memory backend
+
+Revision ID: 3c1f9a2b7d10
+Revises: 777fb514f778
+Create Date: 2025-09-08 10:02:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a2b7d10'
+down_revision: Union[str, Sequence[str], None] = '777fb514f778'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('memories',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.String(length=100), nullable=False),
+    sa.Column('memory', sa.Text(), nullable=False),
+    sa.Column('importance', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_memories_user_id'), 'memories', ['user_id'], unique=False)
+    
+    if op.get_bind().dialect.name == 'sqlite':
+        # Full-text index kept in sync with the memories table by triggers
+        op.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+            memory, content='memories', content_rowid='id', tokenize='porter unicode61'
+        )""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+            INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+        END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+            INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+        END""")
+        op.execute("""CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE OF memory ON memories BEGIN
+            INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+            INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+        END""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS memories_fts')
+    op.drop_index(op.f('ix_memories_user_id'), table_name='memories')
+    op.drop_table('memories')
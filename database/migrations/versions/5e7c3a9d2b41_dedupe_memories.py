@@ -0,0 +1,89 @@
+"""Store each memory once per user, keyed by its normalized text
+
+Revision ID: 5e7c3a9d2b41
+Revises: 8b4e2d6f1a93
+Create Date: 2026-10-17 14:36:52.218409
+
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7c3a9d2b41'
+down_revision: Union[str, Sequence[str], None] = '8b4e2d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same normalization as memory.sqlite_backend.memory_key at the time of writing
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Rebuilding the table on SQLite drops its triggers; these keep memories_fts in sync
+_FTS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+        INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE OF memory ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+        INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+    END""",
+]
+
+
+def _memory_key(memory: str) -> str:
+    return hashlib.sha1(" ".join(_WORD_PATTERN.findall(memory.lower())).encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.add_column(sa.Column('memory_key', sa.String(length=40), nullable=True))
+
+    # Key every row, keeping only the most recently updated copy of a repeated memory
+    bind = op.get_bind()
+    seen = set()
+    duplicates = []
+    rows = bind.execute(sa.text(
+        'SELECT id, user_id, memory FROM memories ORDER BY updated_at DESC, id DESC'
+    )).all()
+    for memory_id, user_id, memory in rows:
+        key = _memory_key(memory)
+        if (user_id, key) in seen:
+            duplicates.append(memory_id)
+            continue
+        seen.add((user_id, key))
+        bind.execute(
+            sa.text('UPDATE memories SET memory_key = :key WHERE id = :id'),
+            {'key': key, 'id': memory_id}
+        )
+    if duplicates:
+        print(f"[INFO] Removing {len(duplicates)} duplicate memories")
+        bind.execute(sa.text('DELETE FROM memories WHERE id IN :ids').bindparams(
+            sa.bindparam('ids', expanding=True)
+        ), {'ids': duplicates})
+
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.alter_column('memory_key', existing_type=sa.String(length=40), nullable=False)
+        batch_op.create_index('ix_memories_user_id_memory_key', ['user_id', 'memory_key'], unique=True)
+    _restore_fts_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.drop_index('ix_memories_user_id_memory_key')
+        batch_op.drop_column('memory_key')
+    _restore_fts_triggers()
+
+
+def _restore_fts_triggers() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in _FTS_TRIGGERS:
+            op.execute(statement)
@@ -0,0 +1,68 @@
+"""Move user preferences from a JSON text column to a key/value table
+
+Revision ID: 8b4e2d6f1a93
+Revises: 3c1f9a2b7d10
+Create Date: 2026-10-17 09:12:05.402117
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e2d6f1a93'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    preferences = op.create_table('user_preferences',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.JSON(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'key')
+    )
+
+    # Carry existing blobs over, one row per top-level key
+    bind = op.get_bind()
+    rows = []
+    now = datetime.utcnow()
+    for user_id, blob in bind.execute(sa.text('SELECT id, preferences FROM users WHERE preferences IS NOT NULL')):
+        try:
+            parsed = json.loads(blob)
+        except ValueError:
+            print(f"[WARNING] Skipping unreadable preferences of user {user_id}")
+            continue
+        if isinstance(parsed, dict):
+            rows.extend({'user_id': user_id, 'key': key, 'value': value, 'updated_at': now} for key, value in parsed.items())
+    if rows:
+        op.bulk_insert(preferences, rows)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('preferences')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('preferences', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    preferences = sa.table('user_preferences', sa.column('user_id'), sa.column('key'), sa.column('value', sa.JSON()))
+    blobs = {}
+    for user_id, key, value in bind.execute(sa.select(preferences.c.user_id, preferences.c.key, preferences.c.value)):
+        blobs.setdefault(user_id, {})[key] = value
+    for user_id, blob in blobs.items():
+        bind.execute(
+            sa.text('UPDATE users SET preferences = :blob WHERE id = :user_id'),
+            {'blob': json.dumps(blob), 'user_id': user_id}
+        )
+    op.drop_table('user_preferences')
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, Float, JSON, ForeignKey, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from .connection import Base
 
@@ -24,7 +24,7 @@ class User(Base):
     
     mem0_user_id = Column(String(100), unique=True, nullable=True)
     
-    preferences = Column(Text, nullable=True)  # JSON string for user preferences
+    # Preferences live in user_preferences, one row per key (see UserPreference)
     
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -48,4 +48,73 @@ class User(Base):
         """Get or generate Mem0 user ID for this user."""
         if not self.mem0_user_id:
             self.mem0_user_id = f"user_{self.id}"
-        return self.mem0_user_id
\ No newline at end of file
+        return self.mem0_user_id
+
+
+class UserPreference(Base):
+    """One preference of a user; a single key can be written without touching the others."""
+    __tablename__ = "user_preferences"
+    
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    value = Column(JSON, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserPreference(user_id={self.user_id}, key={self.key})>"
+
+
+class Memory(Base):
+    """A long-term memory stored by the local memory backend."""
+    __tablename__ = "memories"
+    
+    # Integer key doubles as the SQLite rowid that the FTS index points at
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(100), nullable=False, index=True)
+    memory = Column(Text, nullable=False)
+    # Hash of the memory's lowercased words; a user stores each memory once
+    memory_key = Column(String(40), nullable=False)
+    importance = Column(Float, default=0.5, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_memories_user_id_memory_key", "user_id", "memory_key", unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<Memory(id={self.id}, user_id={self.user_id})>"
+    
+    def to_dict(self):
+        """Convert to the Mem0 memory shape used by the prompt builders."""
+        return {
+            "id": str(self.id),
+            "memory": self.memory,
+            "user_id": self.user_id,
+            "importance": self.importance,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+# SQLite full-text index over memories, kept in sync by triggers
+MEMORY_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+        memory, content='memories', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+        INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE OF memory ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.id, old.memory);
+        INSERT INTO memories_fts(rowid, memory) VALUES (new.id, new.memory);
+    END""",
+]
+
+for _statement in MEMORY_FTS_DDL:
+    event.listen(Memory.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
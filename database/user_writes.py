@@ -0,0 +1,144 @@
+"""
+Single-writer path for the users database.
+
+SQLite allows one writer at a time; concurrent logins each committing their
+own ``last_login`` update fight over the database lock. Every write to the
+users table therefore goes through one ``UserWriter`` per engine:
+
+- Critical writes (creating, updating, deactivating accounts) still commit
+  synchronously, but under the writer's lock, so they never contend with
+  each other inside the process.
+- Frequent low-value writes (``last_login``) are coalesced per user and
+  committed in one batched transaction every few seconds by a background
+  thread, and at interpreter exit.
+"""
+
+import atexit
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+
+from .models import User
+
+# Seconds between batched last_login commits
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", "5"))
+
+
+class UserWriter:
+    """Serializes user writes for one engine and batches last_login updates."""
+
+    def __init__(self, bind: Engine, flush_interval: float = LAST_LOGIN_FLUSH_INTERVAL, max_pending: int = 500):
+        """
+        Args:
+            bind: Engine of the users database
+            flush_interval: Seconds between batched last_login commits
+            max_pending: Pending logins that trigger an early flush
+        """
+        self.engine = bind
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._write_lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._pending_lock)
+        self._pending_logins: Dict[str, datetime] = {}
+        self._worker: Optional[threading.Thread] = None
+        self.batches = 0
+        self.logins_written = 0
+
+    @contextmanager
+    def critical(self) -> Iterator[None]:
+        """Hold the write lock around a synchronous write and its commit."""
+        with self._write_lock:
+            yield
+
+    def record_login(self, user_id: str, when: datetime):
+        """Queue a last_login update; repeated logins of a user collapse into one."""
+        with self._pending_lock:
+            previous = self._pending_logins.get(user_id)
+            if previous is None or when > previous:
+                self._pending_logins[user_id] = when
+            if len(self._pending_logins) >= self.max_pending:
+                self._wakeup.notify()
+        self._ensure_worker()
+
+    def pending_count(self) -> int:
+        with self._pending_lock:
+            return len(self._pending_logins)
+
+    def flush(self) -> int:
+        """
+        Commit every pending last_login update in one transaction.
+
+        Returns:
+            Number of users updated
+        """
+        with self._pending_lock:
+            batch, self._pending_logins = self._pending_logins, {}
+        if not batch:
+            return 0
+
+        statement = (
+            update(User.__table__)
+            .where(User.__table__.c.id == bindparam("user_id"))
+            .values(last_login=bindparam("last_login"))
+        )
+        try:
+            with self._write_lock, self.engine.begin() as conn:
+                conn.execute(statement, [
+                    {"user_id": user_id, "last_login": when} for user_id, when in batch.items()
+                ])
+        except Exception as e:
+            print(f"[WARNING] Failed to write {len(batch)} last_login updates: {e}")
+            with self._pending_lock:
+                for user_id, when in batch.items():
+                    if user_id not in self._pending_logins or self._pending_logins[user_id] < when:
+                        self._pending_logins[user_id] = when
+            return 0
+
+        self.batches += 1
+        self.logins_written += len(batch)
+        return len(batch)
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._pending_lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="athena-user-writer", daemon=True)
+            self._worker.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            with self._pending_lock:
+                self._wakeup.wait(self.flush_interval)
+            self.flush()
+
+
+_writers: "weakref.WeakKeyDictionary[Engine, UserWriter]" = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def _sync_twin(bind: Engine) -> Engine:
+    # The writer flushes from its own thread, outside any event loop, so an
+    # asyncio engine gets a synchronous engine on the same database
+    from .connection import build_engine
+
+    url = bind.url.set(drivername=bind.url.get_backend_name())
+    return build_engine(url.render_as_string(hide_password=False))
+
+
+def get_user_writer(bind: Engine) -> UserWriter:
+    """The single writer for an engine (sync or asyncio), created on first use."""
+    with _writers_lock:
+        writer = _writers.get(bind)
+        if writer is None:
+            writer = _writers[bind] = UserWriter(_sync_twin(bind) if bind.dialect.is_async else bind)
+        return writer
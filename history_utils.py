@@ -0,0 +1,169 @@
+"""
+Utility functions for keeping conversation history within a token budget.
+
+Recent turns are sent to the model verbatim; older turns are folded into a
+rolling summary kept in graph state, so the per-turn prompt stays flat no
+matter how long a thread runs.
+"""
+
+from typing import List, Tuple
+
+from langchain_core.messages import (
+    AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+)
+
+from token_utils import estimate_message_tokens, estimate_tokens
+
+# History token budgets per chat model (verbatim messages + summary)
+HISTORY_TOKEN_BUDGETS = {
+    "gemini-2.5-flash": 24000,
+    "gemini-2.0-flash": 16000,
+}
+DEFAULT_HISTORY_TOKEN_BUDGET = 8000
+
+SUMMARY_INSTRUCTIONS = """You maintain a running summary of a conversation between a family and Athena, their planning assistant.
+Update the existing summary with the new messages. Keep names, ages, preferences, plans, decisions, dates and open questions. Drop greetings and small talk.
+Write compact bullet points, at most {max_words} words in total. Reply with the summary only."""
+
+
+def token_budget_for_model(model: str, override: int = 0) -> int:
+    """History token budget for a model name such as "google_genai:gemini-2.5-flash"."""
+    if override:
+        return override
+    return HISTORY_TOKEN_BUDGETS.get(model.split(":")[-1], DEFAULT_HISTORY_TOKEN_BUDGET)
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """
+    Group messages into turns, each starting at a HumanMessage.
+
+    Tool calls and their results always stay in the same turn as the
+    AI message that requested them.
+    """
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, SystemMessage):
+            continue
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def format_transcript(messages: List[BaseMessage], tool_chars: int = 500) -> str:
+    """Render messages as plain text for the summarizer."""
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {content}")
+        elif isinstance(message, AIMessage):
+            for call in getattr(message, "tool_calls", None) or []:
+                lines.append(f"Athena used {call.get('name')}: {call.get('args')}")
+            if content:
+                lines.append(f"Athena: {content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool result: {content[:tool_chars]}")
+    return "\n".join(lines)
+
+
+class HistoryManager:
+    """Decides which messages stay verbatim and folds the rest into a summary."""
+
+    def __init__(
+        self,
+        summarizer=None,
+        keep_turns: int = 6,
+        fold_turns: int = 4,
+        token_budget: int = DEFAULT_HISTORY_TOKEN_BUDGET,
+        summary_max_words: int = 250
+    ):
+        """
+        Args:
+            summarizer: Chat model used to update the summary (None disables folding)
+            keep_turns: Turns always kept verbatim
+            fold_turns: Extra turns allowed to accumulate before a fold, so the
+                summary is updated once every fold_turns turns rather than every turn
+            token_budget: Maximum estimated tokens for verbatim history plus summary
+            summary_max_words: Target length of the rolling summary
+        """
+        self.summarizer = summarizer
+        self.keep_turns = keep_turns
+        self.fold_turns = fold_turns
+        self.token_budget = token_budget
+        self.summary_max_words = summary_max_words
+
+    def plan(
+        self,
+        messages: List[BaseMessage],
+        summary: str = ""
+    ) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """
+        Split history into messages to fold into the summary and messages to keep.
+
+        Folding starts once more than keep_turns + fold_turns turns are held, or
+        when the verbatim history no longer fits the token budget. The current
+        (last) turn is never folded.
+
+        Returns:
+            Tuple of (messages to fold, messages to keep verbatim)
+        """
+        turns = split_turns(messages)
+        fold_count = 0
+        if self.summarizer and len(turns) > self.keep_turns + self.fold_turns:
+            fold_count = len(turns) - self.keep_turns
+
+        budget = self.token_budget - estimate_tokens(summary)
+        kept_tokens = [estimate_message_tokens(turn) for turn in turns]
+        while fold_count < len(turns) - 1 and sum(kept_tokens[fold_count:]) > budget:
+            fold_count += 1
+
+        folded = [message for turn in turns[:fold_count] for message in turn]
+        kept = [message for turn in turns[fold_count:] for message in turn]
+        return folded, kept
+
+    def prompt_history(
+        self,
+        folded: List[BaseMessage],
+        kept: List[BaseMessage],
+        summary: str = ""
+    ) -> List[BaseMessage]:
+        """
+        Messages to send this turn. Folded turns are still included while the
+        summary that will replace them is being written, if they fit the budget.
+        """
+        if folded and estimate_message_tokens(folded + kept) + estimate_tokens(summary) <= self.token_budget:
+            return folded + kept
+        return kept
+
+    async def asummarize(self, summary: str, folded: List[BaseMessage]) -> str:
+        """Fold messages into the running summary. Returns the old summary on failure."""
+        if not folded or not self.summarizer:
+            return summary
+
+        prompt = [
+            SystemMessage(content=SUMMARY_INSTRUCTIONS.format(max_words=self.summary_max_words)),
+            HumanMessage(content=(
+                f"EXISTING SUMMARY:\n{summary or '(none yet)'}\n\n"
+                f"NEW MESSAGES:\n{format_transcript(folded)}"
+            ))
+        ]
+        try:
+            result = await self.summarizer.ainvoke(prompt)
+        except Exception as e:
+            print(f"[WARNING] History summary update failed: {e}")
+            return summary
+        content = result.content if isinstance(result.content, str) else str(result.content)
+        return content.strip() or summary
+
+
+def render_summary(summary: str) -> str:
+    """System prompt section for the rolling summary."""
+    if not summary:
+        return ""
+    return f"\n\nEARLIER IN THIS CONVERSATION (summary):\n{summary}"
+
+
+def removal_updates(folded: List[BaseMessage]) -> List[RemoveMessage]:
+    """State updates that drop folded messages from the thread."""
+    return [RemoveMessage(id=message.id) for message in folded if message.id]
@@ -0,0 +1,107 @@
+"""
+Shared outbound HTTP connections.
+
+Every external dependency (location lookup, Mem0, Tavily, Gemini) reuses
+long-lived keep-alive connection pools instead of opening a new connection,
+and paying a TLS handshake, per request. ``warm_up`` opens those connections
+in the background at startup so the first turn after a deploy does not pay
+the handshake cost either.
+"""
+
+import os
+import threading
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connections kept open per host, and seconds an idle connection is kept
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))
+
+# Open connections to external services when the agent starts
+HTTP_WARMUP = os.getenv("HTTP_WARMUP", "1").lower() in ("1", "true", "yes")
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Process-wide ``requests`` session with a keep-alive pool per host."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=HTTP_POOL_SIZE,
+                # Retry only idempotent requests on connection errors and gateway hiccups
+                max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                                  allowed_methods=("GET", "HEAD"))
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def create_httpx_client(timeout: float = 300.0) -> httpx.Client:
+    """
+    Pooled ``httpx`` client with the project's keep-alive limits.
+
+    Clients that rewrite base_url and headers (such as Mem0's MemoryClient)
+    need one of their own; it still keeps its connections warm between calls.
+    """
+    return httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def warm_up(urls: Iterable[str] = (), llm=None, timeout: float = 3.0, background: bool = True) -> Optional[threading.Thread]:
+    """
+    Open pooled connections ahead of the first request.
+
+    Args:
+        urls: Endpoints reached through the shared session; one HEAD request per origin
+        llm: Optional Gemini chat model; a model metadata lookup opens its connection
+        timeout: Seconds allowed per warm-up request
+        background: Run on a daemon thread instead of blocking the caller
+
+    Returns:
+        The warm-up thread when running in the background
+    """
+    origins: List[str] = list(dict.fromkeys(_origin(url) for url in urls if url))
+
+    def run():
+        session = get_session()
+        for origin in origins:
+            try:
+                session.head(origin, timeout=timeout)
+            except requests.RequestException as e:
+                print(f"[WARNING] Connection warm-up to {origin} failed: {e}")
+        client = getattr(llm, "client", None)
+        if client is not None and hasattr(client, "models"):
+            try:
+                client.models.get(model=llm.model)
+            except Exception as e:
+                print(f"[WARNING] Connection warm-up for the chat model failed: {e}")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="athena-http-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,84 @@
+"""
+Helpers for keeping module import cheap and free of side effects.
+
+Clients (LLM, memory, search) are built on first use through ``once``
+factories instead of at import time, so a server worker or the CLI can start,
+and tests can import the modules, without API keys or network access.
+"""
+
+import functools
+import os
+import re
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_UNSET = object()
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)")
+
+
+def once(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Turn a zero-argument factory into a thread-safe lazy singleton.
+
+    The first call builds the value; later calls return the same object.
+    ``reset()`` on the returned function drops it, and ``override(value)``
+    installs a stand-in instead (used by tests and benchmarks).
+    """
+    lock = threading.Lock()
+    value = _UNSET
+
+    @functools.wraps(factory)
+    def get():
+        nonlocal value
+        if value is _UNSET:
+            with lock:
+                if value is _UNSET:
+                    value = factory()
+        return value
+
+    def reset():
+        nonlocal value
+        with lock:
+            value = _UNSET
+
+    def override(new_value: T):
+        nonlocal value
+        with lock:
+            value = new_value
+
+    get.reset = reset
+    get.override = override
+    return get
+
+
+def measure_import_time(module: str, env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None) -> Dict[str, float]:
+    """
+    Import a module in a fresh interpreter under ``python -X importtime``.
+
+    Args:
+        module: Dotted module name to import
+        env: Extra environment variables for the child process
+        cwd: Working directory for the child process
+
+    Returns:
+        Cumulative import time in milliseconds of every module the import
+        loaded, keyed by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env={**os.environ, **(env or {})},
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1000.0
+    return times
@@ -0,0 +1,30 @@
+"""
+Long-term memory support for Athena: retrieval, ranking, prompt formatting, a
+per-user cache and a durable write outbox on top of a Mem0-compatible client
+(hosted Mem0, or the local SQLite backend in sqlite_backend).
+"""
+
+from .backends import create_memory_client
+from .cache import CachedMemoryClient
+from .outbox import MemoryOutbox
+from .ranking import MemoryRanker, select_prompt_memories
+from .retrieval import (
+    extract_memory_list,
+    memory_text,
+    format_memory_context,
+    fetch_memories,
+    afetch_memories,
+)
+
+__all__ = [
+    'create_memory_client',
+    'CachedMemoryClient',
+    'MemoryOutbox',
+    'MemoryRanker',
+    'select_prompt_memories',
+    'extract_memory_list',
+    'memory_text',
+    'format_memory_context',
+    'fetch_memories',
+    'afetch_memories',
+]
@@ -0,0 +1,52 @@
+"""
+Construction of the configured memory backend.
+"""
+
+import warnings
+from typing import Optional
+
+MEMORY_BACKENDS = ("mem0", "sqlite")
+
+
+def create_memory_client(backend: str = "mem0", api_key: Optional[str] = None):
+    """
+    Create the raw memory client selected by configuration.
+    
+    Args:
+        backend: "mem0" for the hosted Mem0 service, "sqlite" for the local database
+        api_key: Mem0 API key (only used by the "mem0" backend)
+        
+    Returns:
+        A client with add/get_all/search, or None if memory is unavailable
+    """
+    if backend == "sqlite":
+        from database.connection import engine
+        from .sqlite_backend import SQLiteMemoryClient
+        try:
+            client = SQLiteMemoryClient(engine)
+            print("[INFO] Local memory system initialized")
+            return client
+        except Exception as e:
+            print(f"[WARNING] Failed to initialize local memory: {e}")
+            return None
+    
+    if backend != "mem0":
+        print(f"[WARNING] Unknown MEMORY_BACKEND '{backend}'. Expected one of: {', '.join(MEMORY_BACKENDS)}")
+        return None
+    
+    if not api_key:
+        return None
+    
+    try:
+        from mem0 import MemoryClient
+        from http_clients import create_httpx_client
+        # Suppress the specific mem0 deprecation warning
+        warnings.filterwarnings("ignore", category=DeprecationWarning, module="mem0")
+        client = MemoryClient(api_key=api_key, client=create_httpx_client())
+        print("[INFO] Mem0 memory system initialized")
+        return client
+    except ImportError:
+        print("[WARNING] Mem0 library not installed. Run: pip install mem0ai")
+    except Exception as e:
+        print(f"[WARNING] Failed to initialize Mem0: {e}")
+    return None
@@ -0,0 +1,185 @@
+"""
+Per-user write-through cache in front of a Mem0-compatible client.
+
+``get_all`` results are kept per user in an LRU map, along with the ``limit``
+they were fetched with; a read asking for no more than that is served from
+the entry. Writes made through the
+wrapper apply Mem0's ADD/UPDATE/DELETE events to the cached list; when a write
+result carries no events (e.g. Mem0 queued it for async processing) the entry
+is allowed to live only a short while longer before it is refetched.
+
+The per-user version, which cached answers are checked against, changes only
+when the memories do: on a write with events, or when a refetch after an
+event-less write returns a different list.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .retrieval import extract_memory_list
+
+
+def _memory_texts(memories: List[Dict[str, Any]]) -> List[Any]:
+    return [memory.get("memory") if isinstance(memory, dict) else memory for memory in memories]
+
+
+class _CacheEntry:
+    __slots__ = ("memories", "expires_at", "version", "limit")
+
+    def __init__(self, memories: List[Dict[str, Any]], expires_at: float, version: int, limit: Optional[int] = None):
+        self.memories = memories
+        self.expires_at = expires_at
+        self.version = version
+        self.limit = limit
+
+    def covers(self, limit: Optional[int]) -> bool:
+        """Whether this entry holds everything a read with ``limit`` would return."""
+        return self.limit is None or (limit is not None and limit <= self.limit)
+
+
+class CachedMemoryClient:
+    """Wraps a memory client with a bounded, versioned per-user ``get_all`` cache."""
+
+    def __init__(
+        self,
+        client,
+        max_users: int = 256,
+        max_age: float = 300.0,
+        write_staleness: float = 30.0
+    ):
+        """
+        Args:
+            client: Underlying memory client (Mem0 ``MemoryClient`` or compatible)
+            max_users: Users kept before the least recently used is evicted
+            max_age: Seconds a fetched memory list is served without refetching
+            write_staleness: Seconds an entry may still be served after a write
+                whose effect on the memory list is unknown
+        """
+        self.client = client
+        self.max_users = max_users
+        self.max_age = max_age
+        self.write_staleness = write_staleness
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_all(self, user_id: str, limit: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """Return the user's memories (at most ``limit`` when given), from cache when fresh."""
+        if kwargs:
+            # Filtered or paginated queries are not cached
+            if limit is not None:
+                kwargs["limit"] = limit
+            return self.client.get_all(user_id=user_id, **kwargs)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and now < entry.expires_at and entry.covers(limit):
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                # Memories added since the fetch are kept even past the entry's own limit
+                if limit is not None and limit != entry.limit:
+                    return {"results": entry.memories[:limit]}
+                return {"results": list(entry.memories)}
+            self.misses += 1
+            version = self._versions.get(user_id, 0)
+
+        if limit is None:
+            response = self.client.get_all(user_id=user_id)
+        else:
+            response = self.client.get_all(user_id=user_id, limit=limit)
+        memories = extract_memory_list(response)
+
+        with self._lock:
+            # Skip the store if a write landed while we were fetching
+            if self._versions.get(user_id, 0) == version:
+                previous = self._entries.get(user_id)
+                if (previous is not None and previous.limit == limit
+                        and _memory_texts(previous.memories) != _memory_texts(memories)):
+                    # An earlier write without events has since been processed
+                    version = self._versions[user_id] = version + 1
+                self._entries[user_id] = _CacheEntry(list(memories), now + self.max_age, version, limit)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return {"results": memories}
+
+    def search(self, query: str, user_id: str, **kwargs) -> Any:
+        """Search is query-specific and always goes to the backend."""
+        return self.client.search(query, user_id=user_id, **kwargs)
+
+    def add(self, messages: List[Dict[str, str]], user_id: str, **kwargs) -> Any:
+        """Write through to the backend and apply the result to the cached list."""
+        result = self.client.add(messages, user_id=user_id, **kwargs)
+        self.apply_write(user_id, result)
+        return result
+
+    def apply_write(self, user_id: str, result: Any):
+        """Fold a Mem0 ``add`` result into the cache, bumping the user's version if memories changed."""
+        events = [
+            event for event in extract_memory_list(result)
+            if isinstance(event, dict) and event.get("event") in ("ADD", "UPDATE", "DELETE")
+        ]
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if not events:
+                # Unknown effect: refetch soon, and let the refetch decide on a new version
+                if entry:
+                    entry.expires_at = min(entry.expires_at, time.monotonic() + self.write_staleness)
+                return
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            if not entry:
+                return
+            entry.version = self._versions[user_id]
+            for event in events:
+                self._apply_event(entry, event)
+
+    @staticmethod
+    def _apply_event(entry: _CacheEntry, event: Dict[str, Any]):
+        memory_id = event.get("id")
+        kind = event["event"]
+        if kind == "ADD":
+            entry.memories.append({"id": memory_id, "memory": event.get("memory", "")})
+            return
+        for index, memory in enumerate(entry.memories):
+            if memory.get("id") == memory_id:
+                if kind == "DELETE":
+                    del entry.memories[index]
+                else:
+                    entry.memories[index] = {**memory, "memory": event.get("memory", memory.get("memory"))}
+                return
+        if kind == "UPDATE":
+            entry.memories.append({"id": memory_id, "memory": event.get("memory", "")})
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user's cached memories, or everyone's."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def version(self, user_id: str) -> int:
+        """Counter that changes whenever a write for this user is applied."""
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "users": len(self._entries)
+            }
+
+    def __getattr__(self, name):
+        # Anything else (delete, history, ...) goes straight to the backend
+        return getattr(self.client, name)
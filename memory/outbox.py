@@ -0,0 +1,382 @@
+"""
+Durable outbox for memory writes.
+
+Interactions are appended to a local JSON-lines log and acknowledged once the
+memory backend accepts them, so a response never waits on a remote write and
+a backend outage never loses a turn. A background worker drains the log,
+batching several turns per user into one ``add`` call and retrying failures
+with exponential backoff per user, so one user's failing writes never hold up
+another's. Records that keep failing are moved to a dead-letter file.
+
+``enqueue`` only writes the record to the OS; the worker thread does the
+fsync (one for every burst of turns) and rewrites the log, so a chat turn
+never waits on the disk.
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MemoryOutbox:
+    """Append-only, disk-backed queue of pending memory writes."""
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        batch_size: int = 8,
+        flush_interval: float = 2.0,
+        max_backoff: float = 300.0,
+        compact_after: int = 500,
+        max_attempts: int = 5,
+        dead_letter_path: Optional[str] = None,
+        on_delivered: Optional[Callable[[str, Any], None]] = None
+    ):
+        """
+        Args:
+            client: Memory client with a Mem0-style ``add(messages, user_id=...)``
+            path: Location of the append-only log file
+            batch_size: Maximum turns merged into one ``add`` call per user
+            flush_interval: Seconds the worker waits to collect a batch
+            max_backoff: Upper bound on the retry delay after failures
+            compact_after: Acknowledged records tolerated before the log is rewritten
+            max_attempts: Failed deliveries after which a record is dead-lettered
+            dead_letter_path: Where dead-lettered records go (default ``<path>.dead``)
+            on_delivered: Optional callback ``(user_id, add_result)`` after each write
+        """
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.compact_after = compact_after
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path or f"{path}.dead"
+        self.on_delivered = on_delivered
+
+        # Lock order: _sync_lock, then _log_lock, then _lock. Only _lock and
+        # _log_lock (a buffered write) are ever taken on the caller's thread.
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._log_lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # fsync and compaction, worker side only
+        self._deliver_lock = threading.Lock()  # One delivery round at a time
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._attempts: Dict[str, int] = {}
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._acked_since_compact = 0
+        self._dirty = False
+        self._compacting: Optional[List[Dict[str, Any]]] = None
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+
+        self._replay()
+        self._log = open(self.path, "a", encoding="utf-8")
+
+    def start(self) -> "MemoryOutbox":
+        """Start the background worker and flush the outbox at interpreter exit."""
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return self
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="athena-memory-outbox", daemon=True)
+            self._worker.start()
+        atexit.register(self.close)
+        return self
+
+    def enqueue(self, user_id: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Record an interaction for later delivery.
+
+        The record reaches the OS before this returns (it survives a crash of
+        the process); the worker fsyncs it shortly after.
+
+        Args:
+            user_id: Memory owner
+            messages: Chat messages to store, as role/content dicts
+
+        Returns:
+            The record ID
+        """
+        record = {
+            "op": "add",
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "messages": messages,
+            "ts": time.time()
+        }
+        with self._log_lock:
+            self._write([record])
+            with self._lock:
+                self._pending[record["id"]] = record
+                self._dirty = True
+                self._wakeup.notify()
+        return record["id"]
+
+    def pending_count(self) -> int:
+        """Number of interactions not yet accepted by the memory backend."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver everything pending now, ignoring any retry backoff.
+
+        Returns:
+            True if the outbox is empty afterwards
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._retry_at.clear()
+        while self.pending_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if not self._deliver_once():
+                break
+        self._sync()
+        return self.pending_count() == 0
+
+    def close(self, timeout: float = 10.0):
+        """Stop the worker after a final flush attempt. Undelivered turns stay on disk."""
+        atexit.unregister(self.close)
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+            worker = self._worker
+        if worker and worker.is_alive() and worker is not threading.current_thread():
+            worker.join(timeout)
+        self.flush(timeout)
+        self._compact()
+
+    # Worker -----------------------------------------------------------------
+
+    def _due(self, now: float) -> bool:
+        # Caller holds the lock
+        return any(self._retry_at.get(record["user_id"], 0.0) <= now for record in self._pending.values())
+
+    def _next_retry_wait(self, now: float) -> float:
+        # Caller holds the lock
+        if not self._pending:
+            return self.flush_interval
+        soonest = min(self._retry_at.get(record["user_id"], 0.0) for record in self._pending.values())
+        return max(0.05, soonest - now)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping and not self._dirty and not self._due(time.monotonic()):
+                    self._wakeup.wait(self._next_retry_wait(time.monotonic()))
+                if self._stopping:
+                    return
+            # New turns reach the disk before the worker waits to batch them
+            self._sync()
+            with self._lock:
+                if not self._due(time.monotonic()):
+                    continue
+                # Give a burst of turns a moment to accumulate into one batch
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self._stopping:
+                    return
+            self._deliver_once()
+
+    def _deliver_once(self) -> bool:
+        """Send the batches of every user not backing off. Returns False if any batch failed."""
+        with self._deliver_lock:
+            ok = self._deliver_batches()
+        with self._lock:
+            compact = self._acked_since_compact >= self.compact_after
+        if compact:
+            self._compact()
+        return ok
+
+    def _deliver_batches(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # One batch of fresh turns per user; records that failed before go
+            # alone, so a bad record cannot sink the turns queued behind it
+            batches: List[List[Dict[str, Any]]] = []
+            fresh: Dict[str, List[Dict[str, Any]]] = {}
+            for record in self._pending.values():
+                if self._retry_at.get(record["user_id"], 0.0) > now:
+                    continue
+                if self._attempts.get(record["id"]):
+                    batches.append([record])
+                    continue
+                batch = fresh.get(record["user_id"])
+                if batch is None:
+                    batch = fresh[record["user_id"]] = []
+                    batches.append(batch)
+                if len(batch) < self.batch_size:
+                    batch.append(record)
+
+        failed_users = set()
+        for records in batches:
+            user_id = records[0]["user_id"]
+            messages = [message for record in records for message in record["messages"]]
+            try:
+                result = self.client.add(messages, user_id=user_id)
+            except Exception as e:
+                failed_users.add(user_id)
+                self._record_failure(user_id, records, e)
+                continue
+
+            ids = [record["id"] for record in records]
+            self._append([{"op": "ack", "ids": ids}])
+            with self._lock:
+                if user_id not in failed_users:
+                    self._failures.pop(user_id, None)
+                    self._retry_at.pop(user_id, None)
+                for record_id in ids:
+                    self._pending.pop(record_id, None)
+                    self._attempts.pop(record_id, None)
+                self._acked_since_compact += len(ids)
+
+            if self.on_delivered:
+                try:
+                    self.on_delivered(user_id, result)
+                except Exception as e:
+                    print(f"[WARNING] Memory outbox delivery callback failed: {e}")
+        return not failed_users
+
+    def _record_failure(self, user_id: str, records: List[Dict[str, Any]], error: Exception):
+        # The fail line and the attempt counts it stands for change under the
+        # same lock compaction snapshots under, so a rewrite keeps one of them
+        with self._log_lock:
+            self._write([{"op": "fail", "ids": [record["id"] for record in records]}])
+            with self._lock:
+                dead = []
+                for record in records:
+                    self._attempts[record["id"]] = self._attempts.get(record["id"], 0) + 1
+                    if self._attempts[record["id"]] >= self.max_attempts:
+                        dead.append(record)
+                self._failures[user_id] = self._failures.get(user_id, 0) + 1
+                backoff = min(self.max_backoff, 2 ** min(self._failures[user_id], 16))
+                self._retry_at[user_id] = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+                pending = len(self._pending)
+                self._dirty = True
+        self._sync()
+
+        if dead:
+            self._dead_letter(dead, error)
+        print(f"[WARNING] Failed to store memory for {user_id} ({pending} pending, retrying in {backoff:.0f}s): {error}")
+
+    def _dead_letter(self, records: List[Dict[str, Any]], error: Exception):
+        """Move records that keep failing out of the queue, keeping them for inspection."""
+        with open(self.dead_letter_path, "a", encoding="utf-8") as dead_log:
+            for record in records:
+                dead_log.write(json.dumps(dict(record, error=str(error), attempts=self.max_attempts)) + "\n")
+            dead_log.flush()
+            os.fsync(dead_log.fileno())
+        ids = [record["id"] for record in records]
+        self._append([{"op": "ack", "ids": ids}])
+        with self._lock:
+            for record_id in ids:
+                self._pending.pop(record_id, None)
+                self._attempts.pop(record_id, None)
+            self._acked_since_compact += len(ids)
+        print(f"[WARNING] Moved {len(ids)} memory writes to {self.dead_letter_path} after {self.max_attempts} failed attempts")
+
+    # Log file ---------------------------------------------------------------
+
+    def _write(self, records: List[Dict[str, Any]]):
+        """Write records to the log, without fsync. Caller holds _log_lock."""
+        for record in records:
+            self._log.write(json.dumps(record) + "\n")
+        self._log.flush()
+        if self._compacting is not None:
+            self._compacting.extend(records)
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Write records to the log and fsync them. Worker side only."""
+        with self._log_lock:
+            self._write(records)
+        with self._lock:
+            self._dirty = True
+        self._sync()
+
+    def _sync(self):
+        """fsync everything written so far, outside the locks enqueue takes."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        with self._sync_lock:
+            os.fsync(self._log.fileno())
+
+    def _replay(self):
+        """Load unacknowledged records left by a previous process."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn final write from a crash
+                if record.get("op") == "add":
+                    self._pending[record["id"]] = record
+                    if record.get("attempts"):
+                        self._attempts[record["id"]] = record["attempts"]
+                elif record.get("op") == "fail":
+                    for record_id in record.get("ids", []):
+                        self._attempts[record_id] = self._attempts.get(record_id, 0) + 1
+                elif record.get("op") == "ack":
+                    for record_id in record.get("ids", []):
+                        self._pending.pop(record_id, None)
+                        self._attempts.pop(record_id, None)
+        if self._pending:
+            print(f"[INFO] Memory outbox recovered {len(self._pending)} undelivered interactions")
+        tmp_path = f"{self.path}.tmp"
+        self._write_snapshot(tmp_path, list(self._pending.values()), self._attempts)
+        os.replace(tmp_path, self.path)
+
+    def _write_snapshot(self, tmp_path: str, records: List[Dict[str, Any]], attempts_by_id: Dict[str, int]):
+        """Write pending records, with their attempt counts, to a fresh file and fsync it."""
+        with open(tmp_path, "w", encoding="utf-8") as log:
+            for record in records:
+                attempts = attempts_by_id.get(record["id"])
+                log.write(json.dumps(dict(record, attempts=attempts) if attempts else record) + "\n")
+            log.flush()
+            os.fsync(log.fileno())
+
+    def _compact(self):
+        """
+        Rewrite the log with only pending records.
+
+        The rewrite and its fsync run without the locks enqueue takes; lines
+        written meanwhile are carried over when the new log is swapped in.
+        """
+        with self._sync_lock:
+            with self._log_lock:
+                with self._lock:
+                    snapshot = list(self._pending.values())
+                    attempts = dict(self._attempts)
+                    self._acked_since_compact = 0
+                self._compacting = []
+
+            tmp_path = f"{self.path}.tmp"
+            self._write_snapshot(tmp_path, snapshot, attempts)
+
+            with self._log_lock:
+                carried, self._compacting = self._compacting, None
+                with open(tmp_path, "a", encoding="utf-8") as log:
+                    for record in carried:
+                        log.write(json.dumps(record) + "\n")
+                    log.flush()
+                    os.fsync(log.fileno())
+                self._log.close()
+                os.replace(tmp_path, self.path)
+                self._log = open(self.path, "a", encoding="utf-8")
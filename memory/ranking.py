@@ -0,0 +1,224 @@
+"""
+Ranking of retrieved memories before they are placed in the prompt.
+
+Every memory is scored against the current user message with hashed
+character n-gram vectors, and the relevance score is blended with recency and
+stored importance. Scoring is batched with NumPy over sparse features, and
+the best memories are picked with ``argpartition`` under a token budget.
+"""
+
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from token_utils import estimate_tokens
+from .retrieval import memory_text
+
+
+class MemoryRanker:
+    """Scores memories by relevance to a query, recency and importance."""
+
+    def __init__(
+        self,
+        dim: int = 1 << 14,
+        ngram: int = 3,
+        relevance_weight: float = 0.6,
+        recency_weight: float = 0.25,
+        importance_weight: float = 0.15,
+        recency_half_life_days: float = 30.0,
+        feature_cache_size: int = 50000
+    ):
+        """
+        Args:
+            dim: Size of the hashed feature space
+            ngram: Character n-gram length (whole words are hashed too)
+            relevance_weight: Weight of query similarity in the final score
+            recency_weight: Weight of memory age in the final score
+            importance_weight: Weight of stored importance in the final score
+            recency_half_life_days: Age at which the recency score halves
+            feature_cache_size: Memories whose features are kept between turns
+        """
+        self.dim = dim
+        self.ngram = ngram
+        self.weights = np.array([relevance_weight, recency_weight, importance_weight], dtype=np.float32)
+        self.recency_half_life = recency_half_life_days * 86400.0
+        self.feature_cache_size = feature_cache_size
+        self._row_cache: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed, L2-normalized sparse n-gram vector of a text as (indices, weights)."""
+        normalized = " ".join(text.lower().split())
+        padded = f" {normalized} "
+        grams = [padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1))]
+        grams.extend(normalized.split())
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint32, count=len(grams)
+        )
+        indices, counts = np.unique(hashes % self.dim, return_counts=True)
+        weights = counts.astype(np.float32)
+        weights /= np.linalg.norm(weights)
+        return indices.astype(np.int32), weights
+
+    def score(self, query: str, memories: List[Dict[str, Any]], now: Optional[datetime] = None) -> np.ndarray:
+        """Combined score for each memory, in input order."""
+        if not memories:
+            return np.zeros(0, dtype=np.float32)
+
+        rows = self._rows(memories)
+        relevance = self._relevance(query, rows)
+
+        now_ts = (now or datetime.utcnow()).replace(tzinfo=timezone.utc).timestamp()
+        stamps = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        ages = np.maximum(now_ts - stamps, 0.0)
+        recency = np.exp2(-ages / self.recency_half_life)
+        recency[np.isnan(stamps)] = 0.5  # Unknown age counts as middling
+
+        importance = np.fromiter((row[3] for row in rows), dtype=np.float32, count=len(rows))
+        scores = np.stack([relevance, recency.astype(np.float32), importance], axis=1)
+        return scores @ self.weights
+
+    def rank(
+        self,
+        query: str,
+        memories: List[Dict[str, Any]],
+        top_k: int = 10,
+        token_budget: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Pick the best memories for a query.
+        
+        Args:
+            query: Current user message
+            memories: Candidate memories
+            top_k: Maximum number of memories returned
+            token_budget: Maximum estimated tokens across returned memory texts
+            now: Reference time for recency (defaults to the current UTC time)
+            
+        Returns:
+            Memories ordered best first
+        """
+        if not memories or top_k <= 0:
+            return []
+
+        scores = self.score(query, memories, now)
+        k = min(top_k, len(memories))
+        if token_budget is None and k < len(memories):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            # With a budget, memories that don't fit are replaced by the next best ones
+            candidates = np.arange(len(memories))
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        selected = []
+        used = 0
+        for index in ordered:
+            memory = memories[int(index)]
+            cost = estimate_tokens(memory_text(memory))
+            if token_budget is not None and used + cost > token_budget:
+                continue
+            used += cost
+            selected.append(memory)
+            if len(selected) == k:
+                break
+        return selected
+
+    def _rows(self, memories: List[Dict[str, Any]]) -> List[tuple]:
+        """Per-memory (indices, weights, timestamp, importance), cached between turns."""
+        rows = []
+        missing = []
+        with self._lock:
+            for position, memory in enumerate(memories):
+                key = (memory.get("id"), memory_text(memory))
+                row = self._row_cache.get(key)
+                if row is None:
+                    missing.append((position, key, memory))
+                rows.append(row)
+
+        for position, key, memory in missing:
+            indices, weights = self.features(key[1])
+            rows[position] = (indices, weights, _timestamp(memory), _importance(memory))
+
+        if missing:
+            with self._lock:
+                for position, key, _ in missing:
+                    self._row_cache[key] = rows[position]
+                while len(self._row_cache) > self.feature_cache_size:
+                    self._row_cache.pop(next(iter(self._row_cache)))
+        return rows
+
+    def _relevance(self, query: str, rows: List[tuple]) -> np.ndarray:
+        """Cosine similarity of every memory to the query in one batched pass."""
+        if not query:
+            return np.zeros(len(rows), dtype=np.float32)
+
+        query_indices, query_weights = self.features(query)
+        query_vector = np.zeros(self.dim, dtype=np.float32)
+        query_vector[query_indices] = query_weights
+
+        lengths = np.fromiter((len(row[0]) for row in rows), dtype=np.int64, count=len(rows))
+        all_indices = np.concatenate([row[0] for row in rows])
+        all_weights = np.concatenate([row[1] for row in rows])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.add.reduceat(query_vector[all_indices] * all_weights, starts).astype(np.float32)
+
+
+def _importance(memory: Dict[str, Any]) -> float:
+    """Stored importance clamped to [0, 1], defaulting to 0.5."""
+    value = memory.get("importance")
+    if value is None:
+        value = (memory.get("metadata") or {}).get("importance", 0.5)
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def _timestamp(memory: Dict[str, Any]) -> float:
+    """UTC epoch seconds of a memory's last update; NaN if unknown."""
+    stamp = memory.get("updated_at") or memory.get("created_at")
+    if not stamp:
+        return float("nan")
+    try:
+        moment = datetime.fromisoformat(str(stamp).replace("Z", "+00:00"))
+    except ValueError:
+        return float("nan")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # Naive stamps are stored in UTC
+    return moment.timestamp()
+
+
+_default_ranker = MemoryRanker()
+
+
+def select_prompt_memories(
+    query: str,
+    memories: List[Dict[str, Any]],
+    relevant: List[Dict[str, Any]],
+    memory_limit: int = 10,
+    relevant_limit: int = 3,
+    token_budget: Optional[int] = None,
+    ranker: Optional[MemoryRanker] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Rank stored and searched memories for the prompt.
+    
+    Search results already shown among the stored memories are dropped, and
+    both sections together stay within the token budget.
+    
+    Returns:
+        Tuple of (stored memories, relevant memories), best first
+    """
+    ranker = ranker or _default_ranker
+    chosen = ranker.rank(query, memories, top_k=memory_limit, token_budget=token_budget)
+    
+    shown = {memory_text(memory) for memory in chosen}
+    remaining = None
+    if token_budget is not None:
+        remaining = max(token_budget - sum(estimate_tokens(text) for text in shown), 0)
+    extra = [memory for memory in relevant if memory_text(memory) not in shown]
+    return chosen, ranker.rank(query, extra, top_k=relevant_limit, token_budget=remaining)
@@ -0,0 +1,168 @@
+"""
+Memory retrieval helpers shared by the LangGraph agent and the CLI chatbot.
+Fetches the user's stored memories and query-relevant matches concurrently,
+and formats them into system prompt context. Given a metrics registry, each
+source is timed as its own stage ("memory_get_all", "memory_search").
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import StageMetrics
+
+DEFAULT_MEMORY_NOTE = "IMPORTANT: Use this information to personalize your responses."
+# Most recent stored memories fetched per turn; the ranker picks from these
+DEFAULT_FETCH_LIMIT = 200
+
+# Small shared pool so get_all and search can overlap for synchronous callers
+_fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="athena-memory")
+
+
+def extract_memory_list(response: Any) -> List[Dict[str, Any]]:
+    """Normalize the different Mem0 response shapes into a list of memories."""
+    if isinstance(response, dict):
+        if 'results' in response:
+            return response['results'] or []
+        if 'memories' in response:
+            return response['memories'] or []
+        return []
+    if isinstance(response, list):
+        return response
+    return []
+
+
+def memory_text(memory: Any) -> str:
+    """Get the display text of a single memory entry."""
+    if isinstance(memory, dict):
+        return memory.get('memory', memory.get('text', str(memory)))
+    return str(memory)
+
+
+def format_memory_context(
+    memories: List[Dict[str, Any]],
+    relevant: List[Dict[str, Any]],
+    memory_limit: int = 10,
+    relevant_limit: int = 3,
+    note: str = DEFAULT_MEMORY_NOTE
+) -> str:
+    """
+    Render stored and query-relevant memories as a system prompt suffix.
+    
+    Args:
+        memories: The user's stored memories
+        relevant: Memories matching the current message
+        memory_limit: Maximum stored memories to include
+        relevant_limit: Maximum relevant memories to include
+        note: Instruction appended after the stored memories
+        
+    Returns:
+        Prompt text, or an empty string if there is nothing to add
+    """
+    memory_context = ""
+    if memories:
+        memory_context = "\n\nSTORED FAMILY INFORMATION:\n"
+        for memory in memories[:memory_limit]:
+            memory_context += f"• {memory_text(memory)}\n"
+        memory_context += f"\n{note}"
+    
+    if relevant:
+        memory_context += "\n\nRELEVANT CONTEXT FOR THIS QUERY:\n"
+        for result in relevant[:relevant_limit]:
+            memory_context += f"• {memory_text(result)}\n"
+    
+    return memory_context
+
+
+def _timed(metrics: Optional[StageMetrics], stage: str, user_id: str, func, *args) -> List[Dict[str, Any]]:
+    """Run one memory call, recording its duration even if the caller stops waiting."""
+    if metrics is None:
+        return func(*args)
+    with metrics.time(stage, user_id):
+        return func(*args)
+
+
+def _get_all(client, user_id: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+    if limit is None:
+        return extract_memory_list(client.get_all(user_id=user_id))
+    return extract_memory_list(client.get_all(user_id=user_id, limit=limit))
+
+
+def _search(client, user_id: str, user_message: str) -> List[Dict[str, Any]]:
+    return extract_memory_list(client.search(user_message, user_id=user_id))
+
+
+def fetch_memories(
+    client,
+    user_id: str,
+    user_message: Optional[str] = None,
+    timeout: Optional[float] = None,
+    limit: Optional[int] = DEFAULT_FETCH_LIMIT,
+    metrics: Optional[StageMetrics] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Fetch stored memories and search results for a user in parallel threads.
+    
+    A source that fails or exceeds the timeout contributes an empty list.
+    Only the ``limit`` most recent stored memories are fetched (None for all).
+    With ``metrics``, get_all and search are recorded as separate stages.
+    
+    Returns:
+        Tuple of (stored memories, relevant memories)
+    """
+    if not client or not user_id:
+        return [], []
+    
+    futures = {"get_all": _fetch_executor.submit(
+        _timed, metrics, "memory_get_all", user_id, _get_all, client, user_id, limit
+    )}
+    if user_message:
+        futures["search"] = _fetch_executor.submit(
+            _timed, metrics, "memory_search", user_id, _search, client, user_id, user_message
+        )
+    
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            print(f"[WARNING] Memory {name} timed out after {timeout}s")
+        except Exception as e:
+            print(f"[WARNING] Memory {name} failed: {e}")
+    
+    return results.get("get_all", []), results.get("search", [])
+
+
+async def _bounded(name: str, func, timeout: Optional[float], *args) -> List[Dict[str, Any]]:
+    """Run a blocking memory call in a thread, giving up after the timeout."""
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout)
+    except asyncio.TimeoutError:
+        print(f"[WARNING] Memory {name} timed out after {timeout}s")
+    except Exception as e:
+        print(f"[WARNING] Memory {name} failed: {e}")
+    return []
+
+
+async def afetch_memories(
+    client,
+    user_id: str,
+    user_message: Optional[str] = None,
+    timeout: Optional[float] = None,
+    limit: Optional[int] = DEFAULT_FETCH_LIMIT,
+    metrics: Optional[StageMetrics] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Async variant of fetch_memories() for use inside graph nodes."""
+    if not client or not user_id:
+        return [], []
+    
+    calls = [_bounded("get_all", _timed, timeout, metrics, "memory_get_all", user_id, _get_all, client, user_id, limit)]
+    if user_message:
+        calls.append(_bounded(
+            "search", _timed, timeout, metrics, "memory_search", user_id, _search, client, user_id, user_message
+        ))
+    
+    results = await asyncio.gather(*calls)
+    memories = results[0]
+    relevant = results[1] if len(results) > 1 else []
+    return memories, relevant
@@ -0,0 +1,285 @@
+"""
+Self-hosted memory backend on the project's SQLAlchemy database.
+
+Exposes the ``add``/``get_all``/``search`` surface of ``mem0.MemoryClient`` so
+it can be swapped in without touching the prompt builders. Memories live in
+the ``memories`` table; on SQLite, ``search`` uses the ``memories_fts`` FTS5
+index, elsewhere it falls back to a case-insensitive substring match.
+
+Messages are not stored verbatim: ``add`` splits them into sentences, scores
+each with ``memory_importance`` (questions, small talk and fragments score
+low, statements of fact about the family score high) and keeps only the best
+few, capped in length. A user holds each memory once: sentences are keyed by
+``memory_key`` (their lowercased words), and repeating a stored one refreshes
+it instead of adding a copy.
+"""
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, insert, or_, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from database.models import Memory, MEMORY_FTS_DDL
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Words that carry no memory on their own ("ok thanks!", "hi there")
+_FILLER_WORDS = frozenset(
+    "ok okay thanks thank you hi hello hey yes yeah no nope sure great cool nice bye please lol hmm well there so much very really".split()
+)
+# Phrasings that usually state a lasting fact or preference
+_FACT_WORDS = frozenset(
+    "is are was has have likes like loves love hates hate prefers prefer allergic favorite favourite birthday born "
+    "lives live works work goes go plays play always never usually every name named".split()
+)
+_PERSONAL_WORDS = frozenset("i my we our me us i'm we're mine".split())
+
+MEMORY_MIN_WORDS = 3
+MEMORY_MIN_IMPORTANCE = 0.5
+MEMORY_MAX_CHARS = 300
+MEMORY_MAX_PER_MESSAGE = 3
+
+_FTS_SEARCH = text("""
+    SELECT m.id, m.user_id, m.memory, m.importance, m.created_at, m.updated_at,
+           bm25(memories_fts) AS rank
+    FROM memories_fts
+    JOIN memories m ON m.id = memories_fts.rowid
+    WHERE memories_fts MATCH :query AND m.user_id = :user_id
+    ORDER BY rank
+    LIMIT :limit
+""").columns(created_at=DateTime, updated_at=DateTime)
+
+
+def _row_to_memory(row) -> Dict[str, Any]:
+    def iso(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    return {
+        "id": str(row.id),
+        "memory": row.memory,
+        "user_id": row.user_id,
+        "importance": row.importance,
+        "created_at": iso(row.created_at),
+        "updated_at": iso(row.updated_at)
+    }
+
+
+def memory_importance(sentence: str) -> float:
+    """Heuristic 0..1 score of how worth remembering a sentence is."""
+    words = _WORD_PATTERN.findall(sentence.lower())
+    if len(words) < MEMORY_MIN_WORDS or all(word in _FILLER_WORDS for word in words):
+        return 0.0
+    if sentence.rstrip().endswith("?"):
+        return 0.1
+    score = 0.4
+    if any(word in _FACT_WORDS for word in words):
+        score += 0.3
+    # A name after the first word ("... Emma ...") or a first-person statement
+    if any(word[:1].isupper() for word in sentence.split()[1:]) or any(word in _PERSONAL_WORDS for word in words):
+        score += 0.2
+    return round(min(score, 1.0), 2)
+
+
+def extract_memories(
+    content: str,
+    min_importance: float = MEMORY_MIN_IMPORTANCE,
+    max_chars: int = MEMORY_MAX_CHARS,
+    limit: int = MEMORY_MAX_PER_MESSAGE
+) -> List[Tuple[str, float]]:
+    """
+    The sentences of a message worth storing, with their importance.
+
+    Returns:
+        Up to ``limit`` (sentence, importance) pairs in reading order, each cut to ``max_chars``
+    """
+    scored = []
+    for position, sentence in enumerate(_SENTENCE_SPLIT.split(content)):
+        sentence = sentence.strip()
+        importance = memory_importance(sentence)
+        if importance >= min_importance:
+            if len(sentence) > max_chars:
+                sentence = sentence[:max_chars].rsplit(" ", 1)[0]
+            scored.append((importance, -position, sentence))
+    best = sorted(scored, reverse=True)[:limit]
+    best.sort(key=lambda item: -item[1])
+    return [(sentence, importance) for importance, _, sentence in best]
+
+
+def memory_key(sentence: str) -> str:
+    """Deduplication key of a memory: a hash of its lowercased words."""
+    normalized = " ".join(_WORD_PATTERN.findall(sentence.lower()))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def build_fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query that matches any of its words."""
+    words = _WORD_PATTERN.findall(query.lower())
+    if not words:
+        return None
+    return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class SQLiteMemoryClient:
+    """Local, offline memory store with a Mem0-compatible interface."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        store_roles: tuple = ("user",),
+        min_importance: float = MEMORY_MIN_IMPORTANCE,
+        max_chars: int = MEMORY_MAX_CHARS
+    ):
+        """
+        Args:
+            bind: SQLAlchemy engine for the project database
+            store_roles: Message roles whose content is kept as memories
+            min_importance: Sentences scoring lower are not stored
+            max_chars: Longest memory stored; longer sentences are cut at a word
+        """
+        self.engine = bind
+        self.store_roles = store_roles
+        self.min_importance = min_importance
+        self.max_chars = max_chars
+        self.use_fts = bind.dialect.name == "sqlite"
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Create the memories table and, on SQLite, its FTS index."""
+        Memory.__table__.create(self.engine, checkfirst=True)
+        if self.use_fts:
+            with self.engine.begin() as conn:
+                for statement in MEMORY_FTS_DDL:
+                    conn.exec_driver_sql(statement)
+
+    def add(
+        self,
+        messages: List[Dict[str, str]],
+        user_id: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Store the sentences of each message that are worth remembering.
+
+        A sentence the user already has a memory for is not stored again; the
+        existing row gets the newer wording, the higher importance and a fresh
+        ``updated_at``.
+
+        Returns:
+            Mem0-style result with an ``ADD`` event per new memory and an
+            ``UPDATE`` event per existing memory whose wording changed
+        """
+        fixed_importance = (metadata or {}).get("importance")
+        now = datetime.utcnow()
+        rows: Dict[str, Dict[str, Any]] = {}
+        for message in messages:
+            if message.get("role") not in self.store_roles or not isinstance(message.get("content"), str):
+                continue
+            for sentence, importance in extract_memories(message["content"], self.min_importance, self.max_chars):
+                if fixed_importance is not None:
+                    importance = float(fixed_importance)
+                key = memory_key(sentence)
+                if key in rows:
+                    importance = max(importance, rows[key]["importance"])
+                rows[key] = {
+                    "user_id": user_id,
+                    "memory": sentence,
+                    "memory_key": key,
+                    "importance": importance,
+                    "created_at": now,
+                    "updated_at": now
+                }
+        if not rows:
+            return {"results": []}
+
+        try:
+            with self.engine.begin() as conn:
+                events = self._upsert(conn, user_id, rows)
+        except IntegrityError:
+            # Another writer stored one of these memories first; it is an update now
+            with self.engine.begin() as conn:
+                events = self._upsert(conn, user_id, rows)
+        return {"results": events}
+
+    @staticmethod
+    def _upsert(conn: Connection, user_id: str, rows: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert new memories and refresh existing ones; returns the Mem0-style events."""
+        existing = conn.execute(
+            select(Memory.id, Memory.memory_key, Memory.memory, Memory.importance)
+            .where(Memory.user_id == user_id, Memory.memory_key.in_(list(rows)))
+        ).all()
+
+        events = []
+        for current in existing:
+            row = rows[current.memory_key]
+            values = {"importance": max(current.importance, row["importance"]), "updated_at": row["updated_at"]}
+            if current.memory != row["memory"]:
+                values["memory"] = row["memory"]
+                events.append({"id": str(current.id), "memory": row["memory"], "event": "UPDATE"})
+            conn.execute(update(Memory).where(Memory.id == current.id).values(**values))
+
+        stored = {current.memory_key for current in existing}
+        new_rows = [row for key, row in rows.items() if key not in stored]
+        if new_rows:
+            result = conn.execute(insert(Memory).returning(Memory.id, sort_by_parameter_order=True), new_rows)
+            events.extend(
+                {"id": str(row.id), "memory": new_row["memory"], "event": "ADD"}
+                for row, new_row in zip(result, new_rows)
+            )
+        return events
+
+    def get_all(self, user_id: str, limit: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """Return a user's memories, newest first."""
+        statement = (
+            select(Memory.__table__)
+            .where(Memory.user_id == user_id)
+            .order_by(Memory.updated_at.desc(), Memory.id.desc())
+        )
+        if limit:
+            statement = statement.limit(limit)
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement).all()
+        return {"results": [_row_to_memory(row) for row in rows]}
+
+    def search(self, query: str, user_id: str, limit: int = 10, **kwargs) -> Dict[str, Any]:
+        """Full-text search over a user's memories, best matches first."""
+        if self.use_fts:
+            fts_query = build_fts_query(query)
+            if not fts_query:
+                return {"results": []}
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    _FTS_SEARCH, {"query": fts_query, "user_id": user_id, "limit": limit}
+                ).all()
+            results = []
+            for row in rows:
+                memory = _row_to_memory(row)
+                memory["score"] = -row.rank  # bm25 ranks lower-is-better
+                results.append(memory)
+            return {"results": results}
+
+        words = _WORD_PATTERN.findall(query)
+        if not words:
+            return {"results": []}
+        statement = (
+            select(Memory.__table__)
+            .where(Memory.user_id == user_id)
+            .where(or_(*[Memory.memory.ilike(f"%{word}%") for word in words]))
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement).all()
+        return {"results": [_row_to_memory(row) for row in rows]}
+
+    def delete_all(self, user_id: str) -> Dict[str, Any]:
+        """Remove every memory belonging to a user."""
+        with self.engine.begin() as conn:
+            conn.execute(Memory.__table__.delete().where(Memory.user_id == user_id))
+        return {"message": "Memories deleted successfully!"}
@@ -0,0 +1,300 @@
+"""
+Per-stage latency metrics for the chatbot pipeline.
+
+Each stage of a turn (location, memory fetch, prompt assembly, LLM call, tool
+calls, memory write) is timed into a histogram, overall and per user. Metrics
+are exposed as Prometheus text on a local HTTP endpoint and/or written
+periodically to a JSON file with p50/p95/p99 over recent samples, so a slow
+turn can be traced to the stage that caused it.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in seconds, from cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Users beyond this many are recorded under a shared label to bound cardinality
+OTHER_USERS = "_other"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts (for Prometheus) plus a window of recent samples (for percentiles)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.recent: "deque[float]" = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        samples = list(self.recent)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 99) * 1000, 1),
+            "max_ms": round(max(samples) * 1000, 1) if samples else 0.0
+        }
+
+
+class StageMetrics:
+    """Thread-safe registry of stage latency histograms, overall and per user."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 1024, max_users: int = 256):
+        """
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+            window: Recent samples kept per histogram for percentiles
+            max_users: Distinct users tracked before new ones share one label
+        """
+        self.buckets = tuple(buckets)
+        self.window = window
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._users: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._user_ids: set = set()
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def _histogram(self, table: dict, key) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram(self.buckets, self.window)
+        return histogram
+
+    def observe(self, stage: str, seconds: float, user_id: Optional[str] = None):
+        """Record one stage duration."""
+        with self._lock:
+            self._histogram(self._stages, stage).observe(seconds)
+            if user_id:
+                if user_id not in self._user_ids:
+                    if len(self._user_ids) >= self.max_users:
+                        user_id = OTHER_USERS
+                    else:
+                        self._user_ids.add(user_id)
+                self._histogram(self._users, (stage, user_id)).observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str, user_id: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block (it is recorded even if the block raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, user_id)
+
+    async def timed(self, stage: str, user_id: Optional[str], awaitable: Awaitable[T]) -> T:
+        """Await something and record how long it took; handy inside asyncio.gather."""
+        with self.time(stage, user_id):
+            return await awaitable
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        """Expose a value read at scrape time (e.g. a queue depth) as a Prometheus gauge."""
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+
+    def gauges(self) -> Dict[str, float]:
+        """Current value of every registered gauge."""
+        with self._lock:
+            gauges = list(self._gauges.items())
+        return {name: read() for name, (_, read) in gauges}
+
+    def summary(self, user_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Count, mean and p50/p95/p99 per stage, overall or for one user."""
+        with self._lock:
+            if user_id is None:
+                return {stage: h.summary() for stage, h in sorted(self._stages.items())}
+            return {
+                stage: h.summary()
+                for (stage, user), h in sorted(self._users.items())
+                if user == user_id
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything the file exporter writes: overall and per-user summaries."""
+        with self._lock:
+            users = sorted({user for _, user in self._users})
+        return {
+            "generated_at": time.time(),
+            "stages": self.summary(),
+            "gauges": self.gauges(),
+            "users": {user: self.summary(user) for user in users}
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for name, value in self.gauges().items():
+            lines.append(f"# HELP {name} {self._gauges[name][0]}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+        with self._lock:
+            self._render_family(
+                lines, "athena_stage_latency_seconds", "Latency of each chatbot pipeline stage",
+                [({"stage": stage}, h) for stage, h in sorted(self._stages.items())]
+            )
+            self._render_family(
+                lines, "athena_user_stage_latency_seconds", "Latency of each chatbot pipeline stage per user",
+                [({"stage": stage, "user": user}, h) for (stage, user), h in sorted(self._users.items())]
+            )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_family(lines: List[str], name: str, help_text: str, series):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in series:
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{label_text}}} {histogram.total:.6f}")
+            lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+
+    def reset(self):
+        """Drop all recorded samples."""
+        with self._lock:
+            self._stages.clear()
+            self._users.clear()
+            self._user_ids.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def start_http_exporter(registry: StageMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve ``/metrics`` in Prometheus text format from a background thread.
+
+    Args:
+        registry: Metrics to expose
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind; local only by default
+
+    Returns:
+        The running server (``server_address`` has the bound port)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="athena-metrics-http", daemon=True).start()
+    return server
+
+
+class FileExporter:
+    """Periodically writes the metrics snapshot (with percentiles) to a JSON file."""
+
+    def __init__(self, registry: StageMetrics, path: str, interval: float = 15.0):
+        """
+        Args:
+            registry: Metrics to export
+            path: JSON file to (atomically) rewrite
+            interval: Seconds between writes
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self):
+        """Write the current snapshot now."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> "FileExporter":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="athena-metrics-file", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread and write a final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"[WARNING] Failed to write metrics to {self.path}: {e}")
+
+
+# Process-wide registry shared by the agent, the CLI and the tools node
+metrics = StageMetrics()
+
+_exporters_lock = threading.Lock()
+_exporters_started = False
+
+
+def start_exporters(port: int = 0, path: str = "", interval: float = 15.0):
+    """
+    Start the configured exporters once per process.
+
+    Args:
+        port: Port for the Prometheus endpoint (0 disables it)
+        path: JSON file for the file exporter (empty disables it)
+        interval: Seconds between file writes
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if port:
+        try:
+            start_http_exporter(metrics, port)
+            print(f"[INFO] Metrics available at http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"[WARNING] Metrics endpoint not started on port {port}: {e}")
+    if path:
+        FileExporter(metrics, path, interval).start()
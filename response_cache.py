@@ -0,0 +1,142 @@
+"""
+Exact-match cache for answers to repeatable questions.
+
+Family devices ask the same things over and over ("what day is it", "dinner
+ideas", "weekend plans"). Answers are cached per user under the normalized
+question text, a digest of the conversation's last few messages and a coarse
+context bucket (hour, weekday, season), and are only served while the user's
+memory version is unchanged, so a new fact about the family always produces a
+fresh answer. The history digest keeps follow-ups ("what about tomorrow
+instead") from being answered with a reply meant for another conversation;
+opening questions of a thread share the empty history and are reused.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+CacheKey = Tuple[str, str, str, int, str, str]
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("What's up?" -> "whats up")."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _APOSTROPHES.sub("", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def history_digest(messages: Iterable[Any]) -> str:
+    """Short digest of the messages a question follows ("" for the start of a thread)."""
+    digest = hashlib.sha1()
+    empty = True
+    for message in messages:
+        content = getattr(message, "content", message)
+        digest.update(f"{getattr(message, 'type', '')}\x00{content}\x01".encode("utf-8", "replace"))
+        empty = False
+    return "" if empty else digest.hexdigest()[:16]
+
+
+def context_bucket(time_info: Dict[str, Any]) -> Tuple[int, str, str]:
+    """Coarse (hour, weekday, season) bucket from get_current_time_and_date()."""
+    return (
+        time_info.get("hour", -1),
+        time_info.get("day_of_week", ""),
+        time_info.get("season", "")
+    )
+
+
+class _CachedResponse:
+    __slots__ = ("content", "memory_version", "expires_at")
+
+    def __init__(self, content: str, memory_version: int, expires_at: float):
+        self.content = content
+        self.memory_version = memory_version
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Bounded LRU of assistant answers with a TTL and memory-version check."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 900.0, min_chars: int = 12, history_messages: int = 4):
+        """
+        Args:
+            max_entries: Answers kept before the least recently used is evicted
+            ttl: Seconds an answer may be served (0 disables the cache)
+            min_chars: Shorter normalized messages ("yes", "thanks") depend on
+                the conversation and are never cached
+            history_messages: Preceding messages that are part of the key
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_chars = min_chars
+        self.history_messages = history_messages
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, user_id: str, text: str, time_info: Dict[str, Any],
+                 history: Iterable[Any] = ()) -> Optional[CacheKey]:
+        """Cache key for a user message, or None if the message is not cacheable.
+
+        Args:
+            user_id: User the answer is for
+            text: The user's message
+            time_info: Output of get_current_time_and_date()
+            history: Messages before this one in the thread; only the last
+                ``history_messages`` are part of the key
+        """
+        if self.ttl <= 0 or not isinstance(text, str):
+            return None
+        normalized = normalize_question(text)
+        if len(normalized) < self.min_chars:
+            return None
+        return (user_id or "", normalized, history_digest(list(history)[-self.history_messages:])) + context_bucket(time_info)
+
+    def get(self, key: Optional[CacheKey], memory_version: int = 0) -> Optional[str]:
+        """Cached answer if it is fresh and was produced under the same memory version."""
+        if key is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now < entry.expires_at and entry.memory_version == memory_version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.content
+            self.misses += 1
+            return None
+
+    def put(self, key: Optional[CacheKey], content: str, memory_version: int = 0):
+        """Store an answer for later identical questions."""
+        if key is None or not content:
+            return
+        with self._lock:
+            self._entries[key] = _CachedResponse(content, memory_version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,278 @@
+"""
+Shared cache for web search tool calls.
+
+Several family members often ask about the same weather or local events
+within minutes of each other. Queries are normalized, results are cached with
+a TTL that depends on what kind of question it is (weather goes stale fast,
+recipes hardly at all), and identical searches that are already in flight are
+merged so only one request reaches the search API. Requests that do reach
+Tavily go over the shared keep-alive session from http_clients.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from langchain_tavily._utilities import TAVILY_API_URL, TavilySearchAPIWrapper
+from pydantic import PrivateAttr
+
+from http_clients import get_session
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+# Seconds a result is reused, per query class
+QUERY_CLASS_TTLS = {
+    "weather": 600,
+    "news": 900,
+    "events": 3600,
+    "general": 3600,
+    "recipes": 86400,
+}
+
+# Checked in order; the first match decides the class
+QUERY_CLASS_PATTERNS = [
+    ("weather", re.compile(r"\b(weather|forecast|temperature|rain|snow|storm|wind|humidity|sunny|uv index)\b")),
+    ("news", re.compile(r"\b(news|headlines?|breaking|latest)\b")),
+    ("recipes", re.compile(r"\b(recipes?|ingredients|bake|baking|cook|cooking|meal|dinner ideas|lunch ideas)\b")),
+    ("events", re.compile(r"\b(events?|concerts?|festivals?|things to do|tickets|opening hours|open today|schedule)\b")),
+]
+
+SearchKey = Tuple[str, str]
+
+# Seconds allowed to connect to Tavily and to wait for its reply
+TAVILY_CONNECT_TIMEOUT = float(os.getenv("TAVILY_CONNECT_TIMEOUT", "3.05"))
+TAVILY_READ_TIMEOUT = float(os.getenv("TAVILY_READ_TIMEOUT", "15"))
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _NON_WORD.sub(" ", query.lower()).strip()
+
+
+def classify_query(query: str, topic: Optional[str] = None) -> str:
+    """Query class used to pick a cache TTL."""
+    if topic == "news":
+        return "news"
+    normalized = normalize_query(query)
+    for query_class, pattern in QUERY_CLASS_PATTERNS:
+        if pattern.search(normalized):
+            return query_class
+    return "general"
+
+
+def _cacheable(result: Any) -> bool:
+    # The Tavily tool reports API failures as {"error": ...} instead of raising
+    return not (isinstance(result, dict) and "error" in result)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SearchCache:
+    """TTL + LRU result cache with single-flight deduplication of in-flight queries."""
+
+    def __init__(self, max_entries: int = 512, ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            max_entries: Results kept before the least recently used is evicted
+            ttls: Seconds a result is reused per query class (see QUERY_CLASS_TTLS)
+        """
+        self.max_entries = max_entries
+        self.ttls = {**QUERY_CLASS_TTLS, **(ttls or {})}
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[SearchKey, Tuple[Any, float]]" = OrderedDict()
+        self._flights: Dict[SearchKey, _Flight] = {}
+        self._tasks: Dict[SearchKey, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def make_key(self, query: str, options: Dict[str, Any]) -> SearchKey:
+        """Cache key for a query plus any non-default search options."""
+        options = {name: value for name, value in options.items() if value is not None}
+        return normalize_query(query), json.dumps(options, sort_keys=True, default=str)
+
+    def ttl_for(self, query: str, options: Dict[str, Any]) -> float:
+        return self.ttls[classify_query(query, options.get("topic"))]
+
+    def _lookup(self, key: SearchKey) -> Tuple[bool, Any]:
+        """Return (found, result). Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry and time.monotonic() < entry[1]:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+        return False, None
+
+    def _store(self, key: SearchKey, result: Any, ttl: float):
+        """Cache a successful result. Caller holds the lock."""
+        if ttl <= 0 or not _cacheable(result):
+            return
+        self._entries[key] = (result, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def run(self, key: SearchKey, ttl: float, search: Callable[[], Any]) -> Any:
+        """Return a cached result, join an identical search in flight, or run it."""
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = search()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, flight.result, ttl)
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+    async def arun(self, key: SearchKey, ttl: float, search: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of run(); concurrent callers await one shared task."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                return result
+            task = self._tasks.get(key)
+            if task is not None and task.get_loop() is loop and not task.done():
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                task = self._tasks[key] = loop.create_task(self._search_and_store(key, ttl, search))
+        # Shield so one caller being cancelled does not cancel the search for the others
+        return await asyncio.shield(task)
+
+    async def _search_and_store(self, key: SearchKey, ttl: float, search: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await search()
+            with self._lock:
+                self._store(key, result, ttl)
+            return result
+        finally:
+            with self._lock:
+                if self._tasks.get(key) is asyncio.current_task():
+                    del self._tasks[key]
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring; upstream_calls is what reached the search API."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "upstream_calls": self.misses,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Drop-in wrapper for a search tool such as ``TavilySearch``.
+
+    Keeps the wrapped tool's name, description and argument schema, so the
+    model sees exactly the same tool.
+    """
+
+    _tool: BaseTool = PrivateAttr()
+    _cache: SearchCache = PrivateAttr()
+
+    def __init__(self, tool: BaseTool, cache: Optional[SearchCache] = None, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            handle_tool_error=tool.handle_tool_error,
+            **kwargs
+        )
+        self._tool = tool
+        self._cache = cache or SearchCache()
+
+    @property
+    def cache(self) -> SearchCache:
+        return self._cache
+
+    def _run(self, query: str, run_manager=None, **options) -> Any:
+        key = self._cache.make_key(query, options)
+        return self._cache.run(
+            key, self._cache.ttl_for(query, options),
+            lambda: self._tool._run(query=query, **options)
+        )
+
+    async def _arun(self, query: str, run_manager=None, **options) -> Any:
+        key = self._cache.make_key(query, options)
+        return await self._cache.arun(
+            key, self._cache.ttl_for(query, options),
+            lambda: self._tool._arun(query=query, **options)
+        )
+
+
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """
+    Tavily API wrapper that sends requests over the shared session.
+
+    The stock wrapper uses a bare ``requests.post`` and opens a new aiohttp
+    session for every async search, so each search pays a new TLS handshake.
+    """
+
+    def raw_results(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        params = {"query": query, **{name: value for name, value in kwargs.items() if value is not None}}
+        headers = {
+            "Authorization": f"Bearer {self.tavily_api_key.get_secret_value()}",
+            "Content-Type": "application/json",
+            "X-Client-Source": "langchain-tavily",
+        }
+        base_url = self.api_base_url or TAVILY_API_URL
+        response = get_session().post(
+            f"{base_url}/search", json=params, headers=headers,
+            timeout=(TAVILY_CONNECT_TIMEOUT, TAVILY_READ_TIMEOUT)
+        )
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", {})
+            except ValueError:
+                detail = {}  # Proxies and gateways reply with HTML or nothing at all
+            error_message = detail.get("error") if isinstance(detail, dict) else None
+            raise ValueError(f"Error {response.status_code}: {error_message or response.reason or 'Unknown error'}")
+        return response.json()
+
+    async def raw_results_async(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.raw_results, query, **kwargs)
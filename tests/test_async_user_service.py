@@ -0,0 +1,144 @@
+"""
+Tests for the AsyncSession path and the async UserService methods.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from auth.auth_utils import create_access_token
+from auth.token_cache import token_cache
+from auth.user_service import UserService
+from database import connection
+from database.connection import Base, async_url_for, build_async_engine
+from database.models import User
+from database.user_writes import get_user_writer
+
+
+class TestAsyncUserService(unittest.TestCase):
+    """Test suite for async user operations on aiosqlite."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.url = async_url_for(f"sqlite:///{os.path.join(self.tmpdir.name, 'users.db')}")
+        token_cache.clear()
+
+    def tearDown(self):
+        token_cache.clear()
+        self.tmpdir.cleanup()
+
+    def run_with_engine(self, scenario):
+        async def wrapper():
+            engine = build_async_engine(self.url, slow_query_ms=0)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                return await scenario(engine, async_sessionmaker(engine, expire_on_commit=False))
+            finally:
+                get_user_writer(engine.sync_engine).flush()
+                get_user_writer(engine.sync_engine).engine.dispose()
+                await engine.dispose()
+        return asyncio.run(wrapper())
+
+    def test_async_user_lifecycle(self):
+        """Create, log in, resolve a token, update and deactivate through AsyncSession."""
+        async def scenario(engine, Session):
+            async with Session() as db:
+                user = await UserService.acreate_user(db, "mom@example.com", "mom", "Morning123", first_name="Ana")
+                self.assertEqual(user.mem0_user_id, f"user_{user.id}")
+                self.assertIsNone(await UserService.acreate_user(db, "mom@example.com", "mom2", "Morning123"))
+
+            async with Session() as db:
+                self.assertIsNone(await UserService.aauthenticate_user(db, "mom", "wrong"))
+                logged_in = await UserService.aauthenticate_user(db, "mom@example.com", "Morning123")
+                self.assertIsNotNone(logged_in.last_login)
+                token = create_access_token({"user_id": logged_in.id})
+
+            queries = []
+            event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(1))
+            async with Session() as db:
+                self.assertEqual((await UserService.aget_user_from_token(db, token)).first_name, "Ana")
+            async with Session() as db:
+                resolved = await UserService.aget_user_from_token(db, token)
+                self.assertEqual(len(queries), 1)  # second lookup came from the token cache
+
+                await UserService.aupdate_user(db, resolved, first_name="Anna")
+                self.assertEqual((await UserService.aget_user_by_username(db, "mom")).first_name, "Anna")
+                self.assertTrue(await UserService.adelete_user(db, resolved))
+            async with Session() as db:
+                self.assertIsNone(await UserService.aget_user_from_token(db, token))
+
+            # last_login batches are flushed through a synchronous twin engine
+            self.assertEqual(get_user_writer(engine.sync_engine).engine.url.drivername, "sqlite")
+
+        self.run_with_engine(scenario)
+        print("[PASS] Async user lifecycle on aiosqlite")
+
+    def test_lookups_do_not_stall_the_loop(self):
+        """Many concurrent async lookups leave a streaming coroutine ticking."""
+        async def scenario(engine, Session):
+            async with Session() as db:
+                db.add_all([
+                    User(id=f"u{i}", email=f"m{i}@example.com", username=f"m{i}", password_hash="x")
+                    for i in range(20)
+                ])
+                await db.commit()
+
+            gaps = []
+            stop = asyncio.Event()
+
+            async def stream_ticks():
+                last = time.perf_counter()
+                while not stop.is_set():
+                    await asyncio.sleep(0.005)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            async def lookup(i):
+                async with Session() as db:
+                    return await UserService.aget_user_by_id(db, f"u{i % 20}")
+
+            ticker = asyncio.create_task(stream_ticks())
+            users = await asyncio.gather(*[lookup(i) for i in range(200)])
+            stop.set()
+            await ticker
+            self.assertTrue(all(users))
+            return max(gaps)
+
+        worst_gap = self.run_with_engine(scenario)
+        self.assertLess(worst_gap, 0.25)
+        print(f"[PASS] 200 async lookups kept the loop responsive (worst tick gap {worst_gap * 1000:.0f}ms)")
+
+    def test_async_session_dependency(self):
+        """get_async_db yields sessions from the process-wide async engine."""
+        engine = build_async_engine(self.url, slow_query_ms=0)
+        connection.get_async_engine.override(engine)
+        connection.get_async_sessionmaker.reset()
+        try:
+            async def scenario():
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                async for db in connection.get_async_db():
+                    self.assertIs(db.bind, engine)
+                    self.assertIsNone(await UserService.aget_user_by_email(db, "nobody@example.com"))
+                await engine.dispose()
+
+            asyncio.run(scenario())
+        finally:
+            connection.get_async_engine.reset()
+            connection.get_async_sessionmaker.reset()
+        print("[PASS] get_async_db yields AsyncSessions")
+
+
+if __name__ == '__main__':
+    unittest.main()
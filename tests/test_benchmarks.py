@@ -0,0 +1,53 @@
+"""
+Tests for the offline agent latency benchmark.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.agent_latency import find_regressions
+
+
+class TestAgentLatencyBenchmark(unittest.TestCase):
+    """Test suite for the benchmark runner."""
+
+    def test_runs_offline_and_compares_to_baseline(self):
+        """The real graph runs on fakes without keys and can be checked against a baseline."""
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "TAVILY_API_KEY", "MEM0_API_KEY")}
+            env.update({"PYTHONPATH": str(ROOT), "HTTP_WARMUP": "0"})
+            out = os.path.join(workdir, "result.json")
+            command = [sys.executable, "-m", "benchmarks.agent_latency", "--turns", "1", "4", "--no-latency", "--json", out]
+
+            first = subprocess.run(command, env=env, cwd=workdir, capture_output=True, text=True, timeout=300)
+            self.assertEqual(first.returncode, 0, first.stderr)
+            with open(out) as f:
+                result = json.load(f)
+
+            second = subprocess.run(command + ["--baseline", out, "--tolerance", "10"],
+                                    env=env, cwd=workdir, capture_output=True, text=True, timeout=300)
+            self.assertEqual(second.returncode, 0, second.stderr)
+            self.assertIn("No regressions", second.stdout)
+
+        self.assertEqual([row["turns"] for row in result["rows"]], [1, 4])
+        self.assertGreater(result["rows"][1]["prompt_tokens"], result["rows"][0]["prompt_tokens"])
+        self.assertIn("alloc_peak_kib", result["rows"][0])
+        self.assertIn("llm", result["stages"])
+        self.assertIn("tools", result["stages"])
+        self.assertGreater(result["backend_calls"]["tavily_requests"], 0)
+
+        slower = {"rows": [dict(row, latency_p95_ms=row["latency_p95_ms"] * 3 + 1) for row in result["rows"]]}
+        self.assertEqual(len(find_regressions(slower, result, 0.2)), 2)
+        print("[PASS] Benchmark runs offline and compares to a baseline")
+
+
+if __name__ == '__main__':
+    unittest.main()
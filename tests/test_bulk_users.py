@@ -0,0 +1,109 @@
+"""
+Tests for bulk user provisioning.
+"""
+
+import types
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.auth_utils import hash_password
+from auth.user_service import UserService
+from database.connection import Base
+from database.models import User
+from database.user_writes import get_user_writer
+
+
+class TestBulkUsers(unittest.TestCase):
+    """Test suite for UserService.bulk_create_users."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.inserts = []
+        event.listen(self.engine, "before_cursor_execute", self._count_insert)
+
+    def tearDown(self):
+        get_user_writer(self.engine).flush()
+        self.db.close()
+        self.engine.dispose()
+
+    def _count_insert(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO users"):
+            self.inserts.append(len(parameters) if executemany else 1)
+
+    def test_bulk_create_reports_each_record(self):
+        """Batches are hashed in worker processes and inserted at once; bad rows are reported."""
+        UserService.create_user(self.db, "grandpa@example.com", "grandpa", "Password123")
+        self.inserts.clear()
+
+        records = [
+            {"email": "mom@example.com", "username": "mom", "password": "Morning123", "first_name": "Ana"},
+            {"email": "dad@example.com", "username": "dad", "password": "Evening123"},
+            {"email": "grandpa@example.com", "username": "gramps", "password": "Password123"},
+            {"email": "kid@example.com", "username": "kid", "password": "Lego1234"},
+            {"email": "kid2@example.com", "username": "kid", "password": "Lego1234"},
+            {"email": "aunt@example.com", "username": "aunt", "password_hash": hash_password("Imported1")},
+            {"email": "uncle@example.com", "username": "uncle"},
+        ]
+        consumed = []
+
+        def source():
+            for record in records:
+                consumed.append(record["username"])
+                yield record
+
+        results = UserService.bulk_create_users(self.db, source(), batch_size=3, processes=2)
+        self.assertIsInstance(results, types.GeneratorType)
+        first = next(results)
+        self.assertEqual(len(consumed), 3)  # only the first batch has been read
+        results = [first] + list(results)
+
+        self.assertEqual([r.index for r in results], list(range(7)))
+        self.assertEqual(
+            [r.error for r in results],
+            [None, None, "duplicate email", None, "duplicate username", None, "missing password"]
+        )
+        self.assertEqual(self.inserts, [2, 2])  # one multi-row INSERT per batch with new users
+        self.assertEqual(results[0].mem0_user_id, f"user_{results[0].user_id}")
+
+        for username, password in (("mom", "Morning123"), ("aunt", "Imported1")):
+            self.assertIsNotNone(UserService.authenticate_user(self.db, username, password))
+        self.assertEqual(self.db.query(User).count(), 5)
+        print("[PASS] Bulk create streams per-record results with batched inserts")
+
+    def test_database_error_fails_the_batch(self):
+        """A non-integrity database error rolls back and reports the batch's rows as failed."""
+        records = [
+            {"email": f"kid{i}@example.com", "username": f"kid{i}", "password_hash": "$2b$12$imported"}
+            for i in range(4)
+        ]
+        commit = self.db.commit
+        calls = []
+
+        def locked_once():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError("INSERT INTO users", {}, Exception("database is locked"))
+            commit()
+
+        with mock.patch.object(self.db, "commit", side_effect=locked_once):
+            results = list(UserService.bulk_create_users(self.db, records, batch_size=2, processes=0))
+
+        self.assertEqual([r.error for r in results], ["database error: OperationalError"] * 2 + [None, None])
+        self.assertEqual([r.user_id for r in results[:2]], [None, None])
+        self.assertEqual([user.username for user in self.db.query(User).order_by(User.username)], ["kid2", "kid3"])
+        print("[PASS] Database errors fail the batch's rows")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the persistent SQLite checkpointer used by the CLI assistant.
+"""
+
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from typing import Annotated
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from database.checkpointer import SQLiteCheckpointSaver, sqlite_path_from_url
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(checkpointer):
+    def reply(state: State):
+        return {"messages": [AIMessage(content=f"echo {len(state['messages'])}")]}
+
+    builder = StateGraph(State)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+class TestSQLiteCheckpointSaver(unittest.TestCase):
+    """Test suite for SQLiteCheckpointSaver."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "checkpoints.db")
+        self.config = {"configurable": {"thread_id": "family-1"}}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_thread_survives_restart(self):
+        """A conversation can be resumed from a new saver on the same file."""
+        saver = SQLiteCheckpointSaver(self.path)
+        graph = build_graph(saver)
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, self.config)
+        graph.invoke({"messages": [HumanMessage(content="again")]}, self.config)
+        saver.close()
+
+        reopened = SQLiteCheckpointSaver(self.path)
+        graph = build_graph(reopened)
+        messages = graph.get_state(self.config).values["messages"]
+        self.assertEqual([m.content for m in messages], ["hi", "echo 1", "again", "echo 3"])
+
+        graph.invoke({"messages": [HumanMessage(content="third")]}, self.config)
+        self.assertEqual(len(graph.get_state(self.config).values["messages"]), 6)
+        reopened.close()
+        print("[PASS] Thread survives restart")
+
+    def test_compaction_keeps_latest_checkpoints(self):
+        """Only the newest keep_last checkpoints per thread are retained."""
+        saver = SQLiteCheckpointSaver(self.path, keep_last=3)
+        graph = build_graph(saver)
+        for i in range(10):
+            graph.invoke({"messages": [HumanMessage(content=f"turn {i}")]}, self.config)
+        saver.flush()
+
+        checkpoints = list(saver.list(self.config))
+        self.assertEqual(len(checkpoints), 3)
+        self.assertEqual(len(graph.get_state(self.config).values["messages"]), 20)
+
+        blob_count = saver.conn.execute("SELECT COUNT(*) FROM checkpoint_blobs").fetchone()[0]
+        self.assertLessEqual(blob_count, 3 * 3)
+        saver.close()
+        print("[PASS] Compaction keeps latest checkpoints")
+
+    def test_writes_are_batched_until_flush(self):
+        """Buffered checkpoints reach disk in one flush."""
+        saver = SQLiteCheckpointSaver(self.path, batch_size=1000)
+        graph = build_graph(saver)
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, self.config)
+
+        other = SQLiteCheckpointSaver(self.path)
+        self.assertIsNone(other.get_tuple(self.config))
+        saver.flush()
+        self.assertIsNotNone(other.get_tuple(self.config))
+        other.close()
+        saver.close()
+        print("[PASS] Writes batched until flush")
+
+    def test_sqlite_path_from_url(self):
+        """Only file-backed SQLite URLs yield a checkpoint path."""
+        self.assertEqual(sqlite_path_from_url("sqlite:///./athena_users.db"), "./athena_users.db")
+        self.assertIsNone(sqlite_path_from_url("sqlite://"))
+        self.assertIsNone(sqlite_path_from_url("postgresql://user:pw@localhost/athena"))
+        print("[PASS] SQLite path from URL")
+
+
+if __name__ == '__main__':
+    unittest.main()
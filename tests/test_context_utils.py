@@ -0,0 +1,108 @@
+"""
+Tests for context_utils: the cached, non-blocking location provider.
+"""
+
+import threading
+import unittest
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import context_utils
+from context_utils import LocationProvider, static_location_source
+
+
+class TestLocationProvider(unittest.TestCase):
+    """Test suite for LocationProvider."""
+    
+    def _wait_for_refresh(self, provider):
+        thread = provider._refresh_thread
+        if thread:
+            thread.join(timeout=2)
+    
+    def test_first_call_returns_fallback_without_blocking(self):
+        """First lookup returns immediately and refreshes in the background."""
+        def slow_source():
+            time.sleep(0.3)
+            return {"city": "Portland", "region": "Oregon", "country": "United States"}
+        
+        provider = LocationProvider(source=slow_source)
+        start = time.monotonic()
+        location = provider.get()
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertFalse(location["detected"])
+        
+        self._wait_for_refresh(provider)
+        self.assertEqual(provider.get()["city"], "Portland")
+        print("[PASS] Location lookups never block the caller")
+    
+    def test_last_good_value_served_after_failure(self):
+        """A failed refresh keeps serving the last good location and backs off."""
+        calls = []
+        
+        def flaky_source():
+            calls.append(1)
+            if len(calls) > 1:
+                raise ConnectionError("network down")
+            return {"city": "Denver", "region": "Colorado", "country": "United States"}
+        
+        provider = LocationProvider(source=flaky_source, ttl=0, failure_backoff=60)
+        self.assertTrue(provider.refresh())
+        self.assertFalse(provider.refresh())
+        
+        self.assertEqual(provider.get()["city"], "Denver")
+        self._wait_for_refresh(provider)
+        self.assertEqual(len(calls), 2)  # Backing off, so no new lookup
+        print("[PASS] Last good location served while the network is down")
+    
+    def test_static_source_stand_in(self):
+        """A static source can stand in for IP geolocation."""
+        provider = LocationProvider(source=lambda: None)
+        provider.set_source(static_location_source("Austin", "Texas", "United States"))
+        provider.refresh()
+        location = provider.get()
+        self.assertEqual(location["city"], "Austin")
+        self.assertTrue(location["detected"])
+        print("[PASS] Static location stand-in working")
+    
+    def test_configured_location_served_from_first_call(self):
+        """With ATHENA_LOCATION set, the very first lookup already returns it."""
+        with mock.patch.object(context_utils, "LOCATION_OVERRIDE", "Lisbon, Lisboa, Portugal"):
+            provider = context_utils._default_location_provider()
+        location = provider.get()
+        self.assertEqual((location["city"], location["country"]), ("Lisbon", "Portugal"))
+        self.assertIsNone(provider._refresh_thread)
+        print("[PASS] Configured location served from the first call")
+    
+    def test_refresh_from_old_source_is_discarded(self):
+        """A lookup still running when the source is swapped cannot overwrite the new value."""
+        release = threading.Event()
+        
+        def slow_ip_lookup():
+            release.wait(2)
+            return {"city": "Somewhere Else", "region": "Unknown", "country": "Unknown"}
+        
+        provider = LocationProvider(source=slow_ip_lookup)
+        provider.get()
+        stale = provider._refresh_thread
+        provider.set_source(static_location_source("Austin", "Texas", "United States"), resolve_now=True)
+        release.set()
+        stale.join(timeout=2)
+        self.assertEqual(provider.get()["city"], "Austin")
+        print("[PASS] Refresh from a replaced source is discarded")
+    
+    def test_offline_provider_never_looks_up(self):
+        """Offline mode skips lookups entirely."""
+        calls = []
+        provider = LocationProvider(source=lambda: calls.append(1), offline=True)
+        provider.get()
+        self.assertIsNone(provider._refresh_thread)
+        self.assertEqual(calls, [])
+        print("[PASS] Offline mode skips location lookups")
+
+
+if __name__ == "__main__":
+    unittest.main()
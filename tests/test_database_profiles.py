@@ -0,0 +1,95 @@
+"""
+Tests for the SQLite/Postgres engine profiles and pool instrumentation.
+"""
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from auth.user_service import UserService
+from database.connection import Base, build_engine, pool_stats, register_pool_gauges
+from database.user_writes import get_user_writer
+from metrics import StageMetrics
+
+
+class TestDatabaseProfiles(unittest.TestCase):
+    """Test suite for engine profiles on a file-backed SQLite database."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.tmpdir.name, 'users.db')}"
+        self.registry = StageMetrics()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sqlite_profile_pragmas_and_slow_queries(self):
+        """Connections run in WAL mode with a busy timeout; slow queries are logged."""
+        engine = build_engine(self.url, slow_query_ms=0.0001, metrics=self.registry)
+        output = io.StringIO()
+        with redirect_stdout(output), engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 5000)
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+            # A failing statement does not leave its start time behind
+            with self.assertRaises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            self.assertEqual(conn.info["query_started"], [])
+        engine.dispose()
+
+        self.assertIn("[WARNING] Slow query", output.getvalue())
+        self.assertIn("PRAGMA journal_mode", output.getvalue())
+        self.assertEqual(self.registry.summary()["db_query"]["count"], 3)
+
+        with self.assertRaises(ValueError):
+            build_engine(self.url, profile="oracle")
+        print("[PASS] SQLite profile applies pragmas and logs slow queries")
+
+    def test_pool_metrics_under_concurrent_users(self):
+        """Concurrent signups and logins succeed; checkout waits and pool counters are exposed."""
+        engine = build_engine(self.url, slow_query_ms=0, metrics=self.registry, pool_size=2, max_overflow=1)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        register_pool_gauges(engine, self.registry)
+        errors = []
+
+        def device(index):
+            db = SessionLocal()
+            try:
+                UserService.create_user(db, f"member{index}@example.com", f"member{index}", "Password123")
+                self.assertIsNotNone(UserService.authenticate_user(db, f"member{index}", "Password123"))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=device, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        get_user_writer(engine).flush()
+
+        self.assertEqual(errors, [])
+        stats = pool_stats(engine)
+        self.assertEqual((stats["size"], stats["checked_out"]), (2, 0))
+        self.assertLessEqual(stats["checked_in"], 3)
+        self.assertGreaterEqual(self.registry.summary()["db_checkout_wait"]["count"], 6)
+        self.assertIn("athena_db_pool_size 2", self.registry.render_prometheus())
+        engine.dispose()
+        print("[PASS] Pool checkout waits and counters exposed under concurrent users")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for history_utils: token-budgeted history with a rolling summary.
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from history_utils import HistoryManager, split_turns, token_budget_for_model
+
+
+def make_thread(turns, reply="ok"):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i}", id=f"h{i}"))
+        messages.append(AIMessage(content=reply, id=f"a{i}"))
+    return messages
+
+
+class TestHistoryManager(unittest.TestCase):
+    """Test suite for HistoryManager."""
+    
+    def setUp(self):
+        self.summarizer = GenericFakeChatModel(messages=iter([AIMessage(content="- Emma is 8")]))
+    
+    def test_split_turns_keeps_tool_results_together(self):
+        """Tool calls and results stay in the turn that requested them."""
+        messages = [
+            HumanMessage(content="weather?"),
+            AIMessage(content="", tool_calls=[{"name": "search", "args": {"q": "weather"}, "id": "c1"}]),
+            ToolMessage(content="sunny", tool_call_id="c1"),
+            AIMessage(content="It's sunny"),
+            HumanMessage(content="thanks"),
+        ]
+        turns = split_turns(messages)
+        self.assertEqual([len(turn) for turn in turns], [4, 1])
+        print("[PASS] Turns keep tool results together")
+    
+    def test_no_fold_within_window(self):
+        """Short threads are kept verbatim."""
+        manager = HistoryManager(self.summarizer, keep_turns=6, fold_turns=4)
+        folded, kept = manager.plan(make_thread(10))
+        self.assertEqual(folded, [])
+        self.assertEqual(len(kept), 20)
+        print("[PASS] Short history kept verbatim")
+    
+    def test_fold_beyond_window(self):
+        """Past keep + fold turns, the oldest turns are folded in one batch."""
+        manager = HistoryManager(self.summarizer, keep_turns=6, fold_turns=4)
+        folded, kept = manager.plan(make_thread(11))
+        self.assertEqual(len(folded), 10)
+        self.assertEqual(kept[0].id, "h5")
+        
+        summary = asyncio.run(manager.asummarize("", folded))
+        self.assertEqual(summary, "- Emma is 8")
+        print("[PASS] Old turns folded into the summary")
+    
+    def test_token_budget_enforced(self):
+        """Long turns are folded to fit the budget, but the current turn stays."""
+        manager = HistoryManager(None, keep_turns=6, token_budget=100)
+        folded, kept = manager.plan(make_thread(4, reply="x" * 300))
+        self.assertEqual(len(kept), 2)
+        self.assertEqual(kept[0].id, "h3")
+        self.assertEqual(manager.prompt_history(folded, kept), kept)
+        print("[PASS] History token budget enforced")
+    
+    def test_budget_per_model(self):
+        """Budgets are looked up by model name, with an override."""
+        self.assertEqual(token_budget_for_model("google_genai:gemini-2.5-flash"), 24000)
+        self.assertEqual(token_budget_for_model("unknown-model"), 8000)
+        self.assertEqual(token_budget_for_model("google_genai:gemini-2.5-flash", 500), 500)
+        print("[PASS] Per-model history budgets working")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the shared outbound HTTP layer.
+"""
+
+import json
+import threading
+import unittest
+from unittest.mock import patch
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from http_clients import get_session, warm_up
+from search_cache import TAVILY_CONNECT_TIMEOUT, TAVILY_READ_TIMEOUT, PooledTavilySearchAPIWrapper
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    connections = set()
+
+    def _reply(self, body: bytes, status: int = 200, content_type: str = "application/json"):
+        StubHandler.connections.add(self.client_address)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        StubHandler.requests_seen.append(("HEAD", self.path, None))
+        self._reply(b"")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubHandler.requests_seen.append(("POST", self.path, body))
+        if body["query"] == "gateway down":
+            self._reply(b"<html>Bad Gateway</html>", status=502, content_type="text/html")
+            return
+        self._reply(json.dumps({"query": body["query"], "results": []}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClients(unittest.TestCase):
+    """Test suite for pooled sessions and warm-up."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.requests_seen = []
+        StubHandler.connections = set()
+
+    def test_warm_up_and_searches_share_one_connection(self):
+        """Warm-up opens the connection that later searches reuse."""
+        self.assertIs(get_session(), get_session())
+        warm_up([f"{self.base_url}/search"], background=False)
+
+        wrapper = PooledTavilySearchAPIWrapper(tavily_api_key="tvly-test", api_base_url=self.base_url)
+        for _ in range(3):
+            result = wrapper.raw_results(query="weather portland", max_results=3, topic=None)
+            self.assertEqual(result["query"], "weather portland")
+
+        methods = [method for method, _, _ in StubHandler.requests_seen]
+        self.assertEqual(methods, ["HEAD", "POST", "POST", "POST"])
+        self.assertEqual(StubHandler.requests_seen[1][2], {"query": "weather portland", "max_results": 3})
+        self.assertEqual(len(StubHandler.connections), 1)
+        print("[PASS] Warm-up and searches share one connection")
+
+    def test_search_error_without_json_body(self):
+        """A non-JSON error reply raises the wrapper's ValueError, with a timeout on the request."""
+        wrapper = PooledTavilySearchAPIWrapper(tavily_api_key="tvly-test", api_base_url=self.base_url)
+        with patch.object(get_session(), "post", wraps=get_session().post) as post:
+            with self.assertRaisesRegex(ValueError, "Error 502: Bad Gateway"):
+                wrapper.raw_results(query="gateway down")
+        self.assertEqual(post.call_args.kwargs["timeout"], (TAVILY_CONNECT_TIMEOUT, TAVILY_READ_TIMEOUT))
+        print("[PASS] Search errors without a JSON body raise ValueError")
+
+
+if __name__ == '__main__':
+    unittest.main()
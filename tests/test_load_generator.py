@@ -0,0 +1,56 @@
+"""
+Tests for the multi-household load generator and the stub LangGraph API.
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.langgraph_stub import StubSettings, start_stub_server
+from benchmarks.load_generator import generate_load
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Test suite for concurrent streaming runs against the stub server."""
+
+    def test_concurrent_runs_report_percentiles(self):
+        """Every device streams its runs; queueing behind the stub's capacity shows in TTFE."""
+        server = start_stub_server(StubSettings(first_event_delay=0.1, event_interval=0.0, events=5, capacity=2))
+        try:
+            report = asyncio.run(generate_load(server.url, households=2, devices=2, runs=2, think_time=0))
+        finally:
+            server.stop()
+
+        overall = report["overall"]
+        self.assertEqual(overall["runs"], 8)
+        self.assertEqual(overall["errors"], 0)
+        self.assertEqual(len(server.threads), 4)
+        self.assertEqual(set(report["households"]), {"household_000", "household_001"})
+        self.assertTrue(all(sample["events"] == 6 for sample in report["samples"]))
+        self.assertGreaterEqual(overall["ttfe_p50_ms"], 100)
+        # Four devices share two run slots, so the slowest wait for a slot first
+        self.assertGreaterEqual(overall["ttfe_max_ms"], 200)
+        self.assertGreaterEqual(overall["ttle_p50_ms"], overall["ttfe_p50_ms"])
+        print("[PASS] Concurrent runs report percentiles")
+
+    def test_errors_are_counted_by_kind(self):
+        """Injected HTTP and mid-stream failures count as errors, not latency samples."""
+        server = start_stub_server(StubSettings(first_event_delay=0.0, event_interval=0.0, events=4, error_rate=1.0, seed=3))
+        try:
+            report = asyncio.run(generate_load(server.url, households=1, devices=2, runs=3, think_time=0))
+        finally:
+            server.stop()
+
+        overall = report["overall"]
+        self.assertEqual(overall["error_rate"], 1.0)
+        self.assertEqual(sum(overall["errors_by_kind"].values()), 6)
+        self.assertTrue(set(overall["errors_by_kind"]) <= {"http_500", "stream_error"})
+        self.assertEqual(overall["ttfe_p95_ms"], 0.0)
+        print("[PASS] Errors are counted by kind")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,478 @@
+"""
+Tests for the memory package: retrieval and prompt formatting.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from memory.ranking import MemoryRanker, select_prompt_memories
+from memory.sqlite_backend import MEMORY_MAX_CHARS, SQLiteMemoryClient, build_fts_query, extract_memories
+from memory import CachedMemoryClient, MemoryOutbox, fetch_memories, afetch_memories, format_memory_context, extract_memory_list
+from metrics import StageMetrics
+
+
+class SlowMemoryClient:
+    """Mem0 stand-in where every call takes a fixed delay."""
+    
+    def __init__(self, delay=0.2, search_delay=None):
+        self.delay = delay
+        self.search_delay = delay if search_delay is None else search_delay
+    
+    def get_all(self, user_id, **kwargs):
+        time.sleep(self.delay)
+        return {"results": [{"memory": "Emma is 8 years old"}]}
+    
+    def search(self, query, user_id):
+        time.sleep(self.search_delay)
+        return [{"memory": "Jack is allergic to peanuts"}]
+
+
+class TestMemoryRetrieval(unittest.TestCase):
+    """Test suite for memory retrieval helpers."""
+    
+    def test_extract_memory_list_shapes(self):
+        """Mem0 dict and list responses are normalized."""
+        self.assertEqual(extract_memory_list({"results": [1]}), [1])
+        self.assertEqual(extract_memory_list({"memories": [2]}), [2])
+        self.assertEqual(extract_memory_list([3]), [3])
+        self.assertEqual(extract_memory_list(None), [])
+        print("[PASS] Memory response shapes normalized")
+    
+    def test_fetch_runs_concurrently(self):
+        """get_all and search overlap instead of running back to back."""
+        start = time.monotonic()
+        memories, relevant = fetch_memories(SlowMemoryClient(0.2), "user_1", "dinner?")
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(len(memories), 1)
+        self.assertEqual(len(relevant), 1)
+        print("[PASS] Memory fetches run concurrently")
+    
+    def test_async_fetch_timeout_isolated(self):
+        """A slow search times out without losing the stored memories."""
+        client = SlowMemoryClient(0.01, search_delay=0.5)
+        memories, relevant = asyncio.run(
+            afetch_memories(client, "user_1", "dinner?", timeout=0.1)
+        )
+        self.assertEqual(len(memories), 1)
+        self.assertEqual(relevant, [])
+        print("[PASS] Per-source memory timeout working")
+    
+    def test_sources_timed_separately(self):
+        """get_all and search are recorded as their own stages, even when search times out."""
+        registry = StageMetrics()
+        client = SlowMemoryClient(0.01, search_delay=0.2)
+        asyncio.run(afetch_memories(client, "user_1", "dinner?", timeout=0.1, metrics=registry))
+        time.sleep(0.2)  # the abandoned search still finishes in its thread
+        summary = registry.summary()
+        self.assertEqual(summary["memory_get_all"]["count"], 1)
+        self.assertEqual(summary["memory_search"]["count"], 1)
+        self.assertGreater(summary["memory_search"]["mean_ms"], summary["memory_get_all"]["mean_ms"])
+        self.assertIn("memory_search", registry.summary("user_1"))
+        print("[PASS] Memory sources timed separately")
+    
+    def test_format_memory_context(self):
+        """Stored and relevant memories are rendered into the prompt."""
+        text = format_memory_context([{"memory": "Emma is 8"}], [{"text": "Likes pasta"}])
+        self.assertIn("STORED FAMILY INFORMATION", text)
+        self.assertIn("• Emma is 8", text)
+        self.assertIn("RELEVANT CONTEXT FOR THIS QUERY", text)
+        self.assertIn("• Likes pasta", text)
+        self.assertEqual(format_memory_context([], []), "")
+        print("[PASS] Memory context formatting working")
+
+
+class RecordingMemoryClient:
+    """Mem0 stand-in that records add calls and can simulate an outage."""
+    
+    def __init__(self):
+        self.calls = []
+        self.down = False
+    
+    def add(self, messages, user_id):
+        if self.down or any(message["content"] == "poison" for message in messages):
+            raise ConnectionError("mem0 unavailable")
+        self.calls.append((user_id, messages))
+        return {"results": []}
+
+
+class TestMemoryOutbox(unittest.TestCase):
+    """Test suite for the durable memory outbox."""
+    
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        os.remove(self.path)
+        self.client = RecordingMemoryClient()
+    
+    def tearDown(self):
+        for path in (self.path, f"{self.path}.tmp", f"{self.path}.dead"):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _turn(self, text):
+        return [{"role": "user", "content": text}, {"role": "assistant", "content": "ok"}]
+    
+    def test_turns_batched_per_user(self):
+        """Several turns for one user become a single add call."""
+        outbox = MemoryOutbox(self.client, self.path)
+        outbox.enqueue("user_1", self._turn("a"))
+        outbox.enqueue("user_1", self._turn("b"))
+        outbox.enqueue("user_2", self._turn("c"))
+        
+        self.assertTrue(outbox.flush())
+        self.assertEqual(len(self.client.calls), 2)
+        user_id, messages = self.client.calls[0]
+        self.assertEqual(user_id, "user_1")
+        self.assertEqual(len(messages), 4)
+        print("[PASS] Outbox batches turns per user")
+    
+    def test_outage_keeps_pending_writes(self):
+        """A failed delivery keeps the turn queued for retry."""
+        outbox = MemoryOutbox(self.client, self.path)
+        outbox.enqueue("user_1", self._turn("a"))
+        
+        self.client.down = True
+        self.assertFalse(outbox.flush())
+        self.assertEqual(outbox.pending_count(), 1)
+        
+        self.client.down = False
+        self.assertTrue(outbox.flush())
+        self.assertEqual(len(self.client.calls), 1)
+        print("[PASS] Outbox survives memory backend outage")
+    
+    def test_replay_after_restart(self):
+        """Undelivered turns are recovered from disk by a new process."""
+        outbox = MemoryOutbox(self.client, self.path)
+        outbox.enqueue("user_1", self._turn("delivered"))
+        outbox.flush()
+        outbox.enqueue("user_1", self._turn("lost in crash"))
+        
+        recovered = MemoryOutbox(self.client, self.path)
+        self.assertEqual(recovered.pending_count(), 1)
+        recovered.flush()
+        self.assertEqual(self.client.calls[-1][1][0]["content"], "lost in crash")
+        print("[PASS] Outbox replays undelivered turns after restart")
+    
+    def test_background_worker_delivers(self):
+        """The worker drains the outbox without an explicit flush."""
+        outbox = MemoryOutbox(self.client, self.path, flush_interval=0.01).start()
+        outbox.enqueue("user_1", self._turn("a"))
+        deadline = time.monotonic() + 2
+        while outbox.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        outbox.close()
+        self.assertEqual(len(self.client.calls), 1)
+        print("[PASS] Outbox worker delivers in the background")
+    
+    def test_failing_record_is_isolated_and_dead_lettered(self):
+        """A record that always fails neither blocks other users nor stays queued forever."""
+        outbox = MemoryOutbox(self.client, self.path, max_attempts=3)
+        outbox.enqueue("user_1", self._turn("poison"))
+        outbox.enqueue("user_1", self._turn("fine"))
+        outbox.enqueue("user_2", self._turn("other"))
+        
+        self.assertFalse(outbox.flush())
+        self.assertEqual([user_id for user_id, _ in self.client.calls], ["user_2"])
+        
+        # Once it has failed, the bad record is sent alone and the rest of the user's turns go through
+        outbox.flush()
+        self.assertEqual(self.client.calls[-1][1][0]["content"], "fine")
+        self.assertEqual(outbox.pending_count(), 1)
+        
+        # The attempt count survives a restart
+        recovered = MemoryOutbox(self.client, self.path, max_attempts=3)
+        self.assertTrue(recovered.flush())
+        with open(f"{self.path}.dead", encoding="utf-8") as dead_log:
+            dead = [json.loads(line) for line in dead_log]
+        self.assertEqual([record["messages"][0]["content"] for record in dead], ["poison"])
+        self.assertEqual(dead[0]["attempts"], 3)
+        print("[PASS] Outbox isolates and dead-letters a failing record")
+    
+    def test_enqueue_does_not_fsync(self):
+        """A chat turn only writes to the log; the fsync happens on the worker side."""
+        outbox = MemoryOutbox(self.client, self.path)
+        with patch("memory.outbox.os.fsync") as fsync:
+            outbox.enqueue("user_1", self._turn("a"))
+        fsync.assert_not_called()
+        
+        recovered = MemoryOutbox(self.client, self.path)
+        self.assertEqual(recovered.pending_count(), 1)
+        print("[PASS] Outbox enqueue leaves fsync to the worker")
+    
+    def test_failure_during_compaction_counted_once(self):
+        """A failure recorded while the log is being rewritten is not counted twice after a restart."""
+        outbox = MemoryOutbox(self.client, self.path, max_attempts=3)
+        record_id = outbox.enqueue("user_1", self._turn("a"))
+        record = outbox._pending[record_id]
+        write_snapshot = outbox._write_snapshot
+        
+        def snapshot_during_failure(*args):
+            # The worker records a failure while compaction writes its snapshot
+            failing = threading.Thread(
+                target=outbox._record_failure, args=("user_1", [record], ConnectionError("down"))
+            )
+            failing.start()
+            deadline = time.monotonic() + 2
+            while not outbox._attempts.get(record_id) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            write_snapshot(*args)
+            snapshot_during_failure.thread = failing
+        
+        with patch.object(outbox, "_write_snapshot", snapshot_during_failure), patch("builtins.print"):
+            outbox._compact()
+        snapshot_during_failure.thread.join()
+        
+        recovered = MemoryOutbox(self.client, self.path, max_attempts=3)
+        self.client.down = True
+        with patch("builtins.print"):
+            recovered.flush()
+        self.assertEqual(recovered.pending_count(), 1)  # two attempts so far, not three
+        print("[PASS] Outbox failure during compaction counted once")
+
+
+class CountingMemoryClient:
+    """Mem0 stand-in that counts get_all calls and returns scripted add events."""
+    
+    def __init__(self):
+        self.get_all_calls = 0
+        self.memories = [{"id": "m1", "memory": "Emma is 8 years old"}]
+        self.add_result = {"results": []}
+    
+    def get_all(self, user_id, limit=None):
+        self.get_all_calls += 1
+        return {"results": self.memories[:limit]}
+    
+    def add(self, messages, user_id):
+        return self.add_result
+
+
+class TestCachedMemoryClient(unittest.TestCase):
+    """Test suite for the per-user memory cache."""
+    
+    def test_repeat_reads_hit_cache(self):
+        """A steady conversation makes one get_all call."""
+        backend = CountingMemoryClient()
+        cache = CachedMemoryClient(backend)
+        for _ in range(5):
+            self.assertEqual(len(cache.get_all(user_id="user_1")["results"]), 1)
+        self.assertEqual(backend.get_all_calls, 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (4, 1))
+        print("[PASS] Memory cache serves repeat reads")
+    
+    def test_write_events_applied(self):
+        """ADD/UPDATE/DELETE events from a write update the cached list."""
+        backend = CountingMemoryClient()
+        cache = CachedMemoryClient(backend)
+        cache.get_all(user_id="user_1")
+        
+        backend.add_result = {"results": [
+            {"id": "m1", "memory": "Emma is 9 years old", "event": "UPDATE"},
+            {"id": "m2", "memory": "Jack likes soccer", "event": "ADD"}
+        ]}
+        cache.add([{"role": "user", "content": "Emma turned 9"}], user_id="user_1")
+        
+        texts = [m["memory"] for m in cache.get_all(user_id="user_1")["results"]]
+        self.assertEqual(texts, ["Emma is 9 years old", "Jack likes soccer"])
+        self.assertEqual(backend.get_all_calls, 1)
+        self.assertEqual(cache.version("user_1"), 1)
+        print("[PASS] Memory cache is write-through")
+    
+    def test_unknown_write_result_bounds_staleness(self):
+        """A queued write lets the entry live only for write_staleness."""
+        backend = CountingMemoryClient()
+        cache = CachedMemoryClient(backend, write_staleness=0)
+        cache.get_all(user_id="user_1")
+        backend.add_result = {"results": [{"status": "PENDING"}]}
+        cache.add([], user_id="user_1")
+        cache.get_all(user_id="user_1")
+        self.assertEqual(backend.get_all_calls, 2)
+        self.assertEqual(cache.version("user_1"), 0)  # nothing changed
+        
+        backend.memories.append({"id": "m2", "memory": "Jack likes soccer"})
+        cache.add([], user_id="user_1")
+        cache.get_all(user_id="user_1")
+        self.assertEqual(cache.version("user_1"), 1)  # the queued write landed
+        print("[PASS] Memory cache refetches after queued writes")
+    
+    def test_lru_eviction(self):
+        """Least recently used users are evicted past max_users."""
+        backend = CountingMemoryClient()
+        cache = CachedMemoryClient(backend, max_users=2)
+        for user_id in ("a", "b", "a", "c"):
+            cache.get_all(user_id=user_id)
+        self.assertEqual(cache.stats()["users"], 2)
+        cache.get_all(user_id="b")
+        self.assertEqual(backend.get_all_calls, 4)  # "b" was evicted
+        print("[PASS] Memory cache LRU eviction working")
+    
+    def test_bounded_reads_cached(self):
+        """Reads with a limit are cached and served by an entry fetched with a larger one."""
+        backend = CountingMemoryClient()
+        backend.memories = [{"id": f"m{i}", "memory": f"fact {i}"} for i in range(5)]
+        cache = CachedMemoryClient(backend)
+        self.assertEqual(len(cache.get_all(user_id="user_1", limit=3)["results"]), 3)
+        self.assertEqual(len(cache.get_all(user_id="user_1", limit=3)["results"]), 3)
+        self.assertEqual(len(cache.get_all(user_id="user_1", limit=2)["results"]), 2)
+        self.assertEqual(backend.get_all_calls, 1)
+        self.assertEqual(len(cache.get_all(user_id="user_1")["results"]), 5)
+        self.assertEqual(backend.get_all_calls, 2)
+        self.assertEqual(cache.version("user_1"), 0)
+        print("[PASS] Memory cache serves bounded reads")
+
+
+class TestSQLiteMemoryClient(unittest.TestCase):
+    """Test suite for the local SQLite memory backend."""
+    
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        self.client = SQLiteMemoryClient(self.engine)
+    
+    def tearDown(self):
+        self.engine.dispose()
+    
+    def test_add_and_get_all(self):
+        """User turns are stored and returned newest first, per user."""
+        result = self.client.add([
+            {"role": "user", "content": "Emma is vegetarian"},
+            {"role": "assistant", "content": "Noted!"}
+        ], user_id="user_1")
+        self.assertEqual([event["event"] for event in result["results"]], ["ADD"])
+        self.client.add([{"role": "user", "content": "Jack likes soccer"}], user_id="user_1")
+        self.client.add([{"role": "user", "content": "Other family"}], user_id="user_2")
+        
+        memories = self.client.get_all(user_id="user_1")["results"]
+        self.assertEqual([m["memory"] for m in memories], ["Jack likes soccer", "Emma is vegetarian"])
+        print("[PASS] Local memory add/get_all working")
+    
+    def test_only_memorable_sentences_stored(self):
+        """Small talk and questions are dropped; long messages keep their few best sentences, capped."""
+        result = self.client.add([{"role": "user", "content": "ok thanks!"}], user_id="user_1")
+        self.assertEqual(result["results"], [])
+        self.client.add([{"role": "user", "content": "What's the weather tomorrow?"}], user_id="user_1")
+        
+        chatty = "Hi! My daughter Emma turns 8 on May 3rd. Can you suggest a cake? Thanks so much."
+        self.client.add([{"role": "user", "content": chatty}], user_id="user_1")
+        self.client.add([{"role": "user", "content": "Jack loves " + "really " * 200 + "long walks"}], user_id="user_1")
+        
+        memories = self.client.get_all(user_id="user_1")["results"]
+        self.assertEqual(len(memories), 2)
+        self.assertEqual(memories[1]["memory"], "My daughter Emma turns 8 on May 3rd.")
+        self.assertLessEqual(len(memories[0]["memory"]), MEMORY_MAX_CHARS)
+        self.assertEqual(extract_memories("x " * 400), [])
+        print("[PASS] Local memory stores only memorable sentences")
+    
+    def test_repeated_memory_stored_once(self):
+        """Repeating a memory refreshes the stored row instead of adding a copy."""
+        self.client.add([{"role": "user", "content": "Emma is vegetarian."}], user_id="user_1")
+        self.client.add([{"role": "user", "content": "Jack likes soccer"}], user_id="user_1")
+        self.assertEqual(self.client.add([{"role": "user", "content": "Emma is vegetarian."}], user_id="user_1"),
+                         {"results": []})
+        result = self.client.add([{"role": "user", "content": "emma is Vegetarian!"}], user_id="user_1")
+        self.assertEqual([event["event"] for event in result["results"]], ["UPDATE"])
+        self.client.add([{"role": "user", "content": "Emma is vegetarian"}], user_id="user_2")
+        
+        memories = self.client.get_all(user_id="user_1")["results"]
+        self.assertEqual([m["memory"] for m in memories], ["emma is Vegetarian!", "Jack likes soccer"])
+        self.assertEqual(memories[0]["id"], result["results"][0]["id"])
+        self.assertEqual(len(self.client.search("vegetarian", user_id="user_1")["results"]), 1)
+        self.assertEqual(len(self.client.get_all(user_id="user_1", limit=1)["results"]), 1)
+        print("[PASS] Local memory stores each memory once")
+    
+    def test_fts_search(self):
+        """Search ranks matching memories and stays within the user."""
+        self.client.add([{"role": "user", "content": "Jack is allergic to peanuts"}], user_id="user_1")
+        self.client.add([{"role": "user", "content": "We love hiking on weekends"}], user_id="user_1")
+        self.client.add([{"role": "user", "content": "Peanuts are fine for us"}], user_id="user_2")
+        
+        results = self.client.search("Is Jack allergic to anything?", user_id="user_1")["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["memory"], "Jack is allergic to peanuts")
+        self.assertEqual(self.client.search("???", user_id="user_1")["results"], [])
+        print("[PASS] Local memory FTS5 search working")
+    
+    def test_fts_query_escaping(self):
+        """Free text becomes a safe OR query of quoted words."""
+        self.assertEqual(build_fts_query('what\'s "for" dinner AND'), '"what" OR "s" OR "for" OR "dinner" OR "and"')
+        self.assertIsNone(build_fts_query("?!"))
+        print("[PASS] FTS query escaping working")
+
+
+class TestMemoryRanker(unittest.TestCase):
+    """Test suite for memory re-ranking."""
+    
+    def setUp(self):
+        self.ranker = MemoryRanker()
+        self.memories = [
+            {"id": str(i), "memory": f"Family note number {i} about the garden"}
+            for i in range(200)
+        ]
+        self.memories.append({"id": "peanuts", "memory": "Jack is allergic to peanuts"})
+    
+    def test_relevant_memory_ranked_first(self):
+        """The memory matching the query wins regardless of backend order."""
+        ranked = self.ranker.rank("Can Jack eat peanut butter?", self.memories, top_k=3)
+        self.assertEqual(len(ranked), 3)
+        self.assertEqual(ranked[0]["id"], "peanuts")
+        print("[PASS] Relevant memory ranked first")
+    
+    def test_recency_and_importance_break_ties(self):
+        """With equal relevance, newer and more important memories rank higher."""
+        memories = [
+            {"id": "old", "memory": "Soccer practice", "updated_at": "2020-01-01T00:00:00"},
+            {"id": "new", "memory": "Soccer practice", "updated_at": "2025-01-01T00:00:00"},
+            {"id": "vip", "memory": "Soccer practice", "updated_at": "2020-01-01T00:00:00", "importance": 1.0},
+        ]
+        ranked = [m["id"] for m in self.ranker.rank("soccer", memories)]
+        self.assertEqual(ranked[-1], "old")
+        print("[PASS] Recency and importance affect ranking")
+    
+    def test_token_budget_respected(self):
+        """Selected memories fit in the token budget."""
+        ranked = self.ranker.rank("garden", self.memories, top_k=50, token_budget=30)
+        total = sum(len(m["memory"]) // 4 + 1 for m in ranked)
+        self.assertLessEqual(total, 30)
+        self.assertGreater(len(ranked), 0)
+        print("[PASS] Memory token budget respected")
+    
+    def test_token_budget_fills_from_lower_ranks(self):
+        """A top memory too long for the budget is replaced by the next best that fits."""
+        memories = [
+            {"id": "long", "memory": "Soccer " * 60, "importance": 1.0},
+            {"id": "a", "memory": "Soccer on Saturday", "importance": 0.9},
+            {"id": "b", "memory": "Soccer cleats are size 4", "importance": 0.8},
+            {"id": "c", "memory": "Soccer coach is Maria", "importance": 0.1},
+        ]
+        ranked = [m["id"] for m in self.ranker.rank("soccer", memories, top_k=2, token_budget=40)]
+        self.assertEqual(ranked, ["a", "b"])
+        print("[PASS] Memory token budget filled from lower ranks")
+    
+    def test_select_prompt_memories_dedupes(self):
+        """Search hits already in the stored section are not repeated."""
+        stored, relevant = select_prompt_memories(
+            "peanuts", self.memories, [{"memory": "Jack is allergic to peanuts"}], memory_limit=5
+        )
+        self.assertEqual(stored[0]["id"], "peanuts")
+        self.assertEqual(relevant, [])
+        print("[PASS] Prompt memories deduplicated")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for per-stage latency metrics and their exporters.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from metrics import FileExporter, StageMetrics, start_http_exporter
+from tool_execution import ParallelToolNode
+
+
+@tool
+def lookup_weather(city: str) -> str:
+    """Look up the weather for a city."""
+    return f"Sunny in {city}"
+
+
+class TestMetrics(unittest.TestCase):
+    """Test suite for stage histograms, percentiles and exporters."""
+
+    def test_percentiles_per_stage_and_user(self):
+        """Summaries report p50/p95/p99 overall and for each user."""
+        registry = StageMetrics(max_users=2)
+        for ms in range(1, 101):
+            registry.observe("llm", ms / 1000, "user_a")
+        registry.observe("llm", 2.0, "user_b")
+        registry.observe("llm", 3.0, "user_c")  # over max_users, shares one label
+
+        overall = registry.summary()["llm"]
+        self.assertEqual(overall["count"], 102)
+        self.assertEqual(registry.summary("user_a")["llm"]["p50_ms"], 50.0)
+        self.assertEqual(registry.summary("user_a")["llm"]["p95_ms"], 95.0)
+        self.assertEqual(registry.summary("user_a")["llm"]["p99_ms"], 99.0)
+        self.assertEqual(registry.summary("_other")["llm"]["max_ms"], 3000.0)
+        self.assertEqual(registry.summary("user_c"), {})
+
+        with self.assertRaises(RuntimeError):
+            with registry.time("memory_store", "user_a"):
+                raise RuntimeError("failed stages are still timed")
+        self.assertEqual(registry.summary("user_a")["memory_store"]["count"], 1)
+        print("[PASS] Percentiles per stage and user")
+
+    def test_prometheus_endpoint_and_file_exporter(self):
+        """Histograms are served as Prometheus text and written to a JSON file."""
+        registry = StageMetrics()
+        registry.observe("location", 0.02, "user_a")
+        registry.observe("location", 0.3, "user_a")
+
+        server = start_http_exporter(registry, 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            text = urllib.request.urlopen(url, timeout=5).read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("# TYPE athena_stage_latency_seconds histogram", text)
+        self.assertIn('athena_stage_latency_seconds_bucket{stage="location",le="0.025"} 1', text)
+        self.assertIn('athena_stage_latency_seconds_bucket{stage="location",le="+Inf"} 2', text)
+        self.assertIn('athena_user_stage_latency_seconds_count{stage="location",user="user_a"} 2', text)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "metrics.json")
+            FileExporter(registry, path, interval=60).start().stop()
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot["stages"]["location"]["p99_ms"], 300.0)
+        self.assertEqual(snapshot["users"]["user_a"]["location"]["count"], 2)
+        print("[PASS] Prometheus endpoint and file exporter")
+
+    def test_tool_node_records_stage_latency(self):
+        """The tools node records the round and each tool call for the user."""
+        registry = StageMetrics()
+        node = ParallelToolNode([lookup_weather], metrics=registry)
+        message = AIMessage(content="", tool_calls=[
+            {"name": "lookup_weather", "args": {"city": "Portland"}, "id": "call_1"},
+            {"name": "lookup_weather", "args": {"city": "Salem"}, "id": "call_2"}
+        ])
+        asyncio.run(node({"messages": [message], "user_id": "user_a"}))
+
+        stages = registry.summary("user_a")
+        self.assertEqual(stages["tools"]["count"], 1)
+        self.assertEqual(stages["tool:lookup_weather"]["count"], 2)
+        print("[PASS] Tool node records stage latency")
+
+
+if __name__ == '__main__':
+    unittest.main()
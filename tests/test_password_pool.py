@@ -0,0 +1,103 @@
+"""
+Tests for the bounded bcrypt pool and the async UserService methods.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.password_pool import PasswordHashingPool, PasswordPoolBusy
+from auth.user_service import UserService
+from database.connection import Base
+from metrics import StageMetrics
+
+
+class TestPasswordPool(unittest.TestCase):
+    """Test suite for offloading bcrypt work."""
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_login_burst_does_not_stall_event_loop(self):
+        """Concurrent async logins leave the event loop free to keep streaming."""
+        async def scenario():
+            user = await UserService.acreate_user(self.db, "mom@example.com", "mom", "Morning123")
+            self.assertIsNotNone(user)
+            self.assertTrue(user.password_hash.startswith("$2"))
+
+            gaps = []
+            stop = asyncio.Event()
+
+            async def stream_ticks():
+                last = time.perf_counter()
+                while not stop.is_set():
+                    await asyncio.sleep(0.005)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            ticker = asyncio.create_task(stream_ticks())
+            logins = await asyncio.gather(*[
+                UserService.aauthenticate_user(self.db, "mom", "Morning123" if i % 2 == 0 else "wrong")
+                for i in range(6)
+            ])
+            stop.set()
+            await ticker
+            return logins, max(gaps)
+
+        logins, worst_gap = asyncio.run(scenario())
+        self.assertEqual([user is not None for user in logins], [True, False] * 3)
+        self.assertIsNotNone(logins[0].last_login)
+        # Each bcrypt check takes far longer than this; the loop never waited on one
+        self.assertLess(worst_gap, 0.1)
+        print(f"[PASS] Login burst leaves the event loop free (worst tick gap {worst_gap * 1000:.0f}ms)")
+
+    def test_queue_is_bounded_and_measured(self):
+        """Calls beyond max_queue are rejected; queue depth is exposed as gauges."""
+        registry = StageMetrics()
+        pool = PasswordHashingPool(max_workers=1, max_queue=1, metrics=registry)
+        release = threading.Event()
+        try:
+            running = pool.submit("verify", release.wait, 5)
+            queued = pool.submit("verify", lambda: True)
+            for _ in range(100):
+                if pool.stats()["running"] == 1:
+                    break
+                time.sleep(0.01)
+            with self.assertRaises(PasswordPoolBusy):
+                pool.submit("verify", lambda: True)
+
+            registry.register_gauge("athena_auth_bcrypt_queue_depth", "Waiting", lambda: pool.stats()["queued"])
+            self.assertIn("athena_auth_bcrypt_queue_depth 1", registry.render_prometheus())
+            self.assertEqual(pool.stats()["rejected"], 1)
+
+            release.set()
+            self.assertTrue(running.result(timeout=5))
+            self.assertTrue(queued.result(timeout=5))
+        finally:
+            release.set()
+            pool.shutdown()
+
+        stats = pool.stats()
+        self.assertEqual((stats["queued"], stats["running"], stats["peak_queued"]), (0, 0, 1))
+        self.assertEqual(registry.summary()["bcrypt_verify"]["count"], 2)
+        self.assertEqual(registry.summary()["bcrypt_queue_wait"]["count"], 2)
+        print("[PASS] bcrypt queue is bounded and measured")
+
+
+if __name__ == '__main__':
+    unittest.main()
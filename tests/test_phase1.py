@@ -14,6 +14,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from database.connection import Base, get_db, init_db
 from database.models import User
+from database.user_writes import get_user_writer
 from auth.auth_utils import hash_password, verify_password, create_access_token, verify_token
 from auth.user_service import UserService
 
@@ -34,6 +35,7 @@ class TestPhase1(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Clean up test database after all tests."""
+        get_user_writer(cls.engine).flush()  # Write queued logins before the file goes
         cls.engine.dispose()  # Close all connections
         if os.path.exists(cls.test_db_path):
             try:
@@ -0,0 +1,86 @@
+"""
+Tests for structured, cached user preferences.
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.preference_cache import PreferenceCache, preference_cache, typed_preference
+from auth.user_service import UserService
+from database.connection import Base
+from database.models import UserPreference
+
+
+class TestPreferences(unittest.TestCase):
+    """Test suite for partial preference updates and the preference cache."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.user = UserService.create_user(self.db, "mom@example.com", "mom", "Morning123")
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda conn, cursor, statement, *args: self.statements.append(statement))
+        preference_cache.clear()
+
+    def tearDown(self):
+        preference_cache.clear()
+        self.db.close()
+        self.engine.dispose()
+
+    def test_partial_updates_and_cached_reads(self):
+        """Single-key writes touch one row; reads after the first come from memory."""
+        user_id = self.user.id
+        prefs = UserService.update_preferences(self.db, user_id, {"timezone": "Europe/Paris", "units": "metric", "wake_hour": 7})
+        self.assertEqual(dict(prefs), {"timezone": "Europe/Paris", "units": "metric", "wake_hour": 7})
+
+        self.statements.clear()
+        prefs = UserService.update_preferences(self.db, user_id, {"units": "imperial"})
+        writes = [s for s in self.statements if s.startswith(("UPDATE", "INSERT", "DELETE"))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn("UPDATE user_preferences", writes[0])
+        self.assertEqual(prefs["units"], "imperial")
+        self.assertEqual(prefs["timezone"], "Europe/Paris")
+
+        self.statements.clear()
+        for _ in range(10):
+            self.assertEqual(UserService.get_preference(self.db, user_id, "wake_hour", 6), 7)
+        self.assertEqual(self.statements, [])
+        with self.assertRaises(TypeError):
+            prefs["units"] = "metric"  # callers cannot change the cached mapping
+
+        self.assertEqual(UserService.delete_preferences(self.db, user_id, "units", "missing"), 1)
+        self.assertNotIn("units", UserService.get_preferences(self.db, user_id))
+        self.assertEqual(self.db.query(UserPreference).count(), 2)
+        print("[PASS] Partial preference updates with cached reads")
+
+    def test_typed_accessor_and_stale_loads(self):
+        """Typed reads fall back to the default; a load racing a write is not cached."""
+        self.assertEqual(typed_preference("7", 6), 6)
+        self.assertEqual(typed_preference(True, 6), 6)
+        self.assertEqual(typed_preference(7, 6.5), 7.0)
+        self.assertEqual(typed_preference(None, "UTC"), "UTC")
+        self.assertEqual(typed_preference(["soccer"], []), ["soccer"])
+
+        cache = PreferenceCache(max_users=2)
+        version = cache.version("u1")
+        cache.invalidate("u1")  # a write lands while the load is in flight
+        cache.put("u1", {"units": "metric"}, version)
+        self.assertIsNone(cache.get("u1"))
+
+        for user_id in ("u1", "u2", "u3"):
+            cache.put(user_id, {}, cache.version(user_id))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("u1"))
+        print("[PASS] Typed accessor and stale-load protection")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Tests for the cached per-user profile digest used in the system prompt.
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from athena_agent import agent
+from auth.preference_cache import preference_cache
+from auth.profile_digest import profile_digests
+from auth.user_service import UserService
+from database.connection import Base
+from database.models import User, UserPreference
+
+
+class TestProfileDigest(unittest.TestCase):
+    """Test suite for profile digests and their refresh on account changes."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        self.db = self.SessionLocal()
+        self.user = UserService.create_user(self.db, "mom@example.com", "mom", "Morning123", first_name="Ana", last_name="Silva")
+        UserService.update_preferences(self.db, self.user.id, {"diet": ["vegetarian"], "units": "metric"})
+        self.queries = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+        profile_digests.clear()
+        preference_cache.clear()
+
+    def tearDown(self):
+        profile_digests.clock = time.monotonic
+        profile_digests.clear()
+        preference_cache.clear()
+        agent.get_profile_sessions.reset()
+        self.db.close()
+        self.engine.dispose()
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    def test_digest_cached_and_refreshed_by_update_user(self):
+        """The digest is built once, found by mem0_user_id, and rebuilt on update_user."""
+        mem0_id = self.user.mem0_user_id
+        digest = UserService.get_profile_digest(self.db, mem0_id)
+        self.assertIn("USER PROFILE", digest)
+        self.assertIn("- Name: Ana Silva", digest)
+        self.assertIn("- Diet: vegetarian", digest)
+
+        self.queries = 0
+        self.assertEqual(UserService.get_profile_digest(self.db, self.user.id), digest)
+        self.assertEqual(UserService.get_profile_digest(self.db, mem0_id), digest)
+        self.assertEqual(self.queries, 0)
+
+        UserService.update_user(self.db, self.user, first_name="Anna")
+        self.queries = 0
+        self.assertIn("- Name: Anna Silva", UserService.get_profile_digest(self.db, mem0_id))
+        self.assertEqual(self.queries, 0)
+
+        UserService.update_preferences(self.db, self.user.id, {"units": "imperial"})
+        self.assertIn("- Units: imperial", UserService.get_profile_digest(self.db, mem0_id))
+
+        self.assertTrue(UserService.delete_user(self.db, self.user))
+        self.assertEqual(UserService.get_profile_digest(self.db, mem0_id), "")
+        print("[PASS] Profile digest cached and refreshed on account changes")
+
+    def test_digest_expires_after_max_age(self):
+        """A change made outside this process's UserService shows up once the digest ages out."""
+        now = [0.0]
+        profile_digests.clock = lambda: now[0]
+        self.assertIn("- Name: Ana Silva", UserService.get_profile_digest(self.db, self.user.id))
+
+        # Another process renames the user; this process's cache is not told
+        other = self.SessionLocal()
+        other.query(User).filter(User.id == self.user.id).update({"first_name": "Anna"})
+        other.query(UserPreference).filter(UserPreference.key == "units").update({"value": "imperial"})
+        other.commit()
+        other.close()
+        self.db.expire_all()
+
+        now[0] = profile_digests.max_age - 1
+        self.assertIn("- Name: Ana Silva", UserService.get_profile_digest(self.db, self.user.id))
+        now[0] = profile_digests.max_age
+        digest = UserService.get_profile_digest(self.db, self.user.id)
+        self.assertIn("- Name: Anna Silva", digest)
+        self.assertIn("- Units: imperial", digest)
+        print("[PASS] Profile digest expires after max age")
+
+    def test_agent_reads_digest_without_memory_search(self):
+        """The chatbot node's profile source hits the database once per user."""
+        agent.get_profile_sessions.override(self.SessionLocal)
+        mem0_id = self.user.mem0_user_id
+
+        async def turns():
+            return [await agent._profile_digest(uid) for uid in (mem0_id,) * 3 + ("default_user",) * 2]
+
+        self.queries = 0
+        digests = asyncio.run(turns())
+        self.assertIn("Ana Silva", digests[0])
+        self.assertEqual(digests[:3], [digests[0]] * 3)
+        self.assertEqual(digests[3:], ["", ""])
+        # One user lookup plus one preference load for the account, one lookup for the unknown id
+        self.assertEqual(self.queries, 3)
+        print("[PASS] Agent profile digest served from cache")
+
+
+if __name__ == '__main__':
+    unittest.main()
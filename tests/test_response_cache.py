@@ -0,0 +1,140 @@
+"""
+Tests for the exact-match response cache.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from memory import CachedMemoryClient, MemoryOutbox
+from response_cache import ResponseCache, normalize_question
+
+MONDAY_MORNING = {"hour": 9, "day_of_week": "Monday", "season": "autumn"}
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test suite for ResponseCache."""
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=2, ttl=60)
+
+    def test_normalization_matches_variants(self):
+        """Case, punctuation and apostrophes don't change the key."""
+        self.assertEqual(normalize_question("What's for dinner?!"), "whats for dinner")
+        key = self.cache.make_key("user_1", "Weekend  plans?", MONDAY_MORNING)
+        self.assertEqual(key, self.cache.make_key("user_1", "weekend plans", MONDAY_MORNING))
+        self.assertNotEqual(key, self.cache.make_key("user_2", "weekend plans", MONDAY_MORNING))
+        self.assertNotEqual(key, self.cache.make_key("user_1", "weekend plans", {**MONDAY_MORNING, "hour": 10}))
+        self.assertIsNone(self.cache.make_key("user_1", "yes", MONDAY_MORNING))
+        print("[PASS] Normalization matches variants")
+
+    def test_follow_up_keyed_by_conversation(self):
+        """The same follow-up in two different conversations does not share an answer."""
+        follow_up = "what about tomorrow instead"
+        soccer = [HumanMessage(content="When is Ava's soccer practice?"), AIMessage(content="Today at 5pm.")]
+        dentist = [HumanMessage(content="When is the dentist?"), AIMessage(content="Today at 3pm.")]
+        key = self.cache.make_key("user_1", follow_up, MONDAY_MORNING, soccer)
+        self.cache.put(key, "Tomorrow there's no practice.")
+        self.assertEqual(self.cache.get(self.cache.make_key("user_1", follow_up, MONDAY_MORNING, list(soccer))),
+                         "Tomorrow there's no practice.")
+        self.assertIsNone(self.cache.get(self.cache.make_key("user_1", follow_up, MONDAY_MORNING, dentist)))
+        self.assertIsNone(self.cache.get(self.cache.make_key("user_1", follow_up, MONDAY_MORNING)))
+        # Opening questions of different threads share the empty history
+        self.assertEqual(self.cache.make_key("user_1", "weekend plans", MONDAY_MORNING, []),
+                         self.cache.make_key("user_1", "weekend plans", MONDAY_MORNING))
+        print("[PASS] Follow-up keyed by conversation")
+
+    def test_hit_requires_same_memory_version(self):
+        """A memory change invalidates cached answers."""
+        key = self.cache.make_key("user_1", "what day is it", MONDAY_MORNING)
+        self.cache.put(key, "It's Monday!", memory_version=3)
+        self.assertEqual(self.cache.get(key, 3), "It's Monday!")
+        self.assertIsNone(self.cache.get(key, 4))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        print("[PASS] Hit requires same memory version")
+
+    def test_ttl_and_lru_eviction(self):
+        """Entries expire after the TTL and the least recently used is evicted."""
+        keys = [self.cache.make_key("user_1", f"dinner ideas {i}", MONDAY_MORNING) for i in range(3)]
+        self.cache.put(keys[0], "a")
+        self.cache.put(keys[1], "b")
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], "c")
+        self.assertEqual(self.cache.get(keys[0]), "a")
+        self.assertIsNone(self.cache.get(keys[1]))
+
+        short = ResponseCache(ttl=0.05)
+        key = short.make_key("user_1", "what day is it", MONDAY_MORNING)
+        short.put(key, "Monday")
+        time.sleep(0.1)
+        self.assertIsNone(short.get(key))
+        self.assertIsNone(ResponseCache(ttl=0).make_key("user_1", "what day is it", MONDAY_MORNING))
+        print("[PASS] TTL and LRU eviction")
+
+
+class EventMemoryClient:
+    """Mem0 stand-in that reports an ADD event only for turns it has not seen."""
+
+    def __init__(self):
+        self.memories = []
+
+    def get_all(self, user_id, **kwargs):
+        return {"results": list(self.memories)}
+
+    def add(self, messages, user_id):
+        text = messages[0]["content"]
+        if not text.startswith("remember") or any(m["memory"] == text for m in self.memories):
+            return {"results": []}
+        memory = {"id": str(len(self.memories)), "memory": text}
+        self.memories.append(memory)
+        return {"results": [dict(memory, event="ADD")]}
+
+
+class TestResponseCacheWithMemory(unittest.TestCase):
+    """The response cache behind the memory outbox and the memory cache."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.memory = CachedMemoryClient(EventMemoryClient())
+        self.outbox = MemoryOutbox(self.memory, self.path)
+        self.cache = ResponseCache(ttl=60)
+
+    def tearDown(self):
+        for path in (self.path, f"{self.path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _turn(self, question, answer):
+        """One agent turn: serve from cache, or answer, cache and queue the memory write."""
+        key = self.cache.make_key("user_1", question, MONDAY_MORNING)
+        cached = self.cache.get(key, self.memory.version("user_1"))
+        if cached is not None:
+            return cached
+        self.memory.get_all(user_id="user_1")
+        self.cache.put(key, answer, self.memory.version("user_1"))
+        self.outbox.enqueue("user_1", [{"role": "user", "content": question}, {"role": "assistant", "content": answer}])
+        self.outbox.flush()
+        return answer
+
+    def test_repeat_hits_after_memory_write_delivered(self):
+        """Our own delivered write keeps the answer; a new fact invalidates it."""
+        self.assertEqual(self._turn("what should we cook tonight", "Pasta"), "Pasta")
+        self.assertEqual(self._turn("what should we cook tonight", "Tacos"), "Pasta")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+        self._turn("remember Emma is vegetarian now", "Got it")
+        self.assertEqual(self._turn("what should we cook tonight", "Lentil curry"), "Lentil curry")
+        print("[PASS] Response cache survives the memory write of the cached turn")
+
+
+if __name__ == '__main__':
+    unittest.main()
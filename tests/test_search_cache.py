@@ -0,0 +1,92 @@
+"""
+Tests for the cached, single-flight web search tool wrapper.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.tools import BaseTool
+
+from search_cache import CachedSearchTool, SearchCache, classify_query
+
+
+class FakeSearch(BaseTool):
+    """Stands in for TavilySearch and counts upstream requests."""
+
+    name: str = "tavily_search"
+    description: str = "Search the web"
+    calls: list = []
+    delay: float = 0.05
+
+    def _run(self, query: str, **kwargs):
+        self.calls.append(query)
+        time.sleep(self.delay)
+        return {"query": query, "results": [{"title": "result"}]}
+
+    async def _arun(self, query: str, **kwargs):
+        self.calls.append(query)
+        await asyncio.sleep(self.delay)
+        if query == "broken":
+            return {"error": "rate limited"}
+        return {"query": query, "results": [{"title": "result"}]}
+
+
+class TestSearchCache(unittest.TestCase):
+    """Test suite for CachedSearchTool and SearchCache."""
+
+    def setUp(self):
+        self.search = FakeSearch(calls=[])
+        self.tool = CachedSearchTool(self.search, SearchCache(max_entries=8))
+
+    def test_query_classes(self):
+        """TTL classes follow what the question is about."""
+        self.assertEqual(classify_query("Weather forecast Portland this weekend"), "weather")
+        self.assertEqual(classify_query("easy pasta recipes for kids"), "recipes")
+        self.assertEqual(classify_query("family events near me"), "events")
+        self.assertEqual(classify_query("who won the game", topic="news"), "news")
+        self.assertEqual(classify_query("how tall is mount hood"), "general")
+        print("[PASS] Query classes")
+
+    def test_normalized_queries_share_results(self):
+        """Repeated and reformatted queries are served from cache."""
+        self.tool.invoke({"query": "Weather in Portland?"})
+        self.tool.invoke({"query": "weather in  portland"})
+        self.assertEqual(len(self.search.calls), 1)
+        self.tool.invoke({"query": "weather in portland", "topic": "news"})
+        self.assertEqual(len(self.search.calls), 2)
+        self.assertEqual(self.tool.cache.stats()["hits"], 1)
+        print("[PASS] Normalized queries share results")
+
+    def test_concurrent_queries_are_merged(self):
+        """Identical in-flight searches reach the API once, sync and async."""
+        threads = [threading.Thread(target=self.tool.invoke, args=({"query": "pasta recipes"},)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.search.calls, ["pasta recipes"])
+
+        async def burst():
+            return await asyncio.gather(*[self.tool.ainvoke({"query": "local events"}) for _ in range(5)])
+
+        results = asyncio.run(burst())
+        self.assertEqual(self.search.calls, ["pasta recipes", "local events"])
+        self.assertTrue(all(result == results[0] for result in results))
+        print("[PASS] Concurrent queries merged")
+
+    def test_errors_are_not_cached(self):
+        """A failed search is retried on the next call."""
+        asyncio.run(self.tool.ainvoke({"query": "broken"}))
+        asyncio.run(self.tool.ainvoke({"query": "broken"}))
+        self.assertEqual(self.search.calls, ["broken", "broken"])
+        print("[PASS] Errors not cached")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests that importing the agent and the CLI is cheap and free of side effects.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazy_utils import measure_import_time, once
+
+# Modules that should only load once a client is actually needed
+HEAVY_MODULES = ("langchain_google_genai", "google.genai", "langchain_tavily", "mem0")
+
+IMPORT_CHECK = """
+import sys
+sys.argv = ["athena_chatbot.py"]
+import athena_agent.agent, athena_chatbot
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _clean_env(workdir: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "TAVILY_API_KEY", "MEM0_API_KEY")}
+    env["MEMORY_OUTBOX_PATH"] = os.path.join(workdir, "outbox.jsonl")
+    env["PYTHONPATH"] = str(ROOT)
+    return env
+
+
+class TestStartup(unittest.TestCase):
+    """Test suite for lazy client construction."""
+
+    def test_once_builds_a_single_instance(self):
+        """The factory runs once until it is reset."""
+        calls = []
+
+        @once
+        def factory():
+            calls.append(1)
+            return object()
+
+        first = factory()
+        self.assertIs(factory(), first)
+        factory.reset()
+        self.assertIsNot(factory(), first)
+        self.assertEqual(len(calls), 2)
+        print("[PASS] once() builds a single instance")
+
+    def test_import_needs_no_keys_and_has_no_side_effects(self):
+        """Importing needs no API keys, prints nothing, and creates no files."""
+        with tempfile.TemporaryDirectory() as workdir:
+            result = subprocess.run(
+                [sys.executable, "-c", IMPORT_CHECK.format(heavy=HEAVY_MODULES)],
+                env=_clean_env(workdir), cwd=workdir, capture_output=True, text=True
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.strip(), "")
+            self.assertEqual(os.listdir(workdir), [])
+
+            times = measure_import_time("athena_agent.agent", env=_clean_env(workdir), cwd=workdir)
+        print(f"[PASS] Import is side-effect free ({times['athena_agent.agent']:.0f} ms for athena_agent.agent)")
+
+    def test_make_graph_builds_on_demand(self):
+        """The platform factory builds the graph once a key is configured."""
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {**_clean_env(workdir), "GOOGLE_API_KEY": "test-key", "HTTP_WARMUP": "0"}
+            script = (
+                "from athena_agent.agent import make_graph, get_graph\n"
+                "graph = make_graph()\n"
+                "assert graph is get_graph()\n"
+                "print(sorted(graph.get_graph().nodes))\n"
+            )
+            result = subprocess.run([sys.executable, "-c", script], env=env, cwd=workdir, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("'chatbot'", result.stdout)
+        print("[PASS] make_graph builds the graph on demand")
+
+
+if __name__ == '__main__':
+    unittest.main()
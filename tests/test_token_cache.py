@@ -0,0 +1,131 @@
+"""
+Tests for the verified-token cache.
+"""
+
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth import auth_utils
+from auth.auth_utils import create_access_token, verify_token
+from auth.token_cache import VerifiedTokenCache, token_cache
+from auth.user_service import UserService
+from database.connection import Base
+from database.user_writes import get_user_writer
+
+
+class TestTokenCache(unittest.TestCase):
+    """Test suite for cached token verification and user resolution."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        self.queries = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+        token_cache.clear()
+
+    def tearDown(self):
+        token_cache.clear()
+        get_user_writer(self.engine).flush()
+        self.engine.dispose()
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    def test_payloads_cached_until_exp(self):
+        """A verified token is not decoded again until its exp passes."""
+        token = create_access_token({"user_id": "u1", "username": "dad"})
+        with mock.patch.object(auth_utils.jwt, "decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                self.assertEqual(verify_token(token)["user_id"], "u1")
+            self.assertEqual(decode.call_count, 1)
+            self.assertIsNone(verify_token("invalid.token.here"))
+
+        now = [1000.0]
+        cache = VerifiedTokenCache(max_entries=2, clock=lambda: now[0])
+        cache.put_payload("a", {"user_id": "u1", "exp": 1010})
+        cache.put_payload("no-exp", {"user_id": "u1"})
+        self.assertIsNotNone(cache.get_payload("a"))
+        self.assertIsNone(cache.get_payload("no-exp"))
+        now[0] = 1010.0
+        self.assertIsNone(cache.get_payload("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+        print("[PASS] Payloads cached until exp")
+
+    def test_user_resolved_without_queries_until_account_changes(self):
+        """Repeat requests resolve the user with no SQL; update and delete invalidate."""
+        db = self.SessionLocal()
+        user = UserService.create_user(db, "kid@example.com", "kid", "Password123", first_name="Emma")
+        token = create_access_token({"user_id": user.id})
+        db.close()
+
+        db = self.SessionLocal()
+        self.assertEqual(UserService.get_user_from_token(db, token).first_name, "Emma")
+        db.close()
+
+        self.queries = 0
+        for _ in range(5):
+            db = self.SessionLocal()
+            resolved = UserService.get_user_from_token(db, token)
+            self.assertEqual((resolved.username, resolved.first_name), ("kid", "Emma"))
+            db.close()
+        self.assertEqual(self.queries, 0)
+
+        db = self.SessionLocal()
+        UserService.update_user(db, UserService.get_user_from_token(db, token), first_name="Em")
+        db.close()
+        db = self.SessionLocal()
+        self.assertEqual(UserService.get_user_from_token(db, token).first_name, "Em")
+
+        self.assertTrue(UserService.delete_user(db, UserService.get_user_from_token(db, token)))
+        db.close()
+        db = self.SessionLocal()
+        self.assertIsNone(UserService.get_user_from_token(db, token))
+        db.close()
+        print("[PASS] User resolved without queries until the account changes")
+
+    def test_login_keeps_other_devices_cached(self):
+        """A login refreshes the cached user of the account's other tokens instead of dropping them."""
+        db = self.SessionLocal()
+        user = UserService.create_user(db, "mom@example.com", "mom", "Password123")
+        phone = create_access_token({"user_id": user.id, "device": "phone"})
+        self.assertIsNotNone(UserService.get_user_from_token(db, phone))
+        db.close()
+
+        db = self.SessionLocal()
+        logged_in = UserService.authenticate_user(db, "mom", "Password123")
+        db.close()
+
+        self.queries = 0
+        db = self.SessionLocal()
+        resolved = UserService.get_user_from_token(db, phone)
+        self.assertEqual(resolved.last_login, logged_in.last_login)
+        db.close()
+        self.assertEqual(self.queries, 0)
+        print("[PASS] Login keeps other devices cached")
+
+    def test_import_does_not_load_the_database(self):
+        """verify_token (and the bulk-hash workers) import without SQLAlchemy or the engine."""
+        script = (
+            "import sys, auth.auth_utils\n"
+            "print(','.join(m for m in ('sqlalchemy', 'database.connection') if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+        print("[PASS] Token verification imports without the database")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for compaction of search tool results.
+"""
+
+import asyncio
+import json
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from token_utils import estimate_tokens
+from tool_execution import ParallelToolNode
+from tool_compaction import TOOL_RESULTS_PER_THREAD, ToolResultCompactor, keep_recent_tool_results, make_expand_tool
+
+FILLER = "Subscribe to our newsletter for more updates from the editorial team every single week. " * 6
+
+
+def search_payload():
+    shared = "Expect light rain in Portland on Saturday with highs around 58 degrees."
+    return {
+        "query": "Portland weather Saturday",
+        "answer": None,
+        "results": [
+            {
+                "url": "https://weather.example.com/portland/forecast?day=saturday&units=imperial",
+                "title": "Portland Forecast",
+                "content": f"{FILLER} {shared} Sunday looks dry and partly cloudy across the region.",
+                "score": 0.91,
+                "raw_content": None
+            },
+            {
+                "url": "https://news.example.org/local/portland-weekend-weather-outlook",
+                "title": "Weekend Outlook",
+                "content": f"{shared} {FILLER} Winds will stay calm through Saturday in Portland.",
+                "score": 0.84,
+                "raw_content": None
+            }
+        ],
+        "response_time": 1.2
+    }
+
+
+def search_round(content):
+    return {
+        "messages": [
+            HumanMessage(content="weather saturday?", id="h1"),
+            AIMessage(content="", tool_calls=[{"name": "tavily_search", "args": {"query": "q"}, "id": "c1"}], id="a1"),
+            ToolMessage(content=content, name="tavily_search", tool_call_id="c1", id="t1"),
+        ],
+        "context": {}
+    }
+
+
+class TestToolResultCompactor(unittest.TestCase):
+    """Test suite for ToolResultCompactor."""
+
+    def setUp(self):
+        self.compactor = ToolResultCompactor()
+
+    def test_search_result_is_compacted(self):
+        """Relevant sentences are kept, duplicates and filler dropped, ID preserved."""
+        raw = json.dumps(search_payload())
+        update = self.compactor(search_round(raw))
+        message = update["messages"][0]
+
+        self.assertEqual(message.id, "t1")
+        self.assertEqual(message.tool_call_id, "c1")
+        self.assertIn("light rain in Portland", message.content)
+        self.assertEqual(message.content.count("light rain"), 1)
+        self.assertNotIn("newsletter", message.content)
+        self.assertIn("weather.example.com", message.content)
+        self.assertLess(estimate_tokens(message.content), estimate_tokens(raw) / 3)
+        stats = update["context"]["last_compaction"]
+        self.assertLess(stats["tokens_after"], stats["tokens_before"])
+        print("[PASS] Search result compacted")
+
+    def test_full_payload_available_on_demand(self):
+        """The payload goes into the thread's state, where the expand tool finds it by ref."""
+        raw = json.dumps(search_payload())
+        update = self.compactor(search_round(raw))
+        ref = update["messages"][0].additional_kwargs["compacted_ref"]
+        self.assertEqual(update["tool_results"], {ref: raw})
+
+        state = {"tool_results": keep_recent_tool_results({}, update["tool_results"])}
+        expand = make_expand_tool()
+        self.assertEqual(expand.invoke({"ref": ref, "state": state}), raw)
+        self.assertIn('No full search result with ref "missing"', expand.invoke({"ref": "missing", "state": state}))
+        self.assertIn("No full search result", expand.invoke({"ref": ref, "state": {}}))
+        print("[PASS] Full payload available on demand")
+
+    def test_tools_node_injects_thread_state(self):
+        """Under the agent's tools node, the expand tool reads the thread's payloads."""
+        call = {"name": "get_full_search_result", "args": {"ref": "r1"}, "id": "c2"}
+        state = {"messages": [AIMessage(content="", tool_calls=[call])], "context": {}, "tool_results": {"r1": "full"}}
+        update = asyncio.run(ParallelToolNode([make_expand_tool()])(state))
+        self.assertEqual(update["messages"][0].content, "full")
+        print("[PASS] Tools node injects thread state")
+
+    def test_thread_keeps_newest_payloads(self):
+        """The state reducer keeps only the newest payloads of a thread."""
+        results = {}
+        for index in range(TOOL_RESULTS_PER_THREAD + 5):
+            results = keep_recent_tool_results(results, {f"ref{index}": "{}"})
+        self.assertEqual(len(results), TOOL_RESULTS_PER_THREAD)
+        self.assertNotIn("ref0", results)
+        self.assertIn(f"ref{TOOL_RESULTS_PER_THREAD + 4}", results)
+        print("[PASS] Thread keeps its newest payloads")
+
+    def test_other_results_left_alone(self):
+        """Errors, non-JSON output and already compacted results are not touched."""
+        self.assertEqual(self.compactor(search_round("plain text")), {})
+        state = search_round(json.dumps({"error": "rate limited"}))
+        self.assertEqual(self.compactor(state), {})
+
+        compacted = self.compactor(search_round(json.dumps(search_payload())))["messages"][0]
+        state = search_round("")
+        state["messages"][-1] = compacted
+        self.assertEqual(self.compactor(state), {})
+        print("[PASS] Other results left alone")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for concurrent tool execution with per-call timeouts.
+"""
+
+import asyncio
+import json
+import time
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from tool_execution import ParallelToolNode
+
+
+@tool
+async def weather(city: str) -> str:
+    """Weather for a city."""
+    await asyncio.sleep(0.1)
+    return f"Sunny in {city}"
+
+
+@tool
+async def events(city: str) -> str:
+    """Local events for a city."""
+    await asyncio.sleep(0.1)
+    return f"Farmers market in {city}"
+
+
+@tool
+async def slow_search(query: str) -> str:
+    """A search that hangs."""
+    await asyncio.sleep(5)
+    return "too late"
+
+
+@tool
+async def broken(query: str) -> str:
+    """A tool that fails."""
+    raise RuntimeError("upstream unavailable")
+
+
+def tool_calls(*names):
+    return AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"city": "Portland"} if name in ("weather", "events") else {"query": "x"}, "id": f"call_{i}"}
+        for i, name in enumerate(names)
+    ])
+
+
+class TestParallelToolNode(unittest.TestCase):
+    """Test suite for ParallelToolNode."""
+
+    def setUp(self):
+        self.node = ParallelToolNode(
+            [weather, events, slow_search, broken], timeout=2.0, timeouts={"slow_search": 0.2}
+        )
+
+    def run_node(self, message):
+        return asyncio.run(self.node({"messages": [message], "context": {}}))
+
+    def test_calls_run_concurrently(self):
+        """Several tool calls take about as long as the slowest one."""
+        started = time.perf_counter()
+        result = self.run_node(tool_calls("weather", "events"))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.18)
+        self.assertEqual([m.content for m in result["messages"]], ["Sunny in Portland", "Farmers market in Portland"])
+        self.assertEqual([m.tool_call_id for m in result["messages"]], ["call_0", "call_1"])
+        print("[PASS] Calls run concurrently")
+
+    def test_timeout_and_errors_are_isolated(self):
+        """A hung or failing call returns a structured error; the rest succeed."""
+        started = time.perf_counter()
+        result = self.run_node(tool_calls("weather", "slow_search", "broken", "missing"))
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+        ok, timed_out, failed, unknown = result["messages"]
+        self.assertEqual(ok.content, "Sunny in Portland")
+        self.assertEqual(timed_out.status, "error")
+        self.assertEqual(json.loads(timed_out.content)["error"], "timeout")
+        self.assertEqual(json.loads(failed.content)["error"], "error")
+        self.assertEqual(json.loads(unknown.content)["error"], "unknown_tool")
+        print("[PASS] Timeout and errors isolated")
+
+    def test_latency_recorded_per_round(self):
+        """Every call's latency and status is recorded."""
+        result = self.run_node(tool_calls("weather", "slow_search"))
+        round_info = result["context"]["last_tool_round"]
+        self.assertEqual([c["status"] for c in round_info["calls"]], ["ok", "timeout"])
+        self.assertTrue(all(c["latency_ms"] > 0 for c in round_info["calls"]))
+
+        summary = self.node.latency_summary()
+        self.assertEqual(summary["slow_search"]["failures"], 1)
+        self.assertEqual(summary["weather"]["calls"], 1)
+        print("[PASS] Latency recorded per round")
+
+
+if __name__ == '__main__':
+    unittest.main()
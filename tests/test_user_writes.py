@@ -0,0 +1,116 @@
+"""
+Tests for the single-writer path and batched last_login updates.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from auth.auth_utils import hash_password
+from auth.user_service import UserService
+from database.connection import Base
+from database.models import User
+from database.user_writes import UserWriter, get_user_writer
+
+
+class TestUserWrites(unittest.TestCase):
+    """Test suite for serialized user writes on a file-backed SQLite database."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmpdir.name, 'users.db')}",
+            connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        get_user_writer(self.engine).flush()
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_create_user_commits_once(self):
+        """A new user is written in one commit, mem0_user_id included."""
+        commits = []
+        event.listen(self.engine, "commit", lambda conn: commits.append(1))
+        db = self.SessionLocal()
+        user = UserService.create_user(db, "dad@example.com", "dad", "Password123")
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(user.mem0_user_id, f"user_{user.id}")
+        db.close()
+        print("[PASS] User created with a single commit")
+
+    def test_concurrent_logins_and_signups(self):
+        """Logins and signups from many threads never hit 'database is locked'."""
+        db = self.SessionLocal()
+        db.add(User(id="u-shared", email="kid@example.com", username="kid",
+                    password_hash=hash_password("Password123")))
+        db.commit()
+        db.close()
+
+        writer = get_user_writer(self.engine)
+        errors = []
+
+        def worker(index):
+            session = self.SessionLocal()
+            try:
+                for attempt in range(3):
+                    user = UserService.authenticate_user(session, "kid", "Password123")
+                    self.assertIsNotNone(user.last_login)
+                UserService.create_user(session, f"member{index}@example.com", f"member{index}", "Password123")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        writer.flush()
+        db = self.SessionLocal()
+        self.assertEqual(db.query(User).count(), 9)
+        self.assertIsNotNone(db.query(User).filter(User.id == "u-shared").one().last_login)
+        db.close()
+        # 24 logins of one user collapse into far fewer row updates
+        self.assertLessEqual(writer.logins_written, writer.batches)
+        print(f"[PASS] 24 logins and 8 signups written without lock errors ({writer.batches} batches)")
+
+    def test_pending_logins_coalesce_per_user(self):
+        """Only the latest login per user is written, in one batch."""
+        db = self.SessionLocal()
+        for name in ("a", "b"):
+            db.add(User(id=name, email=f"{name}@example.com", username=name, password_hash="x"))
+        db.commit()
+        db.close()
+
+        writer = UserWriter(self.engine, flush_interval=60)
+        start = datetime(2026, 1, 1, 7, 0)
+        for minute in range(5):
+            writer.record_login("a", start + timedelta(minutes=minute))
+        writer.record_login("b", start)
+        self.assertEqual(writer.pending_count(), 2)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.batches, 1)
+
+        db = self.SessionLocal()
+        self.assertEqual(db.get(User, "a").last_login, start + timedelta(minutes=4))
+        db.close()
+        print("[PASS] Pending logins coalesce per user")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+"""
+Utility functions for estimating prompt size.
+Uses a character-based heuristic so budgeting works without a model tokenizer.
+"""
+
+from typing import Any, Iterable
+
+# Roughly four characters per token for English text across common LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_message_tokens(messages: Iterable[Any]) -> int:
+    """Estimate the tokens used by a list of chat messages, including per-message overhead."""
+    total = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        if not isinstance(content, str):
+            content = str(content)
+        total += estimate_tokens(content) + 4
+    return total
@@ -0,0 +1,197 @@
+"""
+Compaction of search tool results before they re-enter the LLM loop.
+
+Raw search results (full page snippets, URLs, scores, metadata) would
+otherwise be resent to the model on every later turn of the thread. This
+stage runs between the ``tools`` node and ``chatbot``. It keeps only the
+sentences relevant to the query, drops sentences repeated across results,
+and caps the size per query. The full payload is kept in the thread's
+``tool_results`` state (the newest ``TOOL_RESULTS_PER_THREAD`` of them), so
+it is checkpointed with the conversation and survives a restart, and the
+model can fetch it with the ``get_full_search_result`` tool when the
+summary isn't enough.
+"""
+
+import json
+import re
+import uuid
+from typing import Annotated, Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import StructuredTool
+
+from token_utils import estimate_tokens
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are at be by for from how in is it of on or the this to what when where which who why with".split()
+)
+
+EXPAND_TOOL_NAME = "get_full_search_result"
+
+# Full payloads kept per thread; older ones can no longer be expanded
+TOOL_RESULTS_PER_THREAD = 20
+
+
+def _terms(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 2 and word not in _STOPWORDS}
+
+
+def _sentence_key(sentence: str) -> str:
+    return " ".join(_WORD.findall(sentence.lower()))
+
+
+def compact_search_payload(
+    payload: Dict[str, Any],
+    ref: str,
+    max_chars: int = 1200,
+    sentences_per_result: int = 2
+) -> str:
+    """
+    Render a search payload as a short list of relevant sentences.
+
+    Args:
+        payload: Parsed search tool output with ``query`` and ``results``
+        ref: ID the model can pass to get_full_search_result
+        max_chars: Cap on the rendered text for this query
+        sentences_per_result: Most relevant sentences kept from each result
+
+    Returns:
+        Compact plain-text summary of the results
+    """
+    query = payload.get("query", "")
+    query_terms = _terms(query)
+    seen = set()
+    lines = [f"Search results for: {query}"]
+    if payload.get("answer"):
+        lines.append(f"Answer: {payload['answer']}")
+
+    for result in payload.get("results") or []:
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(result.get("content") or "") if len(s.strip()) > 20]
+        scored, keys = [], set()
+        for position, sentence in enumerate(sentences):
+            key = _sentence_key(sentence)
+            if key in seen or key in keys:
+                continue
+            keys.add(key)
+            overlap = len(query_terms & _terms(sentence))
+            scored.append((overlap, -position, sentence, key))
+        # Sentences sharing no query terms only stand in when nothing else matches
+        if any(overlap for overlap, *_ in scored):
+            scored = [item for item in scored if item[0]]
+        # Best overlap first; ties go to the earlier sentence. Then restore reading order.
+        picked = sorted(scored, reverse=True)[:sentences_per_result]
+        picked.sort(key=lambda item: -item[1])
+        if not picked:
+            continue
+        seen.update(key for *_, key in picked)
+        source = urlparse(result.get("url") or "").netloc or "unknown source"
+        title = result.get("title") or source
+        lines.append(f"- {title} ({source}): " + " ".join(sentence for _, _, sentence, _ in picked))
+
+    footer = f"[Compacted. Full results: {EXPAND_TOOL_NAME}(ref=\"{ref}\")]"
+    text = "\n".join(lines)
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + " ..."
+    return f"{text}\n{footer}"
+
+
+def keep_recent_tool_results(
+    current: Optional[Dict[str, str]],
+    update: Optional[Dict[str, str]]
+) -> Dict[str, str]:
+    """State reducer for ``tool_results``: add new payloads, keep the newest per thread."""
+    merged = {**(current or {}), **(update or {})}
+    if len(merged) > TOOL_RESULTS_PER_THREAD:
+        # Dicts keep insertion order, so the first keys are the oldest payloads
+        merged = dict(list(merged.items())[-TOOL_RESULTS_PER_THREAD:])
+    return merged
+
+
+def make_expand_tool(max_chars: int = 8000) -> StructuredTool:
+    """Tool that lets the model fetch a compacted search result of this thread in full."""
+    from langgraph.prebuilt import InjectedState
+
+    def get_full_search_result(ref: str, state: Annotated[dict, InjectedState]) -> str:
+        """Get the complete, uncompacted web search results for a ref shown in a compacted search result."""
+        payload = (state.get("tool_results") or {}).get(ref)
+        if payload is None:
+            return (
+                f"No full search result with ref \"{ref}\" in this conversation. Only the last "
+                f"{TOOL_RESULTS_PER_THREAD} searches are kept; run the search again if you need it."
+            )
+        return payload[:max_chars]
+
+    return StructuredTool.from_function(get_full_search_result, name=EXPAND_TOOL_NAME)
+
+
+class ToolResultCompactor:
+    """Graph node that replaces this round's raw search ToolMessages with compact summaries."""
+
+    def __init__(
+        self,
+        tool_names: Iterable[str] = ("tavily_search",),
+        max_chars: int = 1200,
+        sentences_per_result: int = 2
+    ):
+        """
+        Args:
+            tool_names: Tools whose results are compacted
+            max_chars: Cap on each compacted result
+            sentences_per_result: Most relevant sentences kept from each search hit
+        """
+        self.tool_names = set(tool_names)
+        self.max_chars = max_chars
+        self.sentences_per_result = sentences_per_result
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        updates: List[ToolMessage] = []
+        payloads: Dict[str, str] = {}
+        before = after = 0
+        # Only the ToolMessages at the end of the thread belong to this round
+        for message in reversed(state["messages"]):
+            if not isinstance(message, ToolMessage):
+                break
+            compacted = self.compact(message)
+            if compacted is not None:
+                payloads[compacted.additional_kwargs["compacted_ref"]] = message.content
+                before += estimate_tokens(message.content)
+                after += estimate_tokens(compacted.content)
+                updates.append(compacted)
+
+        if not updates:
+            return {}
+        updates.reverse()
+        context = dict(state.get("context") or {})
+        context["last_compaction"] = {"results": len(updates), "tokens_before": before, "tokens_after": after}
+        return {"messages": updates, "context": context, "tool_results": dict(reversed(payloads.items()))}
+
+    def compact(self, message: ToolMessage) -> Optional[ToolMessage]:
+        """Compacted copy of a search ToolMessage (same ID), or None to leave it as is."""
+        if (
+            message.name not in self.tool_names
+            or message.status == "error"
+            or message.additional_kwargs.get("compacted_ref")
+            or not isinstance(message.content, str)
+        ):
+            return None
+        try:
+            payload = json.loads(message.content)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(payload, dict) or "results" not in payload:
+            return None
+
+        ref = uuid.uuid4().hex[:12]
+        content = compact_search_payload(payload, ref, self.max_chars, self.sentences_per_result)
+        if len(content) >= len(message.content):
+            return None
+        return ToolMessage(
+            content=content,
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            id=message.id,
+            additional_kwargs={"compacted_ref": ref}
+        )
@@ -0,0 +1,143 @@
+"""
+Concurrent tool execution for the agent's ``tools`` node.
+
+When the model asks for several tools in one message (weather plus local
+events plus a recipe), every call runs at the same time with its own timeout.
+A call that fails or times out comes back to the model as a structured error
+``ToolMessage`` instead of failing or stalling the whole run, and the latency
+of every call is recorded per tool round (and in a ``StageMetrics`` registry
+when one is given). Tool arguments annotated with ``InjectedState`` receive the
+graph state, as they would under langgraph's ``ToolNode``.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import InjectedState
+
+from metrics import StageMetrics
+
+
+def state_args(tool: BaseTool) -> list:
+    """Names of the tool's arguments annotated with ``InjectedState``."""
+    return [
+        name for name, field in tool.get_input_schema().model_fields.items()
+        if any(meta is InjectedState or isinstance(meta, InjectedState) for meta in field.metadata)
+    ]
+
+
+def tool_error_message(call: Dict[str, Any], error: str, detail: str, **extra) -> ToolMessage:
+    """Structured failure the model can read and react to."""
+    payload = {"status": "error", "error": error, "tool": call["name"], "detail": detail, **extra}
+    return ToolMessage(
+        content=json.dumps(payload),
+        name=call["name"],
+        tool_call_id=call["id"],
+        status="error"
+    )
+
+
+class ParallelToolNode:
+    """Runs every tool call of the last AI message concurrently with per-call timeouts."""
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        timeout: float = 15.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        history_size: int = 100,
+        metrics: Optional[StageMetrics] = None
+    ):
+        """
+        Args:
+            tools: Tools the model may call
+            timeout: Default seconds a single call may take
+            timeouts: Per-tool overrides, by tool name
+            history_size: Recent tool rounds kept for monitoring
+            metrics: Registry for the "tools" stage and per-tool "tool:<name>" latencies
+        """
+        self.tools = {tool.name: tool for tool in tools}
+        self.state_args = {tool.name: state_args(tool) for tool in tools}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.rounds: "deque[Dict[str, Any]]" = deque(maxlen=history_size)
+        self.metrics = metrics
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        message = state["messages"][-1]
+        calls = message.tool_calls if isinstance(message, AIMessage) else []
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[self._run_call(call, state) for call in calls])
+        round_info = {
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "calls": [timing for _, timing in results]
+        }
+        self.rounds.append(round_info)
+        if self.metrics is not None:
+            user_id = state.get("user_id")
+            self.metrics.observe("tools", round_info["total_ms"] / 1000, user_id)
+            for timing in round_info["calls"]:
+                self.metrics.observe(f"tool:{timing['tool']}", timing["latency_ms"] / 1000, user_id)
+
+        context = dict(state.get("context") or {})
+        context["last_tool_round"] = round_info
+        return {"messages": [tool_message for tool_message, _ in results], "context": context}
+
+    async def _run_call(self, call: Dict[str, Any], state: Dict[str, Any]):
+        name = call["name"]
+        timeout = self.timeouts.get(name, self.timeout)
+        started = time.perf_counter()
+        status = "ok"
+
+        tool = self.tools.get(name)
+        if tool is None:
+            status = "unknown_tool"
+            result = tool_error_message(
+                call, status, f"No tool named {name!r}. Available: {', '.join(self.tools)}"
+            )
+        else:
+            args = {**call["args"], **{arg: state for arg in self.state_args[name]}}
+            try:
+                result = await asyncio.wait_for(tool.ainvoke({**call, "args": args, "type": "tool_call"}), timeout)
+                if not isinstance(result, ToolMessage):
+                    result = ToolMessage(content=str(result), name=name, tool_call_id=call["id"])
+                elif result.status == "error":
+                    status = "error"
+            except asyncio.TimeoutError:
+                status = "timeout"
+                result = tool_error_message(
+                    call, status, f"{name} did not respond within {timeout:g}s. "
+                    "Answer without it or try a simpler request.", timeout_s=timeout
+                )
+            except Exception as e:
+                status = "error"
+                result = tool_error_message(call, status, f"{type(e).__name__}: {e}")
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        if status != "ok":
+            print(f"[WARNING] Tool call {name} failed ({status}) after {elapsed_ms:.0f}ms")
+        return result, {"tool": name, "id": call["id"], "status": status, "latency_ms": elapsed_ms}
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """Per-tool call counts, failures and mean latency over the recent rounds."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for round_info in self.rounds:
+            for timing in round_info["calls"]:
+                entry = summary.setdefault(timing["tool"], {"calls": 0, "failures": 0, "total_ms": 0.0})
+                entry["calls"] += 1
+                entry["failures"] += timing["status"] != "ok"
+                entry["total_ms"] += timing["latency_ms"]
+        return {
+            name: {
+                "calls": entry["calls"],
+                "failures": entry["failures"],
+                "mean_ms": round(entry["total_ms"] / entry["calls"], 1)
+            }
+            for name, entry in summary.items()
+        }